@@ -5,7 +5,7 @@ import boto3
 import cdk_nag
 from aws_cdk import Aspects
 
-from cdk_packages.wickr_genai_chatbot_stack import WickrGenaiChatbotStack
+from cdk_packages.wickr_genai_chatbot_stack import WickrGenaiChatbotComputeStack, WickrGenaiChatbotStack
 
 """
 Set the environment explicitly. This is necessary to get subnets in all availability zones.
@@ -25,10 +25,18 @@ app = cdk.App()
 # Uncomment the following line to run the cdk-nag checks
 Aspects.of(app).add(cdk_nag.AwsSolutionsChecks(verbose=True))
 
+# The foundation stack holds the long-lived resources (network, secrets, users and their rotation), the compute stack
+# the instance and the integration code. A code change is deployed with: cdk deploy WickrGenaiChatbotCompute
 cdk_stack = WickrGenaiChatbotStack(
     app, 'WickrGenaiChatbot',
     description='Wickr IO integration with GenAI Chatbot',
     env=environment,
 )
+compute_stack = WickrGenaiChatbotComputeStack(
+    app, 'WickrGenaiChatbotCompute',
+    foundation=cdk_stack,
+    description='Wickr IO integration with GenAI Chatbot, instance and integration code',
+    env=environment,
+)
 
 app.synth()
@@ -25,9 +25,11 @@ class AppSyncCfg(Construct):
 
         # Retrieve AWS Chatbot GraphQL API definition and store in Parameter Store
         genai_stack_params = utils.get_genai_stack_params(genai_chatbot_params.GEN_AI_CHATBOT_STACK_NAME)
+        self.graphql_api_id = genai_stack_params.chat_bot_api_graphql_id
         graphql_api_definition = client_appsync.get_graphql_api(
-            apiId=genai_stack_params.chat_bot_api_graphql_id
+            apiId=self.graphql_api_id
         )
+        self.graphql_uris = graphql_api_definition['graphqlApi']['uris']
         ssm_parameter = ssm.StringParameter(
             self, 'Chatbot GraphQL API definition',
             parameter_name='/Wickr-GenAI-Chatbot/chatbot-graphql-api-definition',
@@ -0,0 +1,7 @@
+# The credentials of the IAM user are rotated, the instance installs the current ones at every boot.
+secret=$(aws secretsmanager get-secret-value --secret-id @@iam_user_secret --query SecretString --output text)
+mkdir -p /.aws
+echo "[default]" > /.aws/credentials
+echo "aws_access_key_id = $(jq --raw-output .aws_access_key_id <<< "$secret")" >> /.aws/credentials
+echo "aws_secret_access_key = $(jq --raw-output .aws_secret_access_key <<< "$secret")" >> /.aws/credentials
+echo "[default]" > /.aws/config
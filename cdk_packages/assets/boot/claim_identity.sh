@@ -0,0 +1,46 @@
+# Claim a bot identity of the pool. An identity is free if it has never been claimed or if the instance
+# that claimed it is gone. The conditional write makes sure two instances never claim the same identity.
+
+# State of the instance holding an identity. Only an instance EC2 doesn't know anymore counts as terminated. Other
+# errors (throttling, permissions, network) are retried and then fail the phase, the holder may still be running.
+holder_state() {
+    local output attempt
+    for attempt in 1 2 3 4 5; do
+        if output=$(aws ec2 describe-instances --instance-ids "$1" \
+            --query 'Reservations[0].Instances[0].State.Name' --output text 2>&1); then
+            echo "$output"
+            return 0
+        fi
+        if [[ "$output" == *InvalidInstanceID.NotFound* ]]; then
+            echo terminated
+            return 0
+        fi
+        echo "describing instance $1 failed (attempt $attempt): $output" >&2
+        sleep $((attempt * 2))
+    done
+    return 1
+}
+
+instance_id=$(curl -s -H "X-aws-ec2-metadata-token: $TOKEN" http://169.254.169.254/latest/meta-data/instance-id)
+for bot_user_id in $(get_parameter @@bot_pool_parameter | tr ',' ' '); do
+    key="{\"bot_user_id\":{\"S\":\"$bot_user_id\"}}"
+    holder=$(aws dynamodb get-item --table-name @@identity_table --key "$key" --consistent-read \
+        --query Item.instance_id.S --output text)
+    if [ "$holder" != "None" ] && [ "$holder" != "$instance_id" ]; then
+        state=$(holder_state "$holder")
+        if [ "$state" != "terminated" ] && [ "$state" != "shutting-down" ]; then
+            continue
+        fi
+    fi
+    if aws dynamodb put-item --table-name @@identity_table \
+        --item "{\"bot_user_id\":{\"S\":\"$bot_user_id\"},\"instance_id\":{\"S\":\"$instance_id\"}}" \
+        --condition-expression "attribute_not_exists(instance_id) OR instance_id IN (:me, :holder)" \
+        --expression-attribute-values "{\":me\":{\"S\":\"$instance_id\"},\":holder\":{\"S\":\"$holder\"}}"; then
+        mkdir -p "$INSTANCE_MARKER_DIR"
+        echo "$bot_user_id" > "$INSTANCE_MARKER_DIR/bot-user-id"
+        echo "claimed bot identity $bot_user_id"
+        exit 0
+    fi
+done
+echo "no free bot identity in the pool"
+exit 1
@@ -0,0 +1,49 @@
+#!/bin/bash
+# Boot pipeline of the Wickr IO EC2 instance, rendered by cdk_packages/boot_pipeline.py. The same script
+# runs as UserData at the first boot and from cron at every reboot. Every phase leaves a completion
+# marker, phases with a marker are skipped. Markers of one-time phases are kept across reboots, markers
+# of per-boot phases are cleared at reboot (/run is a tmpfs).
+#
+# log script output, source: https://alestic.com/2010/12/ec2-user-data-output/
+exec > >(tee -a @@log_file | logger -t wickrio-boot -s 2>/dev/console) 2>&1
+
+INSTANCE_MARKER_DIR=@@instance_marker_dir
+BOOT_MARKER_DIR=@@boot_marker_dir
+
+# one line of JSON per phase, e.g. {"phase":"packages","status":"completed","duration_ms":81234}
+log_phase() {
+    echo "{\"phase\":\"$1\",\"status\":\"$2\",\"duration_ms\":$3}"
+}
+
+run_phase() {
+    local name=$1
+    local marker="$2/$name.done"
+    if [ -f "$marker" ]; then
+        log_phase "$name" skipped 0
+        return 0
+    fi
+    echo "----- $name -----"
+    local start
+    start=$(date +%s%3N)
+    # a phase fails with its first failing command
+    ( set -e; "phase_${name//-/_}" )
+    local status=$?
+    local duration=$(($(date +%s%3N) - start))
+    if [ $status -ne 0 ]; then
+        log_phase "$name" failed "$duration"
+        exit $status
+    fi
+    mkdir -p "$2"
+    touch "$marker"
+    log_phase "$name" completed "$duration"
+}
+
+TOKEN=$(curl -s -X PUT "http://169.254.169.254/latest/api/token" -H "X-aws-ec2-metadata-token-ttl-seconds: 21600")
+region=$(curl -s -H "X-aws-ec2-metadata-token: $TOKEN" http://169.254.169.254/latest/meta-data/placement/region)
+export AWS_DEFAULT_REGION=$region
+# AWS CLI calls on the host use the instance role, /.aws holds the IAM user credentials of the container
+export AWS_SHARED_CREDENTIALS_FILE=/root/.aws/credentials
+
+get_parameter() {
+    aws ssm get-parameters --names "$1" --query 'Parameters[0].Value' --output text
+}
@@ -0,0 +1,26 @@
+# Update the system and install all packages with a single apt-get update (curl and gnupg are part of the
+# Ubuntu image). DPkg::Lock::Timeout waits for apt processes started by cloud-init or unattended-upgrades
+# instead of failing on the dpkg lock.
+apt_get="apt-get -y -o DPkg::Lock::Timeout=600"
+export DEBIAN_FRONTEND=noninteractive
+
+install -m 0755 -d /etc/apt/keyrings
+
+# Node.js, see also: https://github.com/nodesource/distributions
+curl -fsSL https://deb.nodesource.com/gpgkey/nodesource-repo.gpg.key | gpg --dearmor --yes -o /etc/apt/keyrings/nodesource.gpg
+echo "deb [signed-by=/etc/apt/keyrings/nodesource.gpg] https://deb.nodesource.com/node_@@node_major.x nodistro main" \
+    > /etc/apt/sources.list.d/nodesource.list
+
+# Docker's official repository
+curl -fsSL https://download.docker.com/linux/ubuntu/gpg | gpg --dearmor --yes -o /etc/apt/keyrings/docker.gpg
+chmod a+r /etc/apt/keyrings/docker.gpg
+echo "deb [arch=$(dpkg --print-architecture) signed-by=/etc/apt/keyrings/docker.gpg] https://download.docker.com/linux/ubuntu \
+$(. /etc/os-release && echo "$VERSION_CODENAME") stable" > /etc/apt/sources.list.d/docker.list
+
+$apt_get update
+$apt_get upgrade
+$apt_get install unzip jq awscli nodejs \
+    docker-ce docker-ce-cli containerd.io docker-buildx-plugin docker-compose-plugin
+apt-get clean
+aws --version
+docker info > /dev/null
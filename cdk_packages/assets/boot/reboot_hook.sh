@@ -0,0 +1,6 @@
+# run the boot pipeline at every reboot
+aws s3 cp "$(get_parameter @@start_script_parameter)" @@start_script_path
+chmod +x @@start_script_path
+grep -qs "@reboot @@start_script_path" /var/spool/cron/crontabs/root || \
+    echo "@reboot @@start_script_path" >> /var/spool/cron/crontabs/root
+chmod 600 /var/spool/cron/crontabs/root
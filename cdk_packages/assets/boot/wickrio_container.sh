@@ -0,0 +1,32 @@
+# pull and start the wickr container
+mkdir -p /opt/WickrIO
+# bucket of the integration code and container image from the bootstrap document, see cdk_packages/bot_bootstrap.py
+bootstrap=$(get_parameter @@bootstrap_parameter)
+# the integration code is deployed as s3://<bucket>/wickrio-integrations/<bot user ID>/software.tar.gz
+s3_bucket_name=$(jq --raw-output .instance.integration_bucket <<< "$bootstrap")
+# instances of a fleet run the bot identity claimed from the pool
+config_secret=@@config_secret
+if [ -f "$INSTANCE_MARKER_DIR/bot-user-id" ]; then
+    config_secret="@@config_secret-$(cat "$INSTANCE_MARKER_DIR/bot-user-id")"
+fi
+AWS_SECRET_NAME=$(aws secretsmanager describe-secret --secret-id "$config_secret" --query ARN --output text)
+# the image is pulled through the ECR pull-through cache, an image pinned by digest is only pulled once
+container_image=$(jq --raw-output .instance.container_image <<< "$bootstrap")
+if [[ "$container_image" != *@sha256:* ]] || ! docker image inspect "$container_image" > /dev/null 2>&1; then
+    aws ecr get-login-password | docker login --username AWS --password-stdin "${container_image%%/*}"
+    docker pull "$container_image"
+fi
+docker rm -f @@container_name || true
+docker run \
+    -e "AWS_SECRET_NAME=$AWS_SECRET_NAME" \
+    -e "AWS_DEFAULT_REGION=$region" \
+    -e "AWS_REGION=$region" \
+    -e "AWS_S3_INTEGRATIONS_REGION=$region" \
+    -e "AWS_S3_INTEGRATIONS_BUCKET=$s3_bucket_name" \
+    -e "AWS_S3_INTEGRATIONS_FOLDER=wickrio-integrations" \
+    -e "NODE_OPTIONS=--max-old-space-size=@@node_heap_mb" \
+    --cpus=@@container_cpus \
+    --memory=@@container_memory \
+    -v /.aws:/home/wickriouser/.aws \
+    -v /opt/WickrIO:/opt/WickrIO \
+    -d --restart=always --name="@@container_name" -ti "$container_image"
@@ -0,0 +1,30 @@
+#!/bin/bash
+# Hot update of the integration code, run by the SSM document of cdk_packages/code_update.py. The code in the
+# integration folder of the running Wickr IO container is replaced and only the Node.js process of the bot is
+# restarted. The container and the Wickr client keep running.
+set -eu
+export AWS_DEFAULT_REGION=@@region
+
+if [ -z "$(docker ps --quiet --filter 'name=^@@container_name$' --filter status=running)" ]; then
+    echo "Container @@container_name is not running, it installs the current code at its next start."
+    exit 0
+fi
+
+# one integration folder per bot client, named by the bot user ID, see cdk_packages/wickrio_config.py
+for integration_dir in /opt/WickrIO/clients/*/integration/*; do
+    [ -d "$integration_dir" ] || continue
+    bot_user_id=$(basename "$integration_dir")
+    archive=$(mktemp)
+    aws s3 cp --only-show-errors "s3://@@bucket/@@integrations_folder/$bot_user_id/software.tar.gz" "$archive"
+    docker exec --workdir "$integration_dir" @@container_name sh -c './stop.sh' || true
+    # files removed from the code must not survive the update. Kept are the configuration tokens written by Wickr
+    # IO (processes.json), the process configuration (wpm.json) and the runtime data of the bot (logs, files,
+    # wpm2.output).
+    find "$integration_dir" -mindepth 1 -maxdepth 1 \
+        ! -name processes.json ! -name wpm.json ! -name logs ! -name files ! -name '*.output' \
+        -exec rm -rf {} +
+    tar -xzf "$archive" -C "$integration_dir" --anchored --exclude=processes.json
+    rm -f "$archive"
+    docker exec --workdir "$integration_dir" @@container_name sh -c './install.sh && ./start.sh'
+    echo "Integration code of $bot_user_id updated to version $CODE_VERSION."
+done
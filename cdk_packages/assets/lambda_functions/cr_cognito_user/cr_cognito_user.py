@@ -61,6 +61,8 @@ def on_create(event):
     update_parameter_store(user_id)
     rotate_secret()
 
+    return {'Data': {'UserId': user_id}}
+
 
 def on_update(event):
     logical_resource_id = event['LogicalResourceId']
@@ -69,14 +71,14 @@ def on_update(event):
     props = event['ResourceProperties']
     old_props = event['OldResourceProperties']
 
-    if props != old_props:
+    if user_properties(props) != user_properties(old_props):
         new_user_id = create_user_id(props)
         user = get_user()
         delete_user_id(user)
         update_parameter_store(new_user_id)
         rotate_secret()
 
-    return {'PhysicalResourceId': physical_resource_id}
+    return {'PhysicalResourceId': physical_resource_id, 'Data': {'UserId': get_user()['user_id']}}
 
 
 def on_delete(event):
@@ -90,6 +92,11 @@ def on_delete(event):
     return {'PhysicalResourceId': physical_resource_id}
 
 
+def user_properties(props):
+    # ReturnAttributes only lists the attributes returned to CloudFormation, it doesn't change the user
+    return {key: value for key, value in props.items() if key != 'ReturnAttributes'}
+
+
 def create_user_id(props):
     user_id = f'{props["WickrUserName"]}-{uuid.uuid4().hex[:8]}@{props["EmailDomain"]}'
     LOGGER.info(f'Creating Cognito user ID: {user_id}')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import sys
+import traceback
+
+import boto3
+
+LOGGER = logging.getLogger()
+LOGGER.setLevel(logging.INFO)
+
+client_dynamodb = boto3.client('dynamodb')
+
+# items of the workspaces table of the AWS GenAI Chatbot: partition key workspace_id, sort key object_type
+WORKSPACE_OBJECT_TYPE = 'workspace'
+# SSM parameters can't be empty, value of parameter rag-workspace-id if there is no workspace, see also
+# cdk_packages/rag_workspace.py
+NO_WORKSPACE_ID = 'none'
+
+
+def on_event(event=None, context=None):
+    """
+    AWS CDK custom resource handler
+
+    Resolve the name of the RAG workspace used by the Wickr IO integration code to its workspace ID
+
+    """
+    try:
+        return process_event(event, context)
+    except Exception:
+        # log any exception, required for troubleshooting
+        exception_type, exception_value, exception_traceback = sys.exc_info()
+        traceback_string = traceback.format_exception(
+            exception_type, exception_value, exception_traceback)
+        err_msg = json.dumps({
+            "errorType": exception_type.__name__,
+            "errorMessage": str(exception_value),
+            "stackTrace": traceback_string
+        })
+        LOGGER.error(err_msg)
+        raise
+
+
+def process_event(event, context):
+    LOGGER.info(f'event = {json.dumps(event)}')
+    request_type = event['RequestType']
+    if request_type in ('Create', 'Update'):
+        return on_create_or_update(event)
+    if request_type == 'Delete':
+        return {'PhysicalResourceId': event['PhysicalResourceId']}
+    raise Exception(f'Invalid request type: {request_type}')
+
+
+def on_create_or_update(event):
+    LOGGER.info(f'on_{event["RequestType"].lower()} event for resource: {event["LogicalResourceId"]}')
+    props = event['ResourceProperties']
+
+    workspace_id = find_workspace_id(props['WorkspacesTableName'], props['WorkspaceName'])
+    if workspace_id:
+        LOGGER.info(f'RAG workspace {props["WorkspaceName"]}: {workspace_id}')
+    else:
+        # the bot works without workspace, users can select one with /select-rag-workspace
+        LOGGER.warning(f'RAG workspace {props["WorkspaceName"]} not found in table {props["WorkspacesTableName"]}, '
+                       f'the bot starts without workspace.')
+
+    return {
+        'PhysicalResourceId': workspace_id or NO_WORKSPACE_ID,
+        'Data': {
+            'WorkspaceId': workspace_id,
+            'WorkspaceIdParameterValue': workspace_id or NO_WORKSPACE_ID,
+        },
+    }
+
+
+def find_workspace_id(table_name, workspace_name):
+    """
+    Scan the workspaces table for the workspace with the given name, page by page. A workspace with status "ready"
+    is preferred over one that is still being created.
+
+    :return: workspace ID, empty if there is no workspace with the name
+    """
+    candidates = []
+    scan_args = {
+        'TableName': table_name,
+        'FilterExpression': '#name = :name AND object_type = :object_type',
+        'ProjectionExpression': 'workspace_id, #name, #status',
+        'ExpressionAttributeNames': {'#name': 'name', '#status': 'status'},
+        'ExpressionAttributeValues': {
+            ':name': {'S': workspace_name},
+            ':object_type': {'S': WORKSPACE_OBJECT_TYPE},
+        },
+    }
+    while True:
+        response = client_dynamodb.scan(**scan_args)
+        for item in response['Items']:
+            if item.get('status', {}).get('S') == 'ready':
+                return item['workspace_id']['S']
+            candidates.append(item['workspace_id']['S'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if not candidates:
+        return ''
+    LOGGER.warning(f'RAG workspace {workspace_name} is not ready yet.')
+    return candidates[0]
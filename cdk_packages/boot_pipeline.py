@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import os.path
+from string import Template
+
+dirname = os.path.dirname(__file__)
+
+TEMPLATE_DIR = os.path.join(dirname, 'assets', 'boot')
+BUILD_DIR = os.path.join(dirname, 'assets', 'build')
+
+
+class PhaseTemplate(Template):
+    # '$' is taken by the shell scripts, placeholders are written as @@name
+    delimiter = '@@'
+
+
+class BootPipeline:
+    """
+    Boot script of the EC2 instance, assembled from the phase templates in assets/boot.
+
+    Phases run in the order they are added. A phase with once=True runs once per instance, all other
+    phases run once per boot. Every phase logs its duration as a JSON line, see assets/boot/header.sh.
+    """
+
+    def __init__(self, variables: dict):
+        self.variables = {
+            'log_file': '/var/log/wickrio-boot.log',
+            'instance_marker_dir': '/var/lib/wickrio-boot',
+            'boot_marker_dir': '/run/wickrio-boot',
+            **variables,
+        }
+        self.phases = []
+
+    def add_phase(self, name: str, once: bool = False):
+        """
+        Add the phase from template assets/boot/<name>.sh, with '-' in the name replaced by '_'.
+        """
+        self.phases.append((name, once))
+        return self
+
+    def _render_template(self, name: str) -> str:
+        with open(os.path.join(TEMPLATE_DIR, f'{name.replace("-", "_")}.sh')) as f:
+            return PhaseTemplate(f.read()).substitute(self.variables)
+
+    def render(self) -> str:
+        lines = [self._render_template('header')]
+        for name, _ in self.phases:
+            body = self._render_template(name).rstrip('\n').replace('\n', '\n    ')
+            lines.append(f'phase_{name.replace("-", "_")}() {{\n    {body}\n}}\n')
+        for name, once in self.phases:
+            marker_dir = '$INSTANCE_MARKER_DIR' if once else '$BOOT_MARKER_DIR'
+            lines.append(f'run_phase {name} {marker_dir}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, filename: str) -> str:
+        """
+        Render the pipeline to assets/build/<filename> and return the path of the file.
+        """
+        os.makedirs(BUILD_DIR, exist_ok=True)
+        path = os.path.join(BUILD_DIR, filename)
+        with open(path, 'w') as f:
+            f.write(self.render())
+        return path
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import json
+
+from aws_cdk import (
+    aws_iam as iam,
+    aws_ssm as ssm,
+)
+from constructs import Construct
+
+from cdk_packages.cognito_user import COGNITO_USER_ID_PARAMETER
+from cdk_packages.rag_workspace import RAG_WORKSPACE_ID_PARAMETER
+
+BOOTSTRAP_PARAMETER = '/Wickr-GenAI-Chatbot/bootstrap'
+
+
+class BotBootstrap(Construct):
+    """
+    Compact bootstrap document with the fields the bot and the boot script of the instances read at startup,
+    one parameter read instead of one per configuration parameter. The full parameters are kept for other readers.
+
+    bot:      URIs of the chatbot GraphQL API, the Cognito user and the default RAG workspace, read by
+              genai-advisor-bot/components/config.js
+    instance: integration code bucket and container image, read by assets/boot/wickrio_container.sh
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        document = {
+            'bot': {
+                'graphql_url': params.appsync_cfg.graphql_uris['GRAPHQL'],
+                'realtime_url': params.appsync_cfg.graphql_uris['REALTIME'],
+                'user_pool_web_client_id': params.cognito_user.user_pool_web_client_id,
+                'cognito_user_id': ssm.StringParameter.value_for_string_parameter(self, COGNITO_USER_ID_PARAMETER),
+                # default workspace of the bot, resolved at deployment time by RagWorkspace
+                'rag_workspace_name': params.rag_workspace.workspace_name,
+                'rag_workspace_id': ssm.StringParameter.value_for_string_parameter(self, RAG_WORKSPACE_ID_PARAMETER),
+            },
+            'instance': {
+                'integration_bucket': params.wickrio_code.bucket.bucket_name,
+                'container_image': params.container_image.image_parameter.string_value,
+            },
+        }
+        self.parameter = ssm.StringParameter(
+            self, 'bootstrap document',
+            parameter_name=BOOTSTRAP_PARAMETER,
+            string_value=json.dumps(document, separators=(',', ':')),
+            description='Bootstrap document of the Wickr IO bot and instances.',
+        )
+
+        # the IAM user belongs to the foundation stack, the read permission to this stack
+        user_policy = iam.Policy(
+            self, 'Wickr IO IAM user policy',
+            users=[params.iam_user.wickrio_user],
+        )
+        self.parameter.grant_read(user_policy)
+        self.parameter.grant_read(params.wickrio_instance.ec2_instance_role)
+
+        # the instances read the document at their first boot
+        for launcher in (params.wickrio_instance.ec2_instance, getattr(params, 'bot_fleet', None)):
+            if launcher:
+                launcher.node.add_dependency(self.parameter)
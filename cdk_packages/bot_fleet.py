@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_autoscaling as autoscaling,
+    aws_cloudwatch as cloudwatch,
+    aws_ec2 as ec2,
+    aws_iam as iam,
+)
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+IDENTITY_TABLE = 'WickrIO-Bot-Identities'
+BOT_POOL_PARAMETER = '/Wickr-GenAI-Chatbot/wickr-io-bot-pool'
+FLEET_METRICS_NAMESPACE = 'WickrGenAIChatbot'
+
+
+def fleet_enabled(node) -> bool:
+    """
+    Fleet mode is enabled with: cdk deploy --context fleet=true ...
+    """
+    return str(node.try_get_context('fleet')).lower() == 'true'
+
+
+class BotFleet(Construct):
+    """
+    Auto Scaling group of Wickr IO instances. Each instance claims a bot of the pool defined in WickrIOConfig.
+    The group scales on CPU utilization and on the average chatbot queue depth published by the bots.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        # An instance without a free bot can't start, the group never grows beyond the size of the pool.
+        pool_size = len(params.wickrio_config.bot_user_ids)
+        min_capacity = int(self.node.try_get_context('fleet_min_size') or 1)
+        max_capacity = min(int(self.node.try_get_context('fleet_max_size') or pool_size), pool_size)
+        cpu_target = int(self.node.try_get_context('fleet_cpu_target') or 60)
+        queue_depth_target = int(self.node.try_get_context('fleet_queue_depth_target') or 5)
+
+        user_data = ec2.UserData.for_linux()
+        user_data.add_commands(params.wickrio_instance.boot_script)
+        self.security_group = ec2.SecurityGroup(
+            self, 'security group',
+            vpc=params.network.vpc,
+            description='Wickr IO bot fleet security group',
+        )
+        self.launch_template = ec2.LaunchTemplate(
+            self, 'launch template',
+            instance_type=params.wickrio_instance.instance_type,
+            machine_image=params.wickrio_instance.machine_image,
+            role=params.wickrio_instance.ec2_instance_role,
+            user_data=user_data,
+            require_imdsv2=True,
+            detailed_monitoring=True,
+            block_devices=params.wickrio_instance.block_devices,
+            security_group=self.security_group,
+        )
+        self.auto_scaling_group = autoscaling.AutoScalingGroup(
+            self, 'Auto Scaling group',
+            vpc=params.network.vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS,
+            ),
+            launch_template=self.launch_template,
+            min_capacity=min_capacity,
+            max_capacity=max_capacity,
+        )
+        self.auto_scaling_group.node.add_dependency(
+            params.wickrio_instance.start_script_parameter, params.container_image)
+
+        self.auto_scaling_group.scale_on_cpu_utilization(
+            'CPU utilization',
+            target_utilization_percent=cpu_target,
+        )
+        self.auto_scaling_group.scale_to_track_metric(
+            'queue depth',
+            metric=cloudwatch.Metric(
+                namespace=FLEET_METRICS_NAMESPACE,
+                metric_name='QueueDepth',
+                # BOT_FLEET_NAME of the bots, see WickrIOConfig
+                dimensions_map={'Fleet': cdk.Stack.of(params.wickrio_config).stack_name},
+                statistic='Average',
+                period=cdk.Duration.minutes(1),
+            ),
+            target_value=queue_depth_target,
+        )
+
+        # instances check whether the holder of a claimed bot is still running
+        params.wickrio_instance.ec2_instance_role.add_to_policy(iam.PolicyStatement(
+            actions=['ec2:DescribeInstances'],
+            resources=['*'],
+        ))
+        # the bots publish their queue depth, see genai-advisor-bot/components/cloudwatch.js
+        self.user_policy = iam.Policy(
+            self, 'Wickr IO IAM user policy',
+            users=[params.iam_user.wickrio_user],
+            statements=[iam.PolicyStatement(
+                actions=['cloudwatch:PutMetricData'],
+                resources=['*'],
+                conditions={'StringEquals': {'cloudwatch:namespace': FLEET_METRICS_NAMESPACE}},
+            )],
+        )
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        NagSuppressions.add_resource_suppressions(
+            construct=params.wickrio_instance.ec2_instance_role,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'ec2:DescribeInstances does not support resource-level permissions.',
+                    'appliesTo': ['Resource::*'],
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            construct=self.user_policy,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'cloudwatch:PutMetricData does not support resource-level permissions, the '
+                              'permission is restricted to the namespace of the fleet by a condition.',
+                    'appliesTo': ['Resource::*'],
+                },
+            ],
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            construct=self.auto_scaling_group,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-AS3',
+                    'reason': 'Notifications for scaling events are not required. This is only a demonstration '
+                              'fleet.',
+                },
+            ],
+            apply_to_children=True,
+        )
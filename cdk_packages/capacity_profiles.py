@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+from aws_cdk import aws_ec2 as ec2
+
+# Sizing of the Wickr IO instance, selected with: cdk deploy --context capacity_profile=<name> ...
+#
+# instance_type:  EC2 instance type, the architecture must match
+# architecture:   'amd64' or 'arm64' (Graviton), selects the Ubuntu image and the platform of node_modules
+# volume_size:    size of the root volume in GiB (gp3)
+# volume_iops:    provisioned IOPS of the root volume, gp3 baseline is 3000
+# volume_throughput: provisioned throughput of the root volume in MiB/s, gp3 baseline is 125
+# container_cpus: CPU limit of the Wickr IO container (docker run --cpus)
+# container_memory: memory limit of the Wickr IO container (docker run --memory)
+# node_heap_mb:   V8 heap limit of the Node.js processes in the container (--max-old-space-size)
+CAPACITY_PROFILES = {
+    # sizing of the original demonstration deployment
+    'default': {
+        'instance_type': 't2.medium',
+        'architecture': 'amd64',
+        'volume_size': 10,
+        'volume_iops': 3000,
+        'volume_throughput': 125,
+        'container_cpus': '2',
+        'container_memory': '3g',
+        'node_heap_mb': 1536,
+    },
+    # current generation burstable instance for low and spiky traffic
+    'burstable': {
+        'instance_type': 't3.medium',
+        'architecture': 'amd64',
+        'volume_size': 20,
+        'volume_iops': 3000,
+        'volume_throughput': 125,
+        'container_cpus': '2',
+        'container_memory': '3g',
+        'node_heap_mb': 1536,
+    },
+    # Graviton, requires an arm64 build of the Wickr IO container image
+    'graviton': {
+        'instance_type': 'm7g.large',
+        'architecture': 'arm64',
+        'volume_size': 20,
+        'volume_iops': 3000,
+        'volume_throughput': 250,
+        'container_cpus': '2',
+        'container_memory': '7g',
+        'node_heap_mb': 4096,
+    },
+    # steady high traffic without CPU credits
+    'compute': {
+        'instance_type': 'c6i.xlarge',
+        'architecture': 'amd64',
+        'volume_size': 30,
+        'volume_iops': 6000,
+        'volume_throughput': 250,
+        'container_cpus': '4',
+        'container_memory': '7g',
+        'node_heap_mb': 4096,
+    },
+}
+
+
+def capacity_profile(node) -> dict:
+    """
+    Capacity profile selected by the context parameter capacity_profile, 'default' if not set.
+    """
+    name = node.try_get_context('capacity_profile') or 'default'
+    if name not in CAPACITY_PROFILES:
+        raise ValueError(f'Unknown capacity profile "{name}", valid profiles: {", ".join(CAPACITY_PROFILES)}.')
+    return CAPACITY_PROFILES[name]
+
+
+def ubuntu_image(profile: dict) -> ec2.IMachineImage:
+    if profile['architecture'] == 'amd64':
+        return ec2.MachineImage.generic_linux({
+            'eu-west-1': 'ami-0095aed963d3ed501',
+            # Canonical, Ubuntu, 22.04 LTS, amd64 jammy image build on 2024-01-24
+            'eu-west-2': 'ami-04d9351fa78a6efea',
+            # Canonical, Ubuntu, 22.04 LTS, amd64 jammy image build on 2024-01-26
+            'eu-central-1': 'ami-026c3177c9bd54288',
+            # Canonical, Ubuntu, 22.04 LTS, amd64 jammy image build on 2024-04-11
+        })
+    # current Canonical Ubuntu 22.04 LTS image, published by Canonical in the SSM Parameter Store of every region
+    return ec2.MachineImage.from_ssm_parameter(
+        f'/aws/service/canonical/ubuntu/server/22.04/stable/current/{profile["architecture"]}/hvm/ebs-gp2/ami-id',
+        os=ec2.OperatingSystemType.LINUX,
+    )
+
+
+def block_devices(profile: dict) -> list:
+    return [
+        ec2.BlockDevice(
+            device_name='/dev/sda1',
+            volume=ec2.BlockDeviceVolume.ebs(
+                profile['volume_size'],
+                volume_type=ec2.EbsDeviceVolumeType.GP3,
+                iops=profile['volume_iops'],
+                throughput=profile['volume_throughput'],
+                encrypted=True
+            )
+        )
+    ]
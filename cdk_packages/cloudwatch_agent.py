@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_iam as iam,
+    aws_logs as logs,
+    aws_ssm as ssm,
+)
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+from cdk_packages.bot_fleet import FLEET_METRICS_NAMESPACE
+
+AGENT_TARGET_TAG = 'WickrIOBot'
+BOT_LOG_GROUP = '/Wickr-GenAI-Chatbot/bot'
+BOOT_LOG_GROUP = '/Wickr-GenAI-Chatbot/boot'
+# log files of the integration code, see also "Troubleshooting" in README.md
+BOT_LOG_FILES = '/opt/WickrIO/clients/*/integration/*/logs/*.output'
+
+
+class CloudWatchAgent(Construct):
+    """
+    Installs and configures the CloudWatch agent on the Wickr IO instances with an SSM association. The agent
+    collects memory, disk and process metrics of the host and the container, and ships the boot log and the logs
+    of the integration code to CloudWatch Logs. The reply latency logged by the bot becomes metric ReplyLatency.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        stack_name = cdk.Stack.of(self).stack_name
+        role = params.wickrio_instance.ec2_instance_role
+        role.add_managed_policy(iam.ManagedPolicy.from_aws_managed_policy_name('CloudWatchAgentServerPolicy'))
+
+        self.bot_log_group = logs.LogGroup(
+            self, 'bot log group',
+            log_group_name=BOT_LOG_GROUP,
+            retention=logs.RetentionDays.ONE_MONTH,
+            removal_policy=cdk.RemovalPolicy.DESTROY,
+        )
+        self.boot_log_group = logs.LogGroup(
+            self, 'boot log group',
+            log_group_name=BOOT_LOG_GROUP,
+            retention=logs.RetentionDays.ONE_MONTH,
+            removal_policy=cdk.RemovalPolicy.DESTROY,
+        )
+
+        # the bot logs one line per reply, e.g. "2024-05-02T10:00:00.000Z info: reply_latency_ms 2345"
+        self.reply_latency_filter = logs.MetricFilter(
+            self, 'reply latency',
+            log_group=self.bot_log_group,
+            filter_pattern=logs.FilterPattern.literal('[..., name="reply_latency_ms", latency_ms]'),
+            metric_namespace=FLEET_METRICS_NAMESPACE,
+            metric_name='ReplyLatency',
+            metric_value='$latency_ms',
+            unit=cloudwatch.Unit.MILLISECONDS,
+        )
+        # lines "websocket_reconnect" and "chatbot_api_error <throttle|error>", see chatbot-graphql-api.js
+        self.websocket_reconnect_filter = logs.MetricFilter(
+            self, 'WebSocket reconnects',
+            log_group=self.bot_log_group,
+            filter_pattern=logs.FilterPattern.literal('[..., name="websocket_reconnect"]'),
+            metric_namespace=FLEET_METRICS_NAMESPACE,
+            metric_name='WebSocketReconnects',
+            metric_value='1',
+            default_value=0,
+        )
+        self.chatbot_api_error_filter = logs.MetricFilter(
+            self, 'chatbot API errors',
+            log_group=self.bot_log_group,
+            filter_pattern=logs.FilterPattern.literal('[..., name="chatbot_api_error", kind]'),
+            metric_namespace=FLEET_METRICS_NAMESPACE,
+            metric_name='ChatbotApiErrors',
+            metric_value='1',
+            default_value=0,
+        )
+        self.chatbot_api_throttle_filter = logs.MetricFilter(
+            self, 'chatbot API throttles',
+            log_group=self.bot_log_group,
+            filter_pattern=logs.FilterPattern.literal('[..., name="chatbot_api_error", kind="throttle"]'),
+            metric_namespace=FLEET_METRICS_NAMESPACE,
+            metric_name='ChatbotApiThrottles',
+            metric_value='1',
+            default_value=0,
+        )
+        # line "model_fallback <latency|throttle>", see model-router.js
+        self.model_fallback_filter = logs.MetricFilter(
+            self, 'model fallbacks',
+            log_group=self.bot_log_group,
+            filter_pattern=logs.FilterPattern.literal('[..., name="model_fallback", reason]'),
+            metric_namespace=FLEET_METRICS_NAMESPACE,
+            metric_name='ModelFallbacks',
+            metric_value='1',
+            default_value=0,
+        )
+
+        # Agent configuration, see also:
+        # https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch-Agent-Configuration-File-Details.html
+        agent_config = {
+            'agent': {
+                'metrics_collection_interval': 60,
+            },
+            'metrics': {
+                'append_dimensions': {
+                    'InstanceId': '${aws:InstanceId}',
+                    'AutoScalingGroupName': '${aws:AutoScalingGroupName}',
+                },
+                'aggregation_dimensions': [['InstanceId'], ['AutoScalingGroupName']],
+                'metrics_collected': {
+                    'cpu': {'measurement': ['cpu_usage_user', 'cpu_usage_system', 'cpu_usage_iowait'],
+                            'totalcpu': True},
+                    'mem': {'measurement': ['mem_used_percent', 'mem_available']},
+                    'swap': {'measurement': ['swap_used_percent']},
+                    'disk': {'measurement': ['disk_used_percent'], 'resources': ['/']},
+                    'diskio': {'measurement': ['io_time'], 'resources': ['*']},
+                    # Node.js processes of the Wickr IO container and the Docker daemon
+                    'procstat': [
+                        {'exe': 'node', 'measurement': ['cpu_usage', 'memory_rss', 'pid_count']},
+                        {'exe': 'dockerd', 'measurement': ['cpu_usage', 'memory_rss']},
+                    ],
+                },
+            },
+            'logs': {
+                'logs_collected': {
+                    'files': {
+                        'collect_list': [
+                            {
+                                'file_path': BOT_LOG_FILES,
+                                'log_group_name': BOT_LOG_GROUP,
+                                'log_stream_name': '{instance_id}',
+                            },
+                            {
+                                'file_path': params.wickrio_instance.boot_log_file,
+                                'log_group_name': BOOT_LOG_GROUP,
+                                'log_stream_name': '{instance_id}',
+                            },
+                        ],
+                    },
+                },
+            },
+        }
+        # the parameter name prefix AmazonCloudWatch- is readable with policy CloudWatchAgentServerPolicy
+        config_parameter = ssm.StringParameter(
+            self, 'agent configuration',
+            parameter_name='AmazonCloudWatch-WickrIO-Bot',
+            string_value=json.dumps(agent_config),
+        )
+
+        document = ssm.CfnDocument(
+            self, 'install and configure agent',
+            document_type='Command',
+            content={
+                'schemaVersion': '2.2',
+                'description': 'Install the CloudWatch agent and apply the Wickr IO bot configuration.',
+                'parameters': {
+                    'configurationVersion': {
+                        'type': 'String',
+                        'description': 'Hash of the agent configuration, a new value runs the association again.',
+                        'default': '',
+                    },
+                },
+                'mainSteps': [
+                    {
+                        'action': 'aws:runDocument',
+                        'name': 'installAgent',
+                        'inputs': {
+                            'documentType': 'SSMDocument',
+                            'documentPath': 'AWS-ConfigureAWSPackage',
+                            'documentParameters': {'action': 'Install', 'name': 'AmazonCloudWatchAgent'},
+                        },
+                    },
+                    {
+                        'action': 'aws:runDocument',
+                        'name': 'configureAgent',
+                        'inputs': {
+                            'documentType': 'SSMDocument',
+                            'documentPath': 'AmazonCloudWatch-ManageAgent',
+                            'documentParameters': {
+                                'action': 'configure',
+                                'mode': 'ec2',
+                                'optionalConfigurationSource': 'ssm',
+                                'optionalConfigurationLocation': config_parameter.parameter_name,
+                                'optionalRestart': 'yes',
+                            },
+                        },
+                    },
+                ],
+            },
+        )
+        association = ssm.CfnAssociation(
+            self, 'agent association',
+            name=document.ref,
+            targets=[ssm.CfnAssociation.TargetProperty(key=f'tag:{AGENT_TARGET_TAG}', values=[stack_name])],
+            parameters={
+                'configurationVersion': [hashlib.sha256(json.dumps(agent_config).encode()).hexdigest()[:16]],
+            },
+        )
+        association.node.add_dependency(config_parameter)
+
+        # the association applies to the single instance or to all instances of the fleet
+        if params.wickrio_instance.ec2_instance:
+            cdk.Tags.of(params.wickrio_instance.ec2_instance).add(AGENT_TARGET_TAG, stack_name)
+        if getattr(params, 'bot_fleet', None):
+            cdk.Tags.of(params.bot_fleet.auto_scaling_group).add(AGENT_TARGET_TAG, stack_name)
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        NagSuppressions.add_resource_suppressions(
+            construct=role,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM4',
+                    'reason': 'AWS managed policy recommended for the CloudWatch agent: '
+                              'https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/create-iam-roles-for-'
+                              'cloudwatch-agent.html.',
+                    'appliesTo': ['Policy::arn:<AWS::Partition>:iam::aws:policy/CloudWatchAgentServerPolicy'],
+                },
+            ],
+            apply_to_children=True,
+        )
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import os.path
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_iam as iam,
+    aws_ssm as ssm,
+    custom_resources as cr,
+)
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+from cdk_packages.boot_pipeline import PhaseTemplate
+from cdk_packages.cloudwatch_agent import AGENT_TARGET_TAG
+from cdk_packages.wickrio_code import INTEGRATIONS_FOLDER
+
+dirname = os.path.dirname(__file__)
+
+
+class CodeUpdate(Construct):
+    """
+    Hot update of the integration code on the running Wickr IO instances. When the asset hash of the integration
+    code changes, the deployment sends an SSM command that replaces the code in the running container and restarts
+    only the Node.js process of the bot, see assets/code_update/hot_code_update.sh.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        stack = cdk.Stack.of(self)
+        code = params.wickrio_code
+        role = params.wickrio_instance.ec2_instance_role
+        for key_prefix in code.key_prefixes:
+            code.bucket.grant_read(role, f'{key_prefix}*')
+
+        with open(os.path.join(dirname, 'assets', 'code_update', 'hot_code_update.sh')) as f:
+            script = PhaseTemplate(f.read()).substitute({
+                'region': stack.region,
+                'bucket': code.bucket.bucket_name,
+                'integrations_folder': INTEGRATIONS_FOLDER,
+                'container_name': params.wickrio_instance.container_name,
+            })
+        self.document = ssm.CfnDocument(
+            self, 'hot code update',
+            document_type='Command',
+            content={
+                'schemaVersion': '2.2',
+                'description': 'Replace the integration code in the running Wickr IO container and restart the bot.',
+                'parameters': {
+                    'codeVersion': {
+                        'type': 'String',
+                        'description': 'Asset hash of the integration code.',
+                    },
+                },
+                'mainSteps': [
+                    {
+                        'action': 'aws:runShellScript',
+                        'name': 'updateCode',
+                        'inputs': {
+                            'timeoutSeconds': '300',
+                            'runCommand': ['CODE_VERSION={{ codeVersion }}'] + script.splitlines(),
+                        },
+                    },
+                ],
+            },
+        )
+
+        # the physical resource ID changes with the code, every new version is sent once to all instances
+        send_command = cr.AwsSdkCall(
+            service='SSM',
+            action='sendCommand',
+            parameters={
+                'DocumentName': self.document.ref,
+                'Targets': [{'Key': f'tag:{AGENT_TARGET_TAG}', 'Values': [stack.stack_name]}],
+                'Parameters': {'codeVersion': [code.asset_hash]},
+                'Comment': f'Integration code {code.asset_hash[:16]}',
+            },
+            physical_resource_id=cr.PhysicalResourceId.of(code.asset_hash),
+        )
+        self.send_command = cr.AwsCustomResource(
+            self, 'send hot code update',
+            on_update=send_command,
+            policy=cr.AwsCustomResourcePolicy.from_statements([
+                iam.PolicyStatement(
+                    actions=['ssm:SendCommand'],
+                    resources=[stack.format_arn(service='ssm', resource='document',
+                                                resource_name=self.document.ref)],
+                ),
+                iam.PolicyStatement(
+                    actions=['ssm:SendCommand'],
+                    resources=[stack.format_arn(service='ec2', resource='instance', resource_name='*')],
+                    conditions={'StringEquals': {f'ssm:resourceTag/{AGENT_TARGET_TAG}': stack.stack_name}},
+                ),
+            ]),
+            install_latest_aws_sdk=False,
+        )
+        # the code is sent after it has been copied to the bucket, it reads the current bootstrap document
+        self.send_command.node.add_dependency(*code.deployments, params.bot_bootstrap.parameter)
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        NagSuppressions.add_resource_suppressions(
+            construct=role,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'Default read permissions generated by using CDK function grant_read(), restricted '
+                              'to the integration code folders.',
+                    'appliesTo': [
+                        {'regex': '/^Resource::<.+\\.Arn>\\/wickrio-integrations\\/.+\\/\\*$/'},
+                    ]
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            construct=self.send_command,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'The command is sent to the instances with the tag of the stack, the instance IDs are '
+                              'not known at deployment time.',
+                    'appliesTo': [{'regex': '/^Resource::arn:<AWS::Partition>:ec2:.+:instance\\/\\*$/'}],
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        # the Lambda function of AwsCustomResource is a singleton at stack level
+        for custom_resource_function in stack.node.children:
+            if not custom_resource_function.node.id.startswith('AWS679f53fac002430cb0da5b7982bd2287'):
+                continue
+            NagSuppressions.add_resource_suppressions(
+                construct=custom_resource_function,
+                suppressions=[
+                    {
+                        'id': 'AwsSolutions-IAM4',
+                        'reason': 'Lambda function role created by CDK construct AwsCustomResource.',
+                        'appliesTo': [
+                            'Policy::arn:<AWS::Partition>:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'
+                        ],
+                    },
+                ],
+                apply_to_children=True,
+            )
@@ -13,7 +13,6 @@ from aws_cdk import (
     aws_lambda as lambda_,
     aws_logs as logs,
     aws_ssm as ssm,
-    aws_dynamodb as dynamodb,
     custom_resources as cr,
 )
 from cdk_nag import NagSuppressions
@@ -24,6 +23,8 @@ import cdk_packages.genai_chatbot_params as genai_chatbot_params
 
 dirname = os.path.dirname(__file__)
 
+COGNITO_USER_ID_PARAMETER = '/Wickr-GenAI-Chatbot/wickr-io-cognito-user-id'
+
 client_cloudformation = boto3.client('cloudformation')
 client_cognito_idp = boto3.client('cognito-idp')
 client_apigatewayv2 = boto3.client('apigatewayv2')
@@ -74,7 +75,7 @@ class CognitoUser(Construct):
         )
         genai_stack_params = utils.get_genai_stack_params(genai_chatbot_params.GEN_AI_CHATBOT_STACK_NAME)
         # genai_stack_params.websocket_endpoint = utils.get_websocket_endpoint(genai_chatbot_params.GEN_AI_CHATBOT_STACK_NAME)
-        cdk.CustomResource(
+        cognito_user = cdk.CustomResource(
             self, 'Custom resource - Cognito user',
             service_token=cr_provider.service_token,
             properties={
@@ -84,8 +85,16 @@ class CognitoUser(Construct):
                 'AuthenticationUserPoolWebClientId': genai_stack_params.user_pool_web_client_id,
                 'AuthenticationUserPoolId': genai_stack_params.user_pool_id,
                 # 'ChatBotApiRestApiChatBotApiEndpoint': genai_stack_params.websocket_endpoint,
+                'ReturnAttributes': 'UserId',
             },
         )
+        self.user_pool_web_client_id = genai_stack_params.user_pool_web_client_id
+        # read by the compute stack at deployment time, a stack export couldn't change with a new user
+        ssm.StringParameter(
+            self, 'Parameter - Cognito user ID',
+            parameter_name=COGNITO_USER_ID_PARAMETER,
+            string_value=cognito_user.get_att_string('UserId'),
+        )
         # TODO: verify required parameters
         self.wickrio_cognito_config = ssm.StringParameter(
             self, 'Parameter - Cognito user',
@@ -108,25 +117,22 @@ class CognitoUser(Construct):
             secret_name='WickrIO-Cognito-User-Password',
         )
 
-        # Get the DynamoDB table with the RAG workspaces and store in SSM Parameter Store.
-        rag_workspaces_table_name = utils.get_rag_workspaces_table_name(genai_chatbot_params.GEN_AI_CHATBOT_RAG_WORKSPACES_TABLE_NAME)
+        # Model and RAG workspace in SSM Parameter Store, the workspace ID is resolved by RagWorkspace.
         ssm.StringParameter(
             self, 'Parameter - RagWorkspacesTableName',
             parameter_name='/Wickr-GenAI-Chatbot/model-rag-params',
-            string_value=json.dumps(
+            string_value=cdk.Stack.of(self).to_json_string(
                 {
                     'model_name': genai_chatbot_params.GEN_AI_CHATBOT_MODEL_NAME,
-                    'rag_workspace_name': genai_chatbot_params.GEN_AI_CHATBOT_RAG_WORKSPACE_NAME,
-                    'rag_workspaces_table_name': rag_workspaces_table_name,
+                    'rag_workspace_name': params.rag_workspace.workspace_name,
+                    'rag_workspace_id': params.rag_workspace.workspace_id,
+                    'rag_workspaces_table_name': params.rag_workspace.table_name,
                 }
             ),
-            description='LLM model and RAG workspaces DynamoDB table.',
+            description='LLM model, RAG workspace and RAG workspaces DynamoDB table.',
         ).grant_read(params.iam_user.wickrio_user)
         # Allow Wickr IO user to read the RAG workspaces DynamoDB table.
-        dynamodb.Table.from_table_name(
-            self, 'RagWorkspacesTable',
-            table_name=rag_workspaces_table_name,
-        ).grant_read_data(params.iam_user.wickrio_user)
+        params.rag_workspace.table.grant_read_data(params.iam_user.wickrio_user)
 
         # ----------------------------------------------------------------
         #       cdk_nag suppressions
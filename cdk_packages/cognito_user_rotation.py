@@ -55,7 +55,7 @@ class CognitoUserRotation(Construct):
             retention=logs.RetentionDays.THREE_MONTHS,
         )
         log_group.grant_write(lambda_role)
-        secret_rotation = lambda_.Function(
+        self.secret_rotation = secret_rotation = lambda_.Function(
             self, 'Secrets rotation - lambda function',
             role=lambda_role,
             code=lambda_.Code.from_asset(
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_ecr as ecr,
+    aws_iam as iam,
+    aws_ssm as ssm,
+)
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+# The Wickr IO image is published in the ECR Public Gallery, ECR caches it in the private registry of the account
+UPSTREAM_REGISTRY = 'public.ecr.aws'
+UPSTREAM_REPOSITORY = 'x3s2s6k3/wickrio/bot-cloud'
+CACHE_REPOSITORY_PREFIX = 'ecr-public'
+CONTAINER_IMAGE_PARAMETER = '/Wickr-GenAI-Chatbot/wickr-io-container-image'
+
+
+class ContainerImage(Construct):
+    """
+    ECR pull-through cache for the Wickr IO container image. The image is pinned by the digest given in the stack
+    parameter WickrIOImageDigest, without digest the instances run the latest image.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        stack = cdk.Stack.of(self)
+
+        ecr.CfnPullThroughCacheRule(
+            self, 'pull through cache rule',
+            ecr_repository_prefix=CACHE_REPOSITORY_PREFIX,
+            upstream_registry_url=UPSTREAM_REGISTRY,
+        )
+        self.registry = f'{stack.account}.dkr.ecr.{stack.region}.{stack.url_suffix}'
+        repository = f'{self.registry}/{CACHE_REPOSITORY_PREFIX}/{UPSTREAM_REPOSITORY}'
+
+        # e.g. cdk deploy --parameters WickrIOImageDigest=sha256:0123... ,
+        # the digest of the latest image: docker buildx imagetools inspect public.ecr.aws/x3s2s6k3/wickrio/bot-cloud
+        digest = cdk.CfnParameter(
+            stack, 'WickrIOImageDigest',
+            type='String',
+            default='',
+            allowed_pattern='^(sha256:[0-9a-f]{64})?$',
+            description='Digest of the Wickr IO container image, empty for the latest image.',
+        )
+        latest = cdk.CfnCondition(
+            self, 'latest image',
+            expression=cdk.Fn.condition_equals(digest.value_as_string, ''),
+        )
+        self.image_parameter = ssm.StringParameter(
+            self, 'Wickr IO container image',
+            parameter_name=CONTAINER_IMAGE_PARAMETER,
+            string_value=cdk.Token.as_string(cdk.Fn.condition_if(
+                latest.logical_id,
+                f'{repository}:latest',
+                f'{repository}@{digest.value_as_string}',
+            )),
+        )
+        self.repository_arn = stack.format_arn(
+            service='ecr',
+            resource='repository',
+            resource_name=f'{CACHE_REPOSITORY_PREFIX}/{UPSTREAM_REPOSITORY}',
+        )
+
+    def grant_pull(self, role: iam.IRole):
+        """
+        Grant pulling the image through the cache. The first pull creates the repository and imports the image.
+        """
+        self.image_parameter.grant_read(role)
+        role.add_to_principal_policy(iam.PolicyStatement(
+            actions=['ecr:GetAuthorizationToken'],
+            resources=['*'],
+        ))
+        role.add_to_principal_policy(iam.PolicyStatement(
+            actions=[
+                'ecr:BatchCheckLayerAvailability',
+                'ecr:BatchGetImage',
+                'ecr:GetDownloadUrlForLayer',
+                'ecr:BatchImportUpstreamImage',
+                'ecr:CreateRepository',
+            ],
+            resources=[self.repository_arn],
+        ))
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        NagSuppressions.add_resource_suppressions(
+            construct=role,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'ecr:GetAuthorizationToken does not support resource-level permissions.',
+                    'appliesTo': ['Resource::*'],
+                },
+            ],
+            apply_to_children=True,
+        )
@@ -12,6 +12,11 @@ from aws_cdk.aws_s3_assets import Asset
 from cdk_nag import NagSuppressions
 from constructs import Construct
 
+from cdk_packages.boot_pipeline import BootPipeline
+from cdk_packages.bot_bootstrap import BOOTSTRAP_PARAMETER
+from cdk_packages.bot_fleet import BOT_POOL_PARAMETER, IDENTITY_TABLE, fleet_enabled
+from cdk_packages.capacity_profiles import block_devices, capacity_profile, ubuntu_image
+
 dirname = os.path.dirname(__file__)
 
 
@@ -30,55 +35,90 @@ class EC2Instance(Construct):
         self.ec2_instance_role.add_managed_policy(
             iam.ManagedPolicy.from_aws_managed_policy_name('AmazonSSMManagedInstanceCore'))
 
-        # instance to run the Wickr IO Docker container
-        self.ec2_instance = ec2.Instance(
-            self, 'EC2 instance',
-            instance_type=ec2.InstanceType('t2.medium'),
-            machine_image=ec2.MachineImage.generic_linux({
-                'eu-west-1': 'ami-0095aed963d3ed501',
-                # Canonical, Ubuntu, 22.04 LTS, amd64 jammy image build on 2024-01-24
-                'eu-west-2': 'ami-04d9351fa78a6efea',
-                # Canonical, Ubuntu, 22.04 LTS, amd64 jammy image build on 2024-01-26
-                'eu-central-1': 'ami-026c3177c9bd54288',
-                # Canonical, Ubuntu, 22.04 LTS, amd64 jammy image build on 2024-04-11
-            }),
-            vpc=params.network.vpc,
-            vpc_subnets=ec2.SubnetSelection(
-                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS,
-            ),
-            require_imdsv2=True,
-            role=self.ec2_instance_role,
-            block_devices=[
-                ec2.BlockDevice(
-                    device_name='/dev/sda1',
-                    volume=ec2.BlockDeviceVolume.ebs(
-                        10,
-                        volume_type=ec2.EbsDeviceVolumeType.GP3,
-                        encrypted=True
-                    )
-                )
-            ],
-        )
+        # Boot pipeline, runs as UserData at the first boot and as start script at every reboot
+        self.fleet = fleet_enabled(self.node)
+        self.profile = capacity_profile(self.node)
+        self.container_name = 'WickrIOGenAIAssistant'
+        start_script_parameter_name = '/Wickr-GenAI-Chatbot/wickr-io-start-script'
+        boot_pipeline = BootPipeline({
+            'node_major': '16',
+            'start_script_parameter': start_script_parameter_name,
+            'start_script_path': '/start_wickrio.sh',
+            'iam_user_secret': 'WickrIO-IAM-User-Secret',
+            'config_secret': 'WickrIO-Config',
+            'bootstrap_parameter': BOOTSTRAP_PARAMETER,
+            'bot_pool_parameter': BOT_POOL_PARAMETER,
+            'identity_table': IDENTITY_TABLE,
+            'container_name': self.container_name,
+            'container_cpus': self.profile['container_cpus'],
+            'container_memory': self.profile['container_memory'],
+            'node_heap_mb': self.profile['node_heap_mb'],
+        })
+        boot_pipeline.add_phase('packages', once=True)
+        boot_pipeline.add_phase('reboot-hook', once=True)
+        if self.fleet:
+            # every instance of the fleet runs the bot identity it claims from the pool
+            boot_pipeline.add_phase('claim-identity', once=True)
+        boot_pipeline.add_phase('aws-credentials')
+        boot_pipeline.add_phase('wickrio-container')
+        self.boot_script = boot_pipeline.render()
+        self.boot_log_file = boot_pipeline.variables['log_file']
 
         # Upload script for starting Wickr IO at every reboot
         start_wickrio_script = Asset(
             self, 'asset Wickr IO start script',
-            path=os.path.join(dirname, 'assets', 'start_wickrio.sh')
+            path=boot_pipeline.write('start_wickrio.sh')
         )
         start_wickrio_script.grant_read(self.ec2_instance_role)
-        ssm.StringParameter(
+        self.start_script_parameter = ssm.StringParameter(
             self, 'Wickr IO start script',
-            parameter_name='/Wickr-GenAI-Chatbot/wickr-io-start-script',
+            parameter_name=start_script_parameter_name,
             string_value=start_wickrio_script.s3_object_url,
-        ).grant_read(self.ec2_instance_role)
-
-        # Instance startup script (UserData)
-        self.ec2_instance.user_data.add_commands(
-            open(os.path.join(os.path.dirname(__file__), 'assets', 'setup.sh')).read()
         )
+        self.start_script_parameter.grant_read(self.ec2_instance_role)
+        params.container_image.grant_pull(self.ec2_instance_role)
+        # configuration and IAM user of the foundation stack
+        params.wickrio_config.grant_read(self.ec2_instance_role)
+        params.iam_user.wickrio_user_secret.grant_read(self.ec2_instance_role)
 
-        # Output EC2 instance ID
-        cdk.CfnOutput(self, 'EC2 Instance ID', value=self.ec2_instance.instance_id)
+        # in fleet mode the instances are launched by the Auto Scaling group of BotFleet
+        self.instance_type = ec2.InstanceType(self.profile['instance_type'])
+        self.machine_image = ubuntu_image(self.profile)
+        self.block_devices = block_devices(self.profile)
+        self.ec2_instance = None
+        if not self.fleet:
+            # instance to run the Wickr IO Docker container
+            self.ec2_instance = ec2.Instance(
+                self, 'EC2 instance',
+                instance_type=self.instance_type,
+                machine_image=self.machine_image,
+                vpc=params.network.vpc,
+                vpc_subnets=ec2.SubnetSelection(
+                    subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS,
+                ),
+                role=self.ec2_instance_role,
+                detailed_monitoring=True,
+            )
+            self.ec2_instance.node.add_dependency(self.start_script_parameter, params.container_image)
+
+            # AWS::EC2::Instance can't set the throughput of a volume, the root volume is defined by a launch template.
+            # The template also requires IMDSv2, with require_imdsv2 the instance would get a second launch template.
+            launch_template = ec2.LaunchTemplate(
+                self, 'instance launch template',
+                launch_template_name='WickrIO-Instance',
+                block_devices=self.block_devices,
+                require_imdsv2=True,
+            )
+            self.ec2_instance.instance.add_property_override('LaunchTemplate', {
+                'LaunchTemplateId': launch_template.launch_template_id,
+                'Version': launch_template.latest_version_number,
+            })
+
+            # Instance startup script (UserData)
+            self.ec2_instance.user_data.add_commands(self.boot_script)
+
+            # Output EC2 instance ID
+            cdk.CfnOutput(self, 'EC2 Instance ID', value=self.ec2_instance.instance_id)
 
         # ----------------------------------------------------------------
         #       cdk_nag suppressions
@@ -93,23 +133,33 @@ class EC2Instance(Construct):
                               'https://aws.amazon.com/blogs/mt/applying-managed-instance-policy-best-practices/.',
                     'appliesTo': ['Policy::arn:<AWS::Partition>:iam::aws:policy/AmazonSSMManagedInstanceCore'],
                 },
-            ],
-            apply_to_children=True,
-        )
-
-        NagSuppressions.add_resource_suppressions(
-            construct=self.ec2_instance,
-            suppressions=[
-                {
-                    'id': 'AwsSolutions-EC28',
-                    'reason': 'Detailed monitoring for EC2 instance/AutoScaling not required. This is only a '
-                              'demonstration EC2 instance.',
-                },
                 {
-                    'id': 'AwsSolutions-EC29',
-                    'reason': 'ASG and has Termination Protection are not required.  This is only a '
-                              'demonstration EC2 instance.',
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'Default read permissions generated by using CDK function grant_read().',
+                    'appliesTo': [
+                        'Action::s3:GetBucket*',
+                        'Action::s3:GetObject*',
+                        'Action::s3:List*',
+                    ]
                 },
             ],
             apply_to_children=True,
         )
+
+        if self.ec2_instance:
+            NagSuppressions.add_resource_suppressions(
+                construct=self.ec2_instance,
+                suppressions=[
+                    {
+                        'id': 'AwsSolutions-EC29',
+                        'reason': 'ASG and has Termination Protection are not required.  This is only a '
+                                  'demonstration EC2 instance.',
+                    },
+                    {
+                        'id': 'AwsSolutions-EC26',
+                        'reason': 'The root volume is encrypted, it is defined by the launch template of the '
+                                  'instance.',
+                    },
+                ],
+                apply_to_children=True,
+            )
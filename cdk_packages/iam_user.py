@@ -7,7 +7,6 @@ from aws_cdk import (
     SecretValue as SecretValue,
     aws_iam as iam,
 )
-from cdk_nag import NagSuppressions
 from constructs import Construct
 
 dirname = os.path.dirname(__file__)
@@ -32,27 +31,6 @@ class IamUser(Construct):
                 'iam_user_name': SecretValue.unsafe_plain_text(self.wickrio_user.user_name)
             },
         )
-        self.wickrio_user_secret.grant_read(params.wickrio_instance.ec2_instance_role)
-        params.wickrio_code.integration_code.bucket.grant_read(self.wickrio_user)
-        params.wickrio_config.wickrio_config.grant_read(self.wickrio_user)
-
-        # ----------------------------------------------------------------
-        #       cdk_nag suppressions
-        # ----------------------------------------------------------------
-
-        NagSuppressions.add_resource_suppressions(
-            construct=self.wickrio_user,
-            suppressions=[
-                {
-                    'id': 'AwsSolutions-IAM5',
-                    'reason': 'Default read and write permissions generated by using CDK function grant_read().',
-                    'appliesTo': [
-                        'Action::s3:GetBucket*',
-                        'Action::s3:GetObject*',
-                        'Action::s3:List*',
-                        f'Resource::arn:aws:s3:::{params.wickrio_code.integration_code.bucket.bucket_name}/*',
-                    ]
-                },
-            ],
-            apply_to_children=True,
-        )
+        for config_secret in params.wickrio_config.config_secrets:
+            config_secret.grant_read(self.wickrio_user)
+
@@ -49,7 +49,7 @@ class IamUserRotation(Construct):
             retention=logs.RetentionDays.THREE_MONTHS,
         )
         log_group.grant_write(lambda_role)
-        secret_rotation = lambda_.Function(
+        self.secret_rotation = secret_rotation = lambda_.Function(
             self, 'Secrets rotation - lambda function',
             role=lambda_role,
             code=lambda_.Code.from_asset(os.path.join(dirname, 'assets', 'lambda_functions', 'secret_rotation_iam')),
@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 
+import aws_cdk as cdk
 from aws_cdk import (
     aws_ec2 as ec2,
+    aws_s3 as s3,
 )
+from cdk_nag import NagSuppressions
 from constructs import Construct
 
+from cdk_packages.bot_fleet import fleet_enabled
+
 
 class Network(Construct):
 
@@ -27,8 +32,98 @@ class Network(Construct):
         )
         self.subnets = self.vpc.select_subnets()
 
-        self.vpc.add_flow_log(
-            'FlowLogCloudWatch',
-            traffic_type=ec2.FlowLogTrafficType.ALL,
-            max_aggregation_interval=ec2.FlowLogMaxAggregationInterval.TEN_MINUTES
-        )
+        # Keep the traffic to the AWS APIs used by the instance and the bot inside the VPC, only the Wickr
+        # service and the package repositories are reached through the NAT gateway.
+        # AppSync has no endpoint here: private DNS of an AppSync endpoint resolves all AppSync APIs of the
+        # region to the endpoint, which only serves private APIs. The GenAI chatbot API is public.
+        private_subnets = ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS)
+        for name, service in (
+            ('S3', ec2.GatewayVpcEndpointAwsService.S3),
+            ('DynamoDB', ec2.GatewayVpcEndpointAwsService.DYNAMODB),
+        ):
+            self.vpc.add_gateway_endpoint(f'{name} endpoint', service=service, subnets=[private_subnets])
+        interface_endpoints = [
+            ('SSM', ec2.InterfaceVpcEndpointAwsService.SSM),
+            ('SSM messages', ec2.InterfaceVpcEndpointAwsService.SSM_MESSAGES),
+            ('EC2 messages', ec2.InterfaceVpcEndpointAwsService.EC2_MESSAGES),
+            ('Secrets Manager', ec2.InterfaceVpcEndpointAwsService.SECRETS_MANAGER),
+            ('STS', ec2.InterfaceVpcEndpointAwsService.STS),
+            ('CloudWatch Logs', ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS),
+            ('CloudWatch', ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_MONITORING),
+            ('Cognito', ec2.InterfaceVpcEndpointAwsService.COGNITO_IDP),
+            # Wickr IO container image, see ContainerImage, the layers are downloaded through the S3 endpoint
+            ('ECR', ec2.InterfaceVpcEndpointAwsService.ECR),
+            ('ECR Docker', ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER),
+        ]
+        if fleet_enabled(self.node):
+            # instances of the fleet look up the holder of a bot identity
+            interface_endpoints.append(('EC2', ec2.InterfaceVpcEndpointAwsService.EC2))
+        for name, service in interface_endpoints:
+            self.vpc.add_interface_endpoint(
+                f'{name} endpoint',
+                service=service,
+                subnets=private_subnets,
+                private_dns_enabled=True,
+            )
+
+        # Flow logs go to CloudWatch Logs by default. For high traffic deploy with
+        # cdk deploy --context flow_log_destination=s3 --context flow_log_traffic_type=REJECT ...
+        # to write them to S3 as Parquet files in hourly, Hive compatible partitions (ready for Athena).
+        traffic_type = ec2.FlowLogTrafficType[self.node.try_get_context('flow_log_traffic_type') or 'ALL']
+        self.flow_log_bucket = None
+        if self.node.try_get_context('flow_log_destination') == 's3':
+            self.flow_log_bucket = s3.Bucket(
+                self, 'flow log bucket',
+                encryption=s3.BucketEncryption.S3_MANAGED,
+                block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+                enforce_ssl=True,
+                removal_policy=cdk.RemovalPolicy.DESTROY,
+                auto_delete_objects=True,
+                lifecycle_rules=[
+                    s3.LifecycleRule(
+                        transitions=[
+                            s3.Transition(
+                                storage_class=s3.StorageClass.INFREQUENT_ACCESS,
+                                transition_after=cdk.Duration.days(30),
+                            ),
+                        ],
+                        expiration=cdk.Duration.days(int(self.node.try_get_context('flow_log_retention_days') or 365)),
+                        abort_incomplete_multipart_upload_after=cdk.Duration.days(1),
+                    ),
+                ],
+            )
+            self.vpc.add_flow_log(
+                'FlowLogS3',
+                destination=ec2.FlowLogDestination.to_s3(
+                    self.flow_log_bucket,
+                    'flow-logs/',
+                    file_format=ec2.FlowLogFileFormat.PARQUET,
+                    hive_compatible_partitions=True,
+                    per_hour_partition=True,
+                ),
+                traffic_type=traffic_type,
+                max_aggregation_interval=ec2.FlowLogMaxAggregationInterval.TEN_MINUTES
+            )
+        else:
+            self.vpc.add_flow_log(
+                'FlowLogCloudWatch',
+                traffic_type=traffic_type,
+                max_aggregation_interval=ec2.FlowLogMaxAggregationInterval.TEN_MINUTES
+            )
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        if self.flow_log_bucket:
+            NagSuppressions.add_resource_suppressions(
+                construct=self.flow_log_bucket,
+                suppressions=[
+                    {
+                        'id': 'AwsSolutions-S1',
+                        'reason': 'The bucket only holds VPC flow logs. Server access logs of the log bucket are not '
+                                  'required.',
+                    },
+                ],
+                apply_to_children=True,
+            )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_cloudwatch_actions as cloudwatch_actions,
+    aws_sns as sns,
+    aws_sns_subscriptions as sns_subscriptions,
+)
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+# Alarm thresholds, each can be overridden with: cdk deploy --context <name>=<value> ...
+ALARM_THRESHOLDS = {
+    'alarm_reply_latency_p90_ms': 20_000,
+    'alarm_chatbot_api_errors': 5,
+    'alarm_chatbot_api_throttles': 1,
+    'alarm_websocket_reconnects': 10,
+    'alarm_rotation_duration_ms': 30_000,
+    'alarm_cpu_percent': 80,
+    'alarm_memory_percent': 85,
+}
+
+PERIOD = cdk.Duration.minutes(5)
+
+
+class PerformanceDashboard(Construct):
+    """
+    CloudWatch dashboard of the message path: reply latency of the bot, errors and throttles of the chatbot API,
+    WebSocket reconnects, durations of the secret rotation Lambda functions and CPU and memory of the instances.
+    Alarms notify the e-mail address given with --context alarm_email=... .
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        thresholds = {
+            name: float(self.node.try_get_context(name) or default) for name, default in ALARM_THRESHOLDS.items()
+        }
+        agent = params.cloudwatch_agent
+
+        # bot metrics, extracted from the bot log by the metric filters of CloudWatchAgent
+        reply_latency = {
+            statistic: agent.reply_latency_filter.metric(statistic=statistic, period=PERIOD, label=statistic)
+            for statistic in ('p50', 'p90', 'p99')
+        }
+        chatbot_api_errors = agent.chatbot_api_error_filter.metric(statistic='Sum', period=PERIOD)
+        chatbot_api_throttles = agent.chatbot_api_throttle_filter.metric(statistic='Sum', period=PERIOD)
+        websocket_reconnects = agent.websocket_reconnect_filter.metric(statistic='Sum', period=PERIOD)
+        model_fallbacks = agent.model_fallback_filter.metric(statistic='Sum', period=PERIOD)
+
+        # the chatbot API as seen by AppSync
+        appsync_metrics = [
+            cloudwatch.Metric(
+                namespace='AWS/AppSync',
+                metric_name=metric_name,
+                dimensions_map={'GraphQLAPIId': params.appsync_cfg.graphql_api_id},
+                statistic='Sum',
+                period=PERIOD,
+            )
+            for metric_name in ('4XXError', '5XXError')
+        ]
+
+        rotation_functions = {
+            'IAM user': params.iam_user_rotation.secret_rotation,
+            'Cognito user': params.cognito_user_rotation.secret_rotation,
+        }
+
+        # instance metrics, of the single instance or aggregated over the fleet
+        if params.wickrio_instance.ec2_instance:
+            instance_dimensions = {'InstanceId': params.wickrio_instance.ec2_instance.instance_id}
+        else:
+            instance_dimensions = {'AutoScalingGroupName': params.bot_fleet.auto_scaling_group.auto_scaling_group_name}
+        cpu = cloudwatch.Metric(
+            namespace='AWS/EC2', metric_name='CPUUtilization', dimensions_map=instance_dimensions,
+            statistic='Average', period=PERIOD,
+        )
+        memory = cloudwatch.Metric(
+            namespace='CWAgent', metric_name='mem_used_percent', dimensions_map=instance_dimensions,
+            statistic='Average', period=PERIOD,
+        )
+
+        # ----------------------------------------------------------------
+        #       alarms
+        # ----------------------------------------------------------------
+
+        self.alarms = [
+            reply_latency['p90'].create_alarm(
+                self, 'reply latency',
+                alarm_description='p90 of the time from receiving a Wickr message to sending the reply.',
+                threshold=thresholds['alarm_reply_latency_p90_ms'],
+                evaluation_periods=3,
+                datapoints_to_alarm=2,
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            ),
+            chatbot_api_errors.create_alarm(
+                self, 'chatbot API errors',
+                alarm_description='Failed GraphQL requests of the bot to the chatbot API.',
+                threshold=thresholds['alarm_chatbot_api_errors'],
+                evaluation_periods=1,
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            ),
+            chatbot_api_throttles.create_alarm(
+                self, 'chatbot API throttles',
+                alarm_description='GraphQL requests of the bot rejected because of throttling.',
+                threshold=thresholds['alarm_chatbot_api_throttles'],
+                comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                evaluation_periods=1,
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            ),
+            websocket_reconnects.create_alarm(
+                self, 'WebSocket reconnects',
+                alarm_description='Reconnects of the AppSync realtime WebSocket connection.',
+                threshold=thresholds['alarm_websocket_reconnects'],
+                evaluation_periods=1,
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            ),
+            cpu.create_alarm(
+                self, 'CPU utilization',
+                alarm_description='CPU utilization of the Wickr IO instances.',
+                threshold=thresholds['alarm_cpu_percent'],
+                evaluation_periods=3,
+            ),
+            memory.create_alarm(
+                self, 'memory utilization',
+                alarm_description='Memory utilization of the Wickr IO instances, reported by the CloudWatch agent.',
+                threshold=thresholds['alarm_memory_percent'],
+                evaluation_periods=3,
+                treat_missing_data=cloudwatch.TreatMissingData.MISSING,
+            ),
+        ]
+        for name, function in rotation_functions.items():
+            self.alarms.append(function.metric_duration(statistic='Maximum', period=PERIOD).create_alarm(
+                self, f'{name} rotation duration',
+                alarm_description=f'Duration of the {name} secret rotation, the function times out after 1 minute.',
+                threshold=thresholds['alarm_rotation_duration_ms'],
+                evaluation_periods=1,
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            ))
+
+        alarm_email = self.node.try_get_context('alarm_email')
+        self.alarm_topic = None
+        if alarm_email:
+            self.alarm_topic = sns.Topic(self, 'alarm topic', enforce_ssl=True)
+            self.alarm_topic.add_subscription(sns_subscriptions.EmailSubscription(alarm_email))
+            for alarm in self.alarms:
+                alarm.add_alarm_action(cloudwatch_actions.SnsAction(self.alarm_topic))
+
+        # ----------------------------------------------------------------
+        #       dashboard
+        # ----------------------------------------------------------------
+
+        self.dashboard = cloudwatch.Dashboard(
+            self, 'dashboard',
+            dashboard_name=f'{cdk.Stack.of(self).stack_name}-performance',
+            default_interval=cdk.Duration.hours(3),
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.AlarmStatusWidget(title='Alarms', alarms=self.alarms, width=24, height=3),
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title='Reply latency (ms)',
+                left=list(reply_latency.values()),
+                left_annotations=[cloudwatch.HorizontalAnnotation(
+                    value=thresholds['alarm_reply_latency_p90_ms'], label='p90 alarm')],
+                width=12,
+            ),
+            cloudwatch.GraphWidget(
+                title='Chatbot API errors and throttles',
+                left=[chatbot_api_errors.with_(label='bot: errors'),
+                      chatbot_api_throttles.with_(label='bot: throttles'),
+                      model_fallbacks.with_(label='bot: model fallbacks')],
+                right=[metric.with_(label=f'AppSync: {metric.metric_name}') for metric in appsync_metrics],
+                width=12,
+            ),
+        )
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title='WebSocket reconnects',
+                left=[websocket_reconnects],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title='Secret rotation duration (ms)',
+                left=[function.metric_duration(statistic='Maximum', period=PERIOD, label=name)
+                      for name, function in rotation_functions.items()],
+                width=8,
+            ),
+            cloudwatch.GraphWidget(
+                title='Instance CPU and memory (%)',
+                left=[cpu.with_(label='CPU'), memory.with_(label='memory')],
+                left_y_axis=cloudwatch.YAxisProps(min=0, max=100),
+                width=8,
+            ),
+        )
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        if self.alarm_topic:
+            NagSuppressions.add_resource_suppressions(
+                construct=self.alarm_topic,
+                suppressions=[
+                    {
+                        'id': 'AwsSolutions-SNS2',
+                        'reason': 'The topic only carries alarm notifications. CloudWatch alarms can not publish to '
+                                  'a topic encrypted with the AWS managed key.',
+                    },
+                ],
+            )
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os.path
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_dynamodb as dynamodb,
+    aws_lambda as lambda_,
+    aws_logs as logs,
+    aws_ssm as ssm,
+    custom_resources as cr,
+)
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+import cdk_packages.utils as utils
+import cdk_packages.genai_chatbot_params as genai_chatbot_params
+
+dirname = os.path.dirname(__file__)
+
+RAG_WORKSPACE_ID_PARAMETER = '/Wickr-GenAI-Chatbot/rag-workspace-id'
+# value of the parameter if the workspace doesn't exist, SSM parameters can't be empty
+NO_WORKSPACE_ID = 'none'
+
+
+class RagWorkspace(Construct):
+    """
+    Resolves GEN_AI_CHATBOT_RAG_WORKSPACE_NAME to the ID of the workspace at deployment time. The ID is published in
+    SSM Parameter Store and in the bootstrap document, the bot starts with this workspace selected. Without the
+    workspace the ID is empty (NO_WORKSPACE_ID in the parameter) and the bot starts without workspace.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, params=None):
+        super().__init__(scope, construct_id)
+
+        # Get the DynamoDB table with the RAG workspaces of the AWS GenAI Chatbot.
+        self.table_name = utils.get_rag_workspaces_table_name(
+            genai_chatbot_params.GEN_AI_CHATBOT_RAG_WORKSPACES_TABLE_NAME)
+        self.table = dynamodb.Table.from_table_name(self, 'RagWorkspacesTable', table_name=self.table_name)
+        self.workspace_name = genai_chatbot_params.GEN_AI_CHATBOT_RAG_WORKSPACE_NAME
+
+        # CDK custom resource for the workspace ID, scans the workspaces table
+        event_handler_log_group = logs.LogGroup(
+            self, 'Custom resource - RAG workspace - log group',
+            retention=logs.RetentionDays.THREE_MONTHS,
+        )
+        event_handler_fn = lambda_.Function(
+            self, 'Custom resource - RAG workspace - lambda function',
+            code=lambda_.Code.from_asset(os.path.join(dirname, 'assets', 'lambda_functions', 'cr_rag_workspace')),
+            handler='cr_rag_workspace.on_event',
+            timeout=cdk.Duration.minutes(1),
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            log_group=event_handler_log_group,
+        )
+        self.table.grant(event_handler_fn, 'dynamodb:Scan')
+        cr_provider = cr.Provider(
+            self, 'Custom resource - RAG workspace - provider',
+            on_event_handler=event_handler_fn,
+        )
+        # a new name or table resolves the ID again, a recreated workspace with the same name needs a change of
+        # the name or a replacement of this resource
+        workspace = cdk.CustomResource(
+            self, 'Custom resource - RAG workspace',
+            service_token=cr_provider.service_token,
+            properties={
+                'WorkspaceName': self.workspace_name,
+                'WorkspacesTableName': self.table_name,
+            },
+        )
+        self.workspace_id = workspace.get_att_string('WorkspaceId')
+
+        # read by the compute stack at deployment time, like the Cognito user ID
+        self.workspace_id_parameter = ssm.StringParameter(
+            self, 'Parameter - RAG workspace ID',
+            parameter_name=RAG_WORKSPACE_ID_PARAMETER,
+            string_value=workspace.get_att_string('WorkspaceIdParameterValue'),
+            description=f'ID of RAG workspace {self.workspace_name}.',
+        )
+        self.workspace_id_parameter.grant_read(params.iam_user.wickrio_user)
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        NagSuppressions.add_resource_suppressions(
+            construct=event_handler_fn,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM4',
+                    'reason': 'We are using default AWS managed policy for Lambda execution role: '
+                              'https://docs.aws.amazon.com/aws-managed-policy/latest/reference/AWSLambdaBasicExecutionRole.html',
+                    'appliesTo': [
+                        'Policy::arn:<AWS::Partition>:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'],
+                },
+                {
+                    'id': 'AwsSolutions-L1',
+                    'reason': 'Python 3.12 is the latest version supported by AWS Lambda (as of 2024-02-10).',
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        NagSuppressions.add_resource_suppressions_by_path(
+            cdk.Stack.of(self),
+            path=f'{cr_provider.node.path}/framework-onEvent/Resource',
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-L1',
+                    'reason': 'Python 3.12 is the latest version supported by AWS Lambda (as of 2024-02-10).',
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        NagSuppressions.add_resource_suppressions_by_path(
+            cdk.Stack.of(self),
+            path=f'{cr_provider.node.path}/framework-onEvent/ServiceRole/Resource',
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM4',
+                    'reason': 'We are using default AWS managed policy for Lambda execution role: '
+                              'https://docs.aws.amazon.com/aws-managed-policy/latest/reference/AWSLambdaBasicExecutionRole.html',
+                    'appliesTo': [
+                        'Policy::arn:<AWS::Partition>:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'],
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        NagSuppressions.add_resource_suppressions_by_path(
+            cdk.Stack.of(self),
+            path=f'{cr_provider.node.path}/framework-onEvent/ServiceRole/DefaultPolicy/Resource',
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-IAM5',
+                    'reason': 'The framework function invokes all versions of the event handler function.',
+                    'appliesTo': [{'regex': '/^Resource::<.+RAGworkspacelambdafunction.+\\.Arn>:\\*$/'}],
+                },
+            ],
+            apply_to_children=True,
+        )
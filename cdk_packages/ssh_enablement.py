@@ -24,8 +24,11 @@ class SSHEnablement(Construct):
             description='allow SSH access from EC2 Instance Connection Endpoint',
         )
 
-        # add security group to EC2 instance
-        params.wickrio_instance.ec2_instance.add_security_group(ssh_sg)
-
-        # add SSH key to EC2 instance
-        params.wickrio_instance.ec2_instance.instance.add_property_override('KeyName', 'ec2-ssh-access-eu-west-1')
+        # add security group and SSH key to EC2 instance, or to the instances of the fleet
+        if params.wickrio_instance.fleet:
+            params.bot_fleet.launch_template.add_security_group(ssh_sg)
+            params.bot_fleet.launch_template.node.default_child.add_property_override(
+                'LaunchTemplateData.KeyName', 'ec2-ssh-access-eu-west-1')
+        else:
+            params.wickrio_instance.ec2_instance.add_security_group(ssh_sg)
+            params.wickrio_instance.ec2_instance.instance.add_property_override('KeyName', 'ec2-ssh-access-eu-west-1')
@@ -3,15 +3,22 @@
 import aws_cdk as cdk
 from constructs import Construct
 
+from cdk_packages.container_image import ContainerImage
 from cdk_packages.ec2_instance import EC2Instance
 from cdk_packages.network import Network
 from cdk_packages.wickrio_code import WickrIOCode
 from cdk_packages.wickrio_config import WickrIOConfig
 from cdk_packages.iam_user import IamUser
 from cdk_packages.iam_user_rotation import IamUserRotation
+from cdk_packages.rag_workspace import RagWorkspace
 from cdk_packages.cognito_user import CognitoUser
 from cdk_packages.cognito_user_rotation import CognitoUserRotation
 from cdk_packages.appsync_cfg import AppSyncCfg
+from cdk_packages.bot_bootstrap import BotBootstrap
+from cdk_packages.bot_fleet import BotFleet
+from cdk_packages.cloudwatch_agent import CloudWatchAgent
+from cdk_packages.code_update import CodeUpdate
+from cdk_packages.performance_dashboard import PerformanceDashboard
 from cdk_packages.ec2_instance_connect_endpoint import EC2InstanceConnectEndpoint
 from cdk_packages.ssh_enablement import SSHEnablement
 
@@ -23,22 +30,49 @@ class Params:
 
 
 class WickrGenaiChatbotStack(cdk.Stack):
+    """
+    Foundation stack with the long-lived resources: network, Wickr IO configuration, IAM and Cognito users, their
+    secrets and rotation and the AppSync configuration. The compute stack refers to them through stack exports.
+    """
 
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        params = Params()
+        self.params = params = Params()
 
         params.network = Network(self, 'Network', params)
-        params.wickrio_instance = EC2Instance(self, 'EC2 instance', params)
-        params.wickrio_code = WickrIOCode(self, 'Wickr IO code', params)
         params.wickrio_config = WickrIOConfig(self, 'Wickr IO config', params)
         params.iam_user = IamUser(self, 'Wickr IO IAM user', params)
         params.iam_user_rotation = IamUserRotation(self, 'Wickr IO IAM user rotation', params)
+        params.rag_workspace = RagWorkspace(self, 'RAG workspace', params)
         params.cognito_user = CognitoUser(self, 'Wickr IO Cognito user', params)
         params.cognito_user_rotation = CognitoUserRotation(self, 'Wickr IO Cognito user rotation', params)
         params.appsync_cfg = AppSyncCfg(self, 'AppSync Configuration', params)
 
+
+class WickrGenaiChatbotComputeStack(cdk.Stack):
+    """
+    Compute stack with the Wickr IO instance or fleet, the container image, the integration code and the monitoring.
+    A change of the integration code only updates this stack.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, foundation: WickrGenaiChatbotStack, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        params = foundation.params
+        # the compute stack also reads parameters of the foundation stack by name, see BotBootstrap
+        self.add_dependency(foundation)
+
+        params.container_image = ContainerImage(self, 'Container image', params)
+        params.wickrio_instance = EC2Instance(self, 'EC2 instance', params)
+        params.wickrio_code = WickrIOCode(self, 'Wickr IO code', params)
+        if params.wickrio_instance.fleet:
+            params.bot_fleet = BotFleet(self, 'Bot fleet', params)
+        params.cloudwatch_agent = CloudWatchAgent(self, 'CloudWatch agent', params)
+        params.bot_bootstrap = BotBootstrap(self, 'Bot bootstrap', params)
+        params.code_update = CodeUpdate(self, 'Code update', params)
+        params.performance_dashboard = PerformanceDashboard(self, 'Performance dashboard', params)
+
         # Enable SSH access to EC2 instance for troubleshooting
         params.ec2_instance_connection_endpoint = EC2InstanceConnectEndpoint(
             self, 'EC2 Instance Connection Endpoint', params)
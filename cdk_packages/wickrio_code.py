@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 
+import gzip
+import hashlib
+import io
 import os.path
+import shutil
+import subprocess
 import tarfile
 import re
 
 import aws_cdk as cdk
 from aws_cdk import (
+    aws_iam as iam,
+    aws_s3 as s3,
+    aws_s3_deployment as s3deploy,
     aws_ssm as ssm,
 )
 from aws_cdk.aws_s3_assets import Asset
@@ -14,37 +22,158 @@ from constructs import Construct
 
 dirname = os.path.dirname(__file__)
 
+INTEGRATIONS_FOLDER = 'wickrio-integrations'
+
+# not part of the deployed integration code
+EXCLUDE = ['.idea', 'node_modules', '__tests__', 'tests', 'coverage', 'loadtest']
+# SHA-256 of the package.json the node_modules of the archive are installed for, in the format of sha256sum. The
+# files of the archive have no modification times, install.sh compares the checksum to decide whether to run npm.
+NODE_MODULES_STAMP = 'node_modules/.package.json.sha256'
+
+# node_modules are built for the Node.js version and platform of the Wickr IO container, the
+# architecture follows the capacity profile of the instance. Pinned by digest together with package-lock.json by
+# scripts/lock-node-dependencies.sh.
+NODE_BUILD_IMAGE = 'node:16'
+
+
+def root_owned(tarinfo):
+    # The Wickr IO container runs the integration code as root. Files owned by another user or without
+    # execution permission make the container fail with an error like this:
+    # "CONSOLE:Failed to run /opt/WickrIO/clients/genai-advisor-bot/integration/genai-advisor-bot/install.sh"
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = 'root'
+    # without modification times the asset hash only changes with the code, not with a fresh checkout
+    tarinfo.mtime = 0
+    if tarinfo.isdir() or tarinfo.name.endswith(('.sh', '.js')):
+        tarinfo.mode = 0o755
+    return tarinfo
+
+
+def build_node_modules(source_dir: str, platform: str = 'linux/amd64') -> str:
+    """
+    Install the production dependencies of the integration code as locked by package-lock.json in a Docker
+    container matching the Wickr IO container. The result is cached in assets/build/node_modules by a hash of
+    package.json, package-lock.json and the build image.
+
+    :return: path of the node_modules directory, None if Docker is not available
+    """
+    dependency_files = ['package.json', 'package-lock.json']
+    build_hash = hashlib.sha256(f'{NODE_BUILD_IMAGE} {platform}'.encode())
+    for f in dependency_files:
+        with open(os.path.join(source_dir, f), 'rb') as dependency_file:
+            build_hash.update(dependency_file.read())
+    cache_dir = os.path.join(dirname, 'assets', 'build', 'node_modules', build_hash.hexdigest()[:16])
+    node_modules = os.path.join(cache_dir, 'node_modules')
+    if os.path.isdir(node_modules):
+        return node_modules
+
+    if shutil.which('docker') is None:
+        return None
+    staging_dir = f'{cache_dir}.staging'
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    for f in dependency_files:
+        shutil.copy(os.path.join(source_dir, f), staging_dir)
+    subprocess.run(
+        [
+            'docker', 'run', '--rm', '--platform', platform,
+            '--user', f'{os.getuid()}:{os.getgid()}', '--env', 'HOME=/tmp',
+            '--volume', f'{os.path.abspath(staging_dir)}:/build', '--workdir', '/build',
+            NODE_BUILD_IMAGE,
+            'npm', 'ci', '--omit=dev', '--no-audit', '--no-fund',
+        ],
+        check=True,
+    )
+    os.replace(staging_dir, cache_dir)
+    return node_modules
+
+
+def write_code_archive(source_dir: str, archive_path: str, node_modules: str = None):
+    """
+    Write the integration code, ready to be run by the Wickr IO container, to a tar.gz archive. The archive only
+    depends on the content of the files, see also CodeUpdate.
+    """
+    exclude_pattern = f'(?:{"|".join(EXCLUDE)})'
+    # without a timestamp in the gzip header
+    with gzip.GzipFile(archive_path, 'wb', mtime=0) as archive, tarfile.open(fileobj=archive, mode='w') as tar:
+        tar.add(
+            source_dir,
+            arcname='',
+            filter=lambda tarinfo: None if re.match(exclude_pattern, tarinfo.name) else root_owned(tarinfo)
+        )
+        if node_modules:
+            tar.add(node_modules, arcname='node_modules', filter=root_owned)
+            with open(os.path.join(source_dir, 'package.json'), 'rb') as package_json:
+                stamp = f'{hashlib.sha256(package_json.read()).hexdigest()}  package.json\n'.encode()
+            tarinfo = root_owned(tarfile.TarInfo(NODE_MODULES_STAMP))
+            tarinfo.size = len(stamp)
+            tar.addfile(tarinfo, io.BytesIO(stamp))
+
 
 class WickrIOCode(Construct):
 
     def __init__(self, scope: Construct, construct_id: str, params=None):
         super().__init__(scope, construct_id)
 
-        # zip the files for the Wickr IO integration code
+        # zip the files for the Wickr IO integration code, ready to be run by the Wickr IO container
 
         source_dir = os.path.join(dirname, '..', 'genai-advisor-bot')
-        output_filename = os.path.join(dirname, 'assets', 'software')
-        exclude = ['.idea', 'node_modules', '__tests__', 'tests', 'coverage']
-        with tarfile.open(f'{output_filename}.tar.gz', 'w:gz') as tar:
-            exclude_pattern = f'(?:{"|".join(exclude)})'
-            tar.add(
-                source_dir,
-                arcname='',
-                filter=lambda tarinfo: None if re.match(exclude_pattern, tarinfo.name) else tarinfo
+        output_dir = os.path.join(dirname, 'assets', 'build', 'integration')
+        os.makedirs(output_dir, exist_ok=True)
+        # without node_modules in the archive, install.sh runs "npm install" at container start
+        node_modules = None
+        if not os.path.exists(os.path.join(source_dir, 'package-lock.json')) or '@sha256:' not in NODE_BUILD_IMAGE:
+            # fails cdk synth and cdk deploy
+            cdk.Annotations.of(self).add_error(
+                'The dependencies of the integration code are not pinned. Run scripts/lock-node-dependencies.sh '
+                'and commit genai-advisor-bot/package-lock.json and the build image digest in NODE_BUILD_IMAGE.'
             )
+        else:
+            node_modules = build_node_modules(
+                source_dir, f'linux/{params.wickrio_instance.profile["architecture"]}')
+            if node_modules is None:
+                cdk.Annotations.of(self).add_warning(
+                    'Docker is not available, the integration code is deployed without node_modules. The '
+                    'dependencies are installed with npm when the Wickr IO container starts.'
+                )
+        write_code_archive(source_dir, os.path.join(output_dir, 'software.tar.gz'), node_modules)
 
-        # upload Wickr IO integration code to CDK S3 bucket
+        # upload Wickr IO integration code to the folder the Wickr IO container reads it from
 
-        self.integration_code = Asset(
-            self, 'asset Wickr IO integration code',
-            path=os.path.join(dirname, 'assets', 'software.tar.gz')
+        self.bucket = s3.Bucket(
+            self, 'bucket',
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl=True,
+            # the deployments retain their objects, the bucket has to be emptied for "cdk destroy"
+            removal_policy=cdk.RemovalPolicy.DESTROY,
+            auto_delete_objects=True,
         )
-        self.integration_code.grant_read(params.wickrio_instance.ec2_instance_role)
-        self.integration_code.bucket.grant_write(params.wickrio_instance.ec2_instance_role)
+        code_asset = Asset(self, 'asset integration code', path=output_dir)
+        self.asset_hash = code_asset.asset_hash
+        # every bot reads the code from its own folder, see also BotFleet
+        self.key_prefixes = []
+        self.deployments = []
+        for bot_user_id in params.wickrio_config.bot_user_ids:
+            key_prefix = f'{INTEGRATIONS_FOLDER}/{bot_user_id}/'
+            self.deployments.append(s3deploy.BucketDeployment(
+                self, 'deployment' if bot_user_id == params.wickrio_config.bot_user_id else f'deployment {bot_user_id}',
+                sources=[s3deploy.Source.bucket(code_asset.bucket, code_asset.s3_object_key)],
+                destination_bucket=self.bucket,
+                destination_key_prefix=key_prefix,
+            ))
+            self.key_prefixes.append(key_prefix)
+        # the IAM user belongs to the foundation stack, the read permission to this stack
+        self.user_policy = iam.Policy(
+            self, 'Wickr IO IAM user policy',
+            users=[params.iam_user.wickrio_user],
+        )
+        for key_prefix in self.key_prefixes:
+            self.bucket.grant_read(self.user_policy, f'{key_prefix}*')
         ssm.StringParameter(
             self, 'Wickr IO integration code',
             parameter_name='/Wickr-GenAI-Chatbot/wickr-io-integration-code',
-            string_value=self.integration_code.s3_object_url
+            string_value=self.bucket.s3_url_for_object(f'{self.key_prefixes[0]}software.tar.gz'),
         ).grant_read(params.wickrio_instance.ec2_instance_role)
 
         # ----------------------------------------------------------------
@@ -52,20 +181,56 @@ class WickrIOCode(Construct):
         # ----------------------------------------------------------------
 
         NagSuppressions.add_resource_suppressions(
-            construct=params.wickrio_instance.ec2_instance_role,
+            construct=self.bucket,
+            suppressions=[
+                {
+                    'id': 'AwsSolutions-S1',
+                    'reason': 'The bucket only holds the integration code deployed by CDK. Server access logs are '
+                              'not required.',
+                },
+            ],
+            apply_to_children=True,
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            construct=self.user_policy,
             suppressions=[
                 {
                     'id': 'AwsSolutions-IAM5',
-                    'reason': 'Default read and write permissions generated by using CDK function grant_write().',
+                    'reason': 'Default read permissions generated by using CDK function grant_read().',
                     'appliesTo': [
                         'Action::s3:GetBucket*',
                         'Action::s3:GetObject*',
                         'Action::s3:List*',
-                        'Action::s3:Abort*',
-                        'Action::s3:DeleteObject*',
-                        f'Resource::arn:aws:s3:::{self.integration_code.bucket.bucket_name}/*',
+                        {'regex': '/^Resource::<.+\\.Arn>\\/wickrio-integrations\\/.+\\/\\*$/'},
                     ]
                 },
             ],
-            apply_to_children=True,
         )
+
+        # the deployment Lambda function is a singleton at stack level
+        for deployment_function in cdk.Stack.of(self).node.children:
+            if not deployment_function.node.id.startswith('Custom::CDKBucketDeployment'):
+                continue
+            NagSuppressions.add_resource_suppressions(
+                construct=deployment_function,
+                suppressions=[
+                    {
+                        'id': 'AwsSolutions-L1',
+                        'reason': 'The runtime of the Lambda function is managed by CDK construct BucketDeployment.',
+                    },
+                    {
+                        'id': 'AwsSolutions-IAM4',
+                        'reason': 'Lambda function role created by CDK construct BucketDeployment.',
+                        'appliesTo': [
+                            'Policy::arn:<AWS::Partition>:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'
+                        ],
+                    },
+                    {
+                        'id': 'AwsSolutions-IAM5',
+                        'reason': 'Default read and write permissions generated by CDK construct BucketDeployment to '
+                                  'copy the asset from the CDK bucket to the integration code bucket.',
+                    },
+                ],
+                apply_to_children=True,
+            )
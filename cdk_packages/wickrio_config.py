@@ -5,6 +5,8 @@ import os.path
 
 import aws_cdk as cdk
 from aws_cdk import (
+    aws_dynamodb as dynamodb,
+    aws_iam as iam,
     aws_secretsmanager as secretsmanager,
     SecretValue as SecretValue,
     aws_ssm as ssm,
@@ -12,6 +14,8 @@ from aws_cdk import (
 from cdk_nag import NagSuppressions
 from constructs import Construct
 
+from cdk_packages.bot_fleet import BOT_POOL_PARAMETER, FLEET_METRICS_NAMESPACE, IDENTITY_TABLE, fleet_enabled
+
 dirname = os.path.dirname(__file__)
 
 
@@ -23,22 +27,102 @@ class WickrIOConfig(Construct):
         # Store Wickr IO configuration in AWS Secrets Manager. The user ID and password for the Wickr IO bot
         # are submitted at deployment time via context:
         # cdk deploy --context bot_user_id=exampleUserID --context bot_password=examplePassword
-        self.bot_user_id = self.node.try_get_context('bot_user_id') if self.node.try_get_context('bot_user_id') else ''
-        bot_password = self.node.try_get_context('bot_password') if self.node.try_get_context('bot_password') else ''
+        # In fleet mode every instance needs its own bot, the pool of bots is submitted as JSON list:
+        # cdk deploy --context fleet=true --context bot_pool='[{"user_id": "...", "password": "..."}, ...]'
+        if fleet_enabled(self.node):
+            bot_pool = json.loads(self.node.try_get_context('bot_pool') or '[]')
+            if not bot_pool:
+                raise ValueError('Fleet mode requires a pool of bots, submitted with --context bot_pool=...')
+            tokens = [
+                {'name': 'CHATBOT_CLOUDWATCH_NAMESPACE', 'value': FLEET_METRICS_NAMESPACE},
+                {'name': 'BOT_FLEET_NAME', 'value': cdk.Stack.of(self).stack_name},
+            ]
+            self.config_secrets = [
+                self.create_config_secret(f'WickrIO Config {bot["user_id"]}', f'WickrIO-Config-{bot["user_id"]}',
+                                   bot['user_id'], bot['password'], tokens)
+                for bot in bot_pool
+            ]
+            self.bot_user_ids = [bot['user_id'] for bot in bot_pool]
+
+            # claims of the bots by the instances of the fleet, see assets/boot/claim_identity.sh
+            self.identity_table = dynamodb.Table(
+                self, 'bot identities',
+                table_name=IDENTITY_TABLE,
+                partition_key=dynamodb.Attribute(name='bot_user_id', type=dynamodb.AttributeType.STRING),
+                billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+                point_in_time_recovery=True,
+                removal_policy=cdk.RemovalPolicy.DESTROY,
+            )
+            self.bot_pool_parameter = ssm.StringParameter(
+                self, 'Wickr IO bot pool',
+                parameter_name=BOT_POOL_PARAMETER,
+                string_value=','.join(self.bot_user_ids),
+            )
+        else:
+            bot_user_id = self.node.try_get_context('bot_user_id') or ''
+            bot_password = self.node.try_get_context('bot_password') or ''
+            self.config_secrets = [
+                self.create_config_secret('WickrIO Config', 'WickrIO-Config', bot_user_id, bot_password)
+            ]
+            self.bot_user_ids = [bot_user_id]
+            self.identity_table = None
+            self.bot_pool_parameter = None
+        self.bot_user_id = self.bot_user_ids[0]
+        self.wickrio_config = self.config_secrets[0]
+
+        self.bot_user_id_parameter = ssm.StringParameter(
+            self, 'Wickr IO bot user ID',
+            parameter_name='/Wickr-GenAI-Chatbot/wickr-io-bot-user-id',
+            string_value=self.bot_user_id
+        )
+
+        # ----------------------------------------------------------------
+        #       cdk_nag suppressions
+        # ----------------------------------------------------------------
+
+        for config_secret in self.config_secrets:
+            NagSuppressions.add_resource_suppressions(
+                construct=config_secret,
+                suppressions=[
+                    {
+                        'id': 'AwsSolutions-SMG4',
+                        'reason': 'No secret rotation configured. The Wickr IO bot user ID and password will be '
+                                  'manually configured in the Wickr Admin console. It is recommendend to change the '
+                                  'Wickr IO bot password at minimum every 90 days. After updating the Wickr IO bot '
+                                  'password, run "cdk deploy" with the updated credentials (see instructions in '
+                                  'README.md).',
+                    },
+                ],
+                apply_to_children=True,
+            )
+
+    def grant_read(self, grantee: iam.IGrantable):
+        """
+        Grant reading the configuration of the bots. In fleet mode also grant claiming a bot of the pool.
+        """
+        for config_secret in self.config_secrets:
+            config_secret.grant_read(grantee)
+        self.bot_user_id_parameter.grant_read(grantee)
+        if self.identity_table:
+            self.identity_table.grant_read_write_data(grantee)
+            self.bot_pool_parameter.grant_read(grantee)
+
+    def create_config_secret(self, construct_id: str, secret_name: str, bot_user_id: str, bot_password: str,
+                             tokens: list = None):
         wickr_config = json.load(open(os.path.join(dirname, 'assets', 'wickr_config.json')))
-        wickr_config['clients'][0]['name'] = self.bot_user_id
+        wickr_config['clients'][0]['name'] = bot_user_id
         wickr_config['clients'][0]['password'] = bot_password
-        wickr_config['clients'][0]['integration'] = self.bot_user_id
+        wickr_config['clients'][0]['integration'] = bot_user_id
         wickr_config['clients'][0]['tokens'].append(
             {
                 'name': 'CLIENT_NAME',
-                'value': self.bot_user_id
+                'value': bot_user_id
             }
         )
         wickr_config['clients'][0]['tokens'].append(
             {
                 'name': 'WICKRIO_BOT_NAME',
-                'value': self.bot_user_id
+                'value': bot_user_id
             }
         )
         wickr_config['clients'][0]['tokens'].append(
@@ -47,36 +131,13 @@ class WickrIOConfig(Construct):
                 'value': cdk.Stack.of(self).region
             }
         )
+        wickr_config['clients'][0]['tokens'].extend(tokens or [])
         escaped_json = json.dumps(wickr_config).replace('"', '\\"').replace('\n', '')
-        self.wickrio_config = secretsmanager.Secret(
-            self, 'WickrIO Config',
-            secret_name='WickrIO-Config',
+        config_secret = secretsmanager.Secret(
+            self, construct_id,
+            secret_name=secret_name,
             secret_string_value=SecretValue.unsafe_plain_text(
                 '{"wickr_config":"' + escaped_json + '"}'
             ),
         )
-        self.wickrio_config.grant_read(params.wickrio_instance.ec2_instance_role)
-
-        ssm.StringParameter(
-            self, 'Wickr IO bot user ID',
-            parameter_name='/Wickr-GenAI-Chatbot/wickr-io-bot-user-id',
-            string_value=self.bot_user_id
-        ).grant_read(params.wickrio_instance.ec2_instance_role)
-
-        # ----------------------------------------------------------------
-        #       cdk_nag suppressions
-        # ----------------------------------------------------------------
-
-        NagSuppressions.add_resource_suppressions(
-            construct=self.wickrio_config,
-            suppressions=[
-                {
-                    'id': 'AwsSolutions-SMG4',
-                    'reason': 'No secret rotation configured. The Wickr IO bot user ID and password will be manually'
-                              'configured in the Wickr Admin console. It is recommendend to change the Wickr IO bot '
-                              'password at minimum every 90 days. After updating the Wickr IO bot password, run '
-                              '"cdk deploy" with the updated credentials (see instructions in README.md).',
-                },
-            ],
-            apply_to_children=True,
-        )
+        return config_secret
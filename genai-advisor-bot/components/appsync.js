@@ -14,6 +14,7 @@
 // limitations under the License.
 Object.defineProperty(exports, "__esModule", { value: true });
 exports.MissingCredentialsError = exports.KeepAliveIntervalLapsedError = exports.AppSyncClientClosingError = exports.GraphQlError = exports.ConnectionError = exports.generateRetryStrategy = exports.AppSyncClient = exports.ResponseTimeoutError = void 0;
+const events_1 = require("events");
 const stream_1 = require("stream");
 const util_1 = require("util");
 const url_1 = require("url");
@@ -21,6 +22,7 @@ const signature_v4_1 = require("@smithy/signature-v4");
 const sha256_js_1 = require("@aws-crypto/sha256-js");
 const util_buffer_from_1 = require("@smithy/util-buffer-from");
 const https_1 = require("./https");
+const http_2 = require("http");
 const https_2 = require("https");
 const WebSocket = require("ws");
 var https_3 = require("./https");
@@ -29,9 +31,14 @@ function isGraphQlResultWithErrors(result) {
     return !!(result.errors &&
         result.errors.length);
 }
-class AppSyncClient {
+/**
+ * Emits "connected" whenever a realtime connection has been acknowledged and "keepAliveLapsed" when a
+ * connection is closed because no keep-alive message arrived in time.
+ */
+class AppSyncClient extends events_1.EventEmitter {
     constructor(props) {
         var _a, _b;
+        super();
         this.lastSubscriptionId = 0;
         this.establishedSubscriptionIds = new Set();
         this.subscribeAsync = (0, util_1.promisify)(this.subscribe);
@@ -39,9 +46,10 @@ class AppSyncClient {
         this.graphqlUri = new url_1.URL(props.graphQlUrl);
         this.region = (_a = props.apiRegion) !== null && _a !== void 0 ? _a : this.graphqlUri.hostname.split(".")[2];
         this.realtimeUri = new url_1.URL((_b = props.realtimeUrl) !== null && _b !== void 0 ? _b : `wss://${this.graphqlUri.hostname.split(".")[0]}.appsync-realtime-api.${this.region}.amazonaws.com/graphql`);
-        this.keepAliveAgent = new https_2.Agent({
-            keepAlive: true,
-        });
+        // plain HTTP is used by the stand-in API of the load test (loadtest/run.js)
+        this.keepAliveAgent = this.graphqlUri.protocol === "http:"
+            ? new http_2.Agent({ keepAlive: true })
+            : new https_2.Agent({ keepAlive: true });
         let credentials = props.credentials;
         if (!credentials) {
             try {
@@ -74,13 +82,17 @@ class AppSyncClient {
         Object.values(this.subscriptionCallbacks).forEach(({ unsubscribe }) => unsubscribe(err));
     }
     closeWebSocket(err) {
-        this.closeAllSubscriptions(err);
-        if (this.ws) {
-            this.ws.terminate();
-        }
+        // Terminate the socket before closing the subscriptions. Otherwise every subscription sends a "stop"
+        // message and waits for a "complete" message that never arrives on the dying socket.
+        const ws = this.ws;
+        this.ws = undefined;
         if (this.scheduledKeepAliveCheck) {
             clearTimeout(this.scheduledKeepAliveCheck);
         }
+        if (ws) {
+            ws.terminate();
+        }
+        this.closeAllSubscriptions(err);
     }
     async sign(body, isConnectionAttempt = false) {
         return this.signer.sign({
@@ -103,7 +115,10 @@ class AppSyncClient {
         if (this.scheduledKeepAliveCheck) {
             clearTimeout(this.scheduledKeepAliveCheck);
         }
-        this.scheduledKeepAliveCheck = setTimeout(() => this.closeWebSocket(new KeepAliveIntervalLapsedError(`Connection has become stale (did not receive a keep-alive message for ${this.connectionTimeoutMs} ms.)`)), this.connectionTimeoutMs);
+        this.scheduledKeepAliveCheck = setTimeout(() => {
+            this.emit("keepAliveLapsed");
+            this.closeWebSocket(new KeepAliveIntervalLapsedError(`Connection has become stale (did not receive a keep-alive message for ${this.connectionTimeoutMs} ms.)`));
+        }, this.connectionTimeoutMs);
     }
     async handleMessage(event) {
         const parsed = JSON.parse(event.data.toString());
@@ -154,6 +169,7 @@ class AppSyncClient {
                 this.connected = (connectionTimeoutMs) => {
                     this.connectionTimeoutMs = connectionTimeoutMs;
                     this.scheduleKeepAliveCheck();
+                    this.emit("connected");
                     resolve(ws);
                 };
                 this.failedToConnect = reject;
@@ -168,7 +184,10 @@ class AppSyncClient {
                 ws.onclose = () => {
                     const error = new Error("Socket to AppSync closed prematurely");
                     reject(error);
-                    this.closeAllSubscriptions(error);
+                    // subscriptions of a newer connection are not affected by closing an old socket
+                    if (this.ws === ws) {
+                        this.closeWebSocket(error);
+                    }
                 };
             }
             catch (err) {
@@ -12,6 +12,7 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 
+import {EventEmitter} from "events";
 import {Readable} from "stream";
 import {promisify} from "util";
 import {URL} from "url";
@@ -20,6 +21,7 @@ import {Sha256} from "@aws-crypto/sha256-js";
 import {fromString} from "@smithy/util-buffer-from";
 import {AwsCredentialIdentity, Provider} from "@aws-sdk/types";
 import {fetchJson, NonRetryableFetchError} from "./https";
+import {Agent as HttpAgent} from "http";
 import {Agent} from "https";
 import WebSocket = require("ws");
 
@@ -57,7 +59,11 @@ export interface PostOptions {
     retryStrategy?: RetryStrategy;
 }
 
-export class AppSyncClient {
+/**
+ * Emits "connected" whenever a realtime connection has been acknowledged and "keepAliveLapsed" when a
+ * connection is closed because no keep-alive message arrived in time.
+ */
+export class AppSyncClient extends EventEmitter {
     graphqlUri: URL;
     realtimeUri: URL;
     region: string;
@@ -82,7 +88,7 @@ export class AppSyncClient {
         };
     } = {};
 
-    private keepAliveAgent: Agent;
+    private keepAliveAgent: Agent | HttpAgent;
 
     constructor(props: {
         graphQlUrl: string;
@@ -90,6 +96,7 @@ export class AppSyncClient {
         apiRegion?: string;
         credentials?: AwsCredentialIdentity | Provider<AwsCredentialIdentity>;
     }) {
+        super();
         this.graphqlUri = new URL(props.graphQlUrl);
         this.region = props.apiRegion ?? this.graphqlUri.hostname.split(".")[2];
         this.realtimeUri = new URL(
@@ -99,9 +106,10 @@ export class AppSyncClient {
             }.amazonaws.com/graphql`
         );
 
-        this.keepAliveAgent = new Agent({
-            keepAlive: true,
-        });
+        // plain HTTP is used by the stand-in API of the load test (loadtest/run.js)
+        this.keepAliveAgent = this.graphqlUri.protocol === "http:"
+            ? new HttpAgent({keepAlive: true})
+            : new Agent({keepAlive: true});
 
         let credentials = props.credentials;
         if (!credentials) {
@@ -146,13 +154,17 @@ export class AppSyncClient {
     }
 
     private closeWebSocket(err?: Error) {
-        this.closeAllSubscriptions(err);
-        if (this.ws) {
-            this.ws.terminate();
-        }
+        // Terminate the socket before closing the subscriptions. Otherwise every subscription sends a "stop"
+        // message and waits for a "complete" message that never arrives on the dying socket.
+        const ws = this.ws;
+        this.ws = undefined;
         if (this.scheduledKeepAliveCheck) {
             clearTimeout(this.scheduledKeepAliveCheck);
         }
+        if (ws) {
+            ws.terminate();
+        }
+        this.closeAllSubscriptions(err);
     }
 
     private async sign(body: string, isConnectionAttempt = false) {
@@ -178,12 +190,14 @@ export class AppSyncClient {
             clearTimeout(this.scheduledKeepAliveCheck);
         }
         this.scheduledKeepAliveCheck = setTimeout(
-            () =>
+            () => {
+                this.emit("keepAliveLapsed");
                 this.closeWebSocket(
                     new KeepAliveIntervalLapsedError(
                         `Connection has become stale (did not receive a keep-alive message for ${this.connectionTimeoutMs} ms.)`
                     )
-                ),
+                );
+            },
             this.connectionTimeoutMs
         );
     }
@@ -243,6 +257,7 @@ export class AppSyncClient {
                 this.connected = (connectionTimeoutMs) => {
                     this.connectionTimeoutMs = connectionTimeoutMs;
                     this.scheduleKeepAliveCheck();
+                    this.emit("connected");
                     resolve(ws);
                 };
                 this.failedToConnect = reject;
@@ -256,7 +271,10 @@ export class AppSyncClient {
                 ws.onclose = () => {
                     const error = new Error("Socket to AppSync closed prematurely");
                     reject(error);
-                    this.closeAllSubscriptions(error);
+                    // subscriptions of a newer connection are not affected by closing an old socket
+                    if (this.ws === ws) {
+                        this.closeWebSocket(error);
+                    }
                 };
             } catch (err) {
                 reject(err);
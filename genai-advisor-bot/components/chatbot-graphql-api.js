@@ -1,23 +1,78 @@
-const {getCognitoUser, getGraphqlApiDefinition, region} = require("./config.js");
+const {getBootstrapConfig, region} = require("./config.js");
 const {getIdToken} = require("./cognito.js");
 const {AppSyncClient} = require("./appsync.js");
+const {metrics} = require("./metrics.js");
+const {settings} = require("./settings.js");
+
+// refresh the Cognito ID token when it expires within this time
+const TOKEN_REFRESH_MARGIN_MS = 5 * 60 * 1000;
+
+// token budget of an answer, unless the model router sets another one (see model-router.js)
+const DEFAULT_MAX_TOKENS = 512;
+
+const THROTTLING_ERROR = /throttl|too many requests|rate exceeded|\b429\b/i;
 
 
 class ChatbotClient {
     constructor(config) {
         this.config = config;
         this.appSyncClient = null;
+        this.cognitoUser = null;
+        this.idToken = null;
+        this.refreshingIdToken = null;
+        this.closed = false;
         this.initPromise = this.initialize();
     }
 
     async initialize() {
-        const definition = await getGraphqlApiDefinition();
+        const {graphqlUrl, realtimeUrl, cognitoUser, workspace} = await getBootstrapConfig();
+        // start with the default workspace of the deployment, unless one is configured
+        if (!this.config.workspaceId) {
+            this.config.workspaceName = workspace.name;
+            this.config.workspaceId = workspace.id;
+        }
         this.appSyncClient = new AppSyncClient({
-            graphQlUrl: definition.uris.GRAPHQL,
-            realtimeUrl: definition.uris.REALTIME,
+            graphQlUrl: graphqlUrl,
+            realtimeUrl: realtimeUrl,
             apiRegion: region,
         });
-        this.idToken = await getIdToken(await getCognitoUser());
+        let connections = 0;
+        this.appSyncClient.on("connected", () => {
+            if (connections++ > 0) {
+                metrics.webSocketReconnects.inc();
+                // extracted by a CloudWatch Logs metric filter, see cdk_packages/cloudwatch_agent.py
+                console.log("websocket_reconnect");
+            }
+        });
+        this.appSyncClient.on("keepAliveLapsed", () => metrics.keepAliveLapses.inc());
+        this.cognitoUser = cognitoUser;
+        this.idToken = await getIdToken(cognitoUser);
+    }
+
+    freshIdToken() {
+        if (tokenExpiresAt(this.idToken) - Date.now() > TOKEN_REFRESH_MARGIN_MS) {
+            return Promise.resolve(this.idToken);
+        }
+        if (!this.refreshingIdToken) {
+            this.refreshingIdToken = this.refreshIdToken().finally(() => {
+                this.refreshingIdToken = null;
+            });
+        }
+        return this.refreshingIdToken;
+    }
+
+    async refreshIdToken() {
+        console.log("refreshing Cognito ID token");
+        try {
+            this.idToken = await getIdToken(this.cognitoUser);
+        } catch (err) {
+            // the password may have been rotated in the meantime
+            const {cognitoUser} = await getBootstrapConfig();
+            this.cognitoUser = cognitoUser;
+            this.idToken = await getIdToken(cognitoUser);
+        }
+        metrics.tokenRefreshes.inc();
+        return this.idToken;
     }
 
     async ready() {
@@ -33,8 +88,22 @@ class ChatbotClient {
         );
     }
 
-    post(gqlQuery) {
-        return this.appSyncClient.post(gqlQuery, this.idToken)
+    async post(gqlQuery) {
+        const idToken = await this.freshIdToken();
+        const observeLatency = metrics.chatbotPostLatency.startTimer();
+        try {
+            return await this.appSyncClient.post(gqlQuery, idToken);
+        } catch (err) {
+            const kind = isThrottlingError(err) ? "throttle" : "error";
+            metrics.chatbotApiErrors.inc();
+            if (kind === "throttle") metrics.chatbotApiThrottles.inc();
+            // extracted by CloudWatch Logs metric filters, see cdk_packages/cloudwatch_agent.py. Logged as info,
+            // error lines are written to log.output and error.output and would be counted twice.
+            console.log(`chatbot_api_error ${kind}`);
+            throw err;
+        } finally {
+            observeLatency();
+        }
     }
 
 
@@ -80,23 +149,74 @@ class ChatbotClient {
         `});
     }
 
-    async* responseMessagesListener(sessionId) {
-        const subscriptionRequest = this.appSyncClient.subscribeAsync({
+    // true if the session exists in the backend, i.e. has conversation history
+    async sessionExists(sessionId) {
+        const resp = await this.post({
             query: `
-            subscription MySubscription {
-                receiveMessages(sessionId: "${sessionId}") {
-                    data
+            query MyQuery {
+                getSession(id: "${sessionId}") {
+                    id
                 }
             }
-        `,
-        }, this.idToken, sessionId);
-        const subscription = await subscriptionRequest;
-        for await (const msg of subscription) {
-            yield msg.data;
+        `});
+        return resp.data.getSession !== null;
+    }
+
+    // Yields the responses for a session. A subscription that ends, e.g. because the WebSocket connection
+    // was lost, is re-established with exponential backoff until the client is closed or the signal is aborted.
+    // Aborting ends the subscription right away, also while the generator waits for a response.
+    async* responseMessagesListener(sessionId, {signal} = {}) {
+        let failedAttempts = 0;
+        const stopped = () => this.closed || signal?.aborted;
+        while (!stopped()) {
+            let subscription;
+            try {
+                const idToken = await this.freshIdToken();
+                subscription = await this.appSyncClient.subscribeAsync({
+                    query: `
+                    subscription MySubscription {
+                        receiveMessages(sessionId: "${sessionId}") {
+                            data
+                        }
+                    }
+                `,
+                }, idToken, sessionId);
+            } catch (err) {
+                console.error(`Failed to subscribe to responses for session ${sessionId}: ${err.message}`);
+                await sleep(reconnectDelay(failedAttempts++));
+                continue;
+            }
+            failedAttempts = 0;
+            metrics.activeSubscriptions.inc();
+            const unsubscribe = () => subscription.destroy();
+            signal?.addEventListener("abort", unsubscribe, {once: true});
+            try {
+                if (signal?.aborted) unsubscribe();
+                for await (const msg of subscription) {
+                    yield msg.data;
+                }
+            } catch (err) {
+                if (!stopped()) {
+                    console.error(`Subscription to responses for session ${sessionId} lost: ${err.message}`);
+                }
+            } finally {
+                signal?.removeEventListener("abort", unsubscribe);
+                metrics.activeSubscriptions.dec();
+            }
+            if (!stopped()) {
+                await sleep(reconnectDelay(failedAttempts++));
+            }
         }
     }
 
-    sendMessage(text, sessionId, {modelName, provider, workspaceId}) {
+    close() {
+        this.closed = true;
+        if (this.appSyncClient) {
+            this.appSyncClient.close();
+        }
+    }
+
+    sendMessage(text, sessionId, {modelName, provider, workspaceId, maxTokens = DEFAULT_MAX_TOKENS}) {
         return this.post({
             query: `
             mutation MyMutation($data: String!) {
@@ -105,7 +225,7 @@ class ChatbotClient {
         `,
             variables: {
                 data: JSON.stringify(
-                    createQueryData(text, sessionId, modelName, provider, workspaceId)
+                    createQueryData(text, sessionId, modelName, provider, workspaceId, maxTokens)
                 ),
             },
         });
@@ -114,7 +234,33 @@ class ChatbotClient {
 }
 
 
-function createQueryData(text, sessionId, modelName, provider, workspaceId) {
+function isThrottlingError(err) {
+    return THROTTLING_ERROR.test(err?.message ?? "") || THROTTLING_ERROR.test(err?.name ?? "");
+}
+
+
+// exponential backoff with full jitter
+function reconnectDelay(failedAttempts) {
+    const maxDelay = Math.min(
+        settings.reconnectMaxDelayMs,
+        settings.reconnectBaseDelayMs * 2 ** failedAttempts
+    );
+    return Math.random() * maxDelay;
+}
+
+
+function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+
+function tokenExpiresAt(jwtToken) {
+    const payload = JSON.parse(Buffer.from(jwtToken.split(".")[1], "base64url").toString());
+    return payload.exp * 1000;
+}
+
+
+function createQueryData(text, sessionId, modelName, provider, workspaceId, maxTokens) {
     return {
         "action": "run",
         "modelInterface": "langchain",
@@ -127,7 +273,7 @@ function createQueryData(text, sessionId, modelName, provider, workspaceId) {
             "sessionId": sessionId,
             "workspaceId": workspaceId,
             "modelKwargs": {
-                "streaming": false, "maxTokens": 512, "temperature": 0.6, "topP": 0.9
+                "streaming": false, "maxTokens": maxTokens, "temperature": 0.6, "topP": 0.9
             }
         }
     }
@@ -135,5 +281,5 @@ function createQueryData(text, sessionId, modelName, provider, workspaceId) {
 
 
 module.exports = {
-    ChatbotClient
+    ChatbotClient, reconnectDelay, isThrottlingError
 };
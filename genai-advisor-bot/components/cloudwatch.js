@@ -0,0 +1,37 @@
+// Publishes metrics of the bot to CloudWatch, e.g. the queue depth the Auto Scaling group of a bot fleet
+// scales on (see cdk_packages/bot_fleet.py).
+
+const {CloudWatchClient, PutMetricDataCommand} = require("@aws-sdk/client-cloudwatch");
+const {region, requestHandler} = require("./config.js");
+
+
+// collect() returns an object of metric name -> value, published every intervalMs
+function startMetricPublisher({namespace, dimensions, intervalMs, collect, client}) {
+    const cloudWatchClient = client ?? new CloudWatchClient({region: region, requestHandler: requestHandler});
+    const Dimensions = Object.entries(dimensions).map(([Name, Value]) => ({Name, Value}));
+    const publish = async () => {
+        const timestamp = new Date();
+        try {
+            await cloudWatchClient.send(new PutMetricDataCommand({
+                Namespace: namespace,
+                MetricData: Object.entries(collect()).map(([name, value]) => ({
+                    MetricName: name,
+                    Dimensions: Dimensions,
+                    Timestamp: timestamp,
+                    Value: value,
+                    Unit: "Count",
+                })),
+            }));
+        } catch (err) {
+            console.error("Failed to publish metrics to CloudWatch:", err.message);
+        }
+    };
+    const timer = setInterval(publish, intervalMs);
+    timer.unref();
+    return timer;
+}
+
+
+module.exports = {
+    startMetricPublisher
+};
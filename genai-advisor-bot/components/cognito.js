@@ -1,11 +1,11 @@
 const { CognitoIdentityProviderClient, InitiateAuthCommand } = require("@aws-sdk/client-cognito-identity-provider");
+const { region, requestHandler } = require("./config.js");
 
-const region = process.env.AWS_REGION;
+const client = new CognitoIdentityProviderClient(
+    {region: region, requestHandler: requestHandler}
+);
 
 async function authenticateUser(user) {
-    const client = new CognitoIdentityProviderClient(
-        {region: region}
-    );
     const initiateAuthCommand = new InitiateAuthCommand({
         AuthFlow: "USER_PASSWORD_AUTH",
         ClientId: user.userPoolWebClientId,
@@ -1,7 +1,8 @@
 class CommandInterpreter {
 
-    constructor(chatbotClient) {
+    constructor(chatbotClient, sessions) {
         this.chatbotClient = chatbotClient;
+        this.sessions = sessions;
     }
 
     processCommand(cmdString, sessionId) {
@@ -63,6 +64,7 @@ class CommandInterpreter {
             this.chatbotClient.config.provider !== provider) {
             const resp = await this.chatbotClient.deleteSession(sessionId);
             console.log("chatbot session delete: " + JSON.stringify(resp.data.deleteSession));
+            this.sessions?.reset(sessionId);
         }
         this.chatbotClient.config.modelName = selectedModel;
         this.chatbotClient.config.provider = provider;
@@ -87,6 +89,7 @@ class CommandInterpreter {
             this.chatbotClient.config.workspaceId !== workspaceId) {
             const resp = await this.chatbotClient.deleteSession(sessionId);
             console.log("chatbot session delete: " + JSON.stringify(resp.data.deleteSession));
+            this.sessions?.reset(sessionId);
         }
         this.chatbotClient.config.workspaceName = workspaceName;
         this.chatbotClient.config.workspaceId = workspaceId;
@@ -1,37 +1,62 @@
+const https = require("https");
 const { GetParameterCommand, SSMClient } = require("@aws-sdk/client-ssm");
 const { GetSecretValueCommand, SecretsManagerClient } = require("@aws-sdk/client-secrets-manager");
+const { NodeHttpHandler } = require("@smithy/node-http-handler");
 
 
-const GRAPHQL_PARAMETER = "/Wickr-GenAI-Chatbot/chatbot-graphql-api-definition";
-const COGNITO_USER_PARAMETER = "/Wickr-GenAI-Chatbot/wickr-io-cognito-config"
+// compact document with the URIs of the chatbot API, the Cognito user and the default RAG workspace,
+// see cdk_packages/bot_bootstrap.py
+const BOOTSTRAP_PARAMETER = "/Wickr-GenAI-Chatbot/bootstrap";
 const COGNITO_USER_SECRET = "WickrIO-Cognito-User-Password";
+// workspace ID of the bootstrap document if the default RAG workspace doesn't exist, see cdk_packages/rag_workspace.py
+const NO_WORKSPACE_ID = "none";
 
 const region = process.env.AWS_REGION;
 
-async function getGraphqlApiDefinition() {
-    const client = new SSMClient({region: region});
-    const response = await client.send(
-        new GetParameterCommand({Name: GRAPHQL_PARAMETER})
+// The SDK clients are created once and share a request handler that keeps its connections alive.
+const requestHandler = new NodeHttpHandler({
+    httpsAgent: new https.Agent({keepAlive: true}),
+});
+const ssmClient = new SSMClient({region: region, requestHandler: requestHandler});
+const secretsManagerClient = new SecretsManagerClient({region: region, requestHandler: requestHandler});
+
+async function getBootstrapDocument() {
+    const response = await ssmClient.send(
+        new GetParameterCommand({Name: BOOTSTRAP_PARAMETER})
     );
-    return JSON.parse(response.Parameter.Value);
+    return JSON.parse(response.Parameter.Value).bot;
 }
 
-async function getCognitoUser() {
-    const secretsManagerClient = new SecretsManagerClient({region: region});
-    const ssmClient = new SSMClient({region: region});
-    let response;
-    response = await ssmClient.send(
-        new GetParameterCommand({Name: COGNITO_USER_PARAMETER})
-    );
-    const userPoolWebClientId = JSON.parse(response.Parameter.Value).user_pool_web_client_id;
-    const userId = JSON.parse(response.Parameter.Value).user_id;
-    response = await secretsManagerClient.send(
+async function getCognitoPassword() {
+    const response = await secretsManagerClient.send(
         new GetSecretValueCommand({SecretId: COGNITO_USER_SECRET})
     );
-    const pwd = response.SecretString;
-    return {userPoolWebClientId: userPoolWebClientId, user: userId, password: pwd};
+    return response.SecretString;
+}
+
+async function getBootstrapConfig() {
+    // one parameter request in parallel with the secret request
+    const [bootstrap, pwd] = await Promise.all([
+        getBootstrapDocument(),
+        getCognitoPassword(),
+    ]);
+    const workspaceId = bootstrap.rag_workspace_id === NO_WORKSPACE_ID ? "" : bootstrap.rag_workspace_id || "";
+    return {
+        graphqlUrl: bootstrap.graphql_url,
+        realtimeUrl: bootstrap.realtime_url,
+        cognitoUser: {
+            userPoolWebClientId: bootstrap.user_pool_web_client_id,
+            user: bootstrap.cognito_user_id,
+            password: pwd,
+        },
+        // resolved at deployment time, see cdk_packages/rag_workspace.py
+        workspace: {
+            name: workspaceId ? bootstrap.rag_workspace_name || "" : "",
+            id: workspaceId,
+        },
+    };
 }
 
 module.exports = {
-    getGraphqlApiDefinition, getCognitoUser, region
+    getBootstrapConfig, region, requestHandler
 };
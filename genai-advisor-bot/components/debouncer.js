@@ -0,0 +1,62 @@
+// Merges messages a user sends in quick succession, e.g. a question split over several Wickr messages, into one
+// question to the chatbot. The messages of a room are held until no further message arrived within the debounce
+// window, or until they reach the size limit, and are then passed on as one message.
+
+const {metrics} = require("./metrics.js");
+
+
+function mergeMessages(messages) {
+    return {
+        text: messages.map((message) => message.text).join("\n"),
+        // the reply latency is measured from the first message
+        receivedAt: messages[0].receivedAt,
+    };
+}
+
+
+class MessageDebouncer {
+
+    // windowMs of 0 passes every message on immediately
+    constructor({windowMs, maxChars, flush}) {
+        this.windowMs = windowMs;
+        this.maxChars = maxChars;
+        this.flush = flush;
+        this.pending = new Map();  // roomId -> {messages, chars, timer}
+    }
+
+    add(roomId, message) {
+        if (this.windowMs <= 0) {
+            this.flush(roomId, message);
+            return;
+        }
+        let batch = this.pending.get(roomId);
+        if (batch === undefined) {
+            batch = {messages: [], chars: 0, timer: null};
+            this.pending.set(roomId, batch);
+        } else {
+            clearTimeout(batch.timer);
+            metrics.mergedMessages.inc();
+        }
+        batch.messages.push(message);
+        batch.chars += message.text.length;
+        if (batch.chars >= this.maxChars) {
+            this.flushRoom(roomId);
+            return;
+        }
+        batch.timer = setTimeout(() => this.flushRoom(roomId), this.windowMs);
+    }
+
+    // passes the pending messages of the room on without waiting for the end of the window
+    flushRoom(roomId) {
+        const batch = this.pending.get(roomId);
+        if (batch === undefined) return;
+        clearTimeout(batch.timer);
+        this.pending.delete(roomId);
+        this.flush(roomId, mergeMessages(batch.messages));
+    }
+}
+
+
+module.exports = {
+    MessageDebouncer, mergeMessages
+};
@@ -0,0 +1,215 @@
+// Metrics of the bot hot path, served in the Prometheus text exposition format from a local HTTP port.
+
+const http = require("http");
+
+const LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60];
+
+
+function formatValue(value) {
+    if (value === Infinity) return "+Inf";
+    return value.toString();
+}
+
+class Counter {
+    constructor(name, help) {
+        this.name = name;
+        this.help = help;
+        this.value = 0;
+    }
+
+    inc(value = 1) {
+        this.value += value;
+    }
+
+    render() {
+        return [
+            `# HELP ${this.name} ${this.help}`,
+            `# TYPE ${this.name} counter`,
+            `${this.name} ${formatValue(this.value)}`,
+        ];
+    }
+}
+
+class Gauge {
+    constructor(name, help) {
+        this.name = name;
+        this.help = help;
+        this.value = 0;
+        this.collector = null;
+    }
+
+    set(value) {
+        this.value = value;
+    }
+
+    inc(value = 1) {
+        this.value += value;
+    }
+
+    dec(value = 1) {
+        this.value -= value;
+    }
+
+    // read the value from a callback at scrape time instead of tracking it
+    setCollector(collector) {
+        this.collector = collector;
+    }
+
+    render() {
+        const value = this.collector ? this.collector() : this.value;
+        return [
+            `# HELP ${this.name} ${this.help}`,
+            `# TYPE ${this.name} gauge`,
+            `${this.name} ${formatValue(value)}`,
+        ];
+    }
+}
+
+class Histogram {
+    constructor(name, help, buckets = LATENCY_BUCKETS) {
+        this.name = name;
+        this.help = help;
+        this.buckets = [...buckets].sort((a, b) => a - b);
+        this.counts = new Array(this.buckets.length).fill(0);
+        this.sum = 0;
+        this.count = 0;
+    }
+
+    observe(value) {
+        for (let i = 0; i < this.buckets.length; i++) {
+            if (value <= this.buckets[i]) this.counts[i]++;
+        }
+        this.sum += value;
+        this.count++;
+    }
+
+    // returns a function that observes the seconds elapsed since startTimer() was called
+    startTimer() {
+        const start = process.hrtime.bigint();
+        return () => {
+            const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+            this.observe(seconds);
+            return seconds;
+        };
+    }
+
+    render() {
+        const lines = [
+            `# HELP ${this.name} ${this.help}`,
+            `# TYPE ${this.name} histogram`,
+        ];
+        this.buckets.forEach((bucket, i) => {
+            lines.push(`${this.name}_bucket{le="${formatValue(bucket)}"} ${this.counts[i]}`);
+        });
+        lines.push(`${this.name}_bucket{le="+Inf"} ${this.count}`);
+        lines.push(`${this.name}_sum ${formatValue(this.sum)}`);
+        lines.push(`${this.name}_count ${this.count}`);
+        return lines;
+    }
+}
+
+class Registry {
+    constructor() {
+        this.metrics = [];
+    }
+
+    register(metric) {
+        this.metrics.push(metric);
+        return metric;
+    }
+
+    render() {
+        return this.metrics.flatMap((metric) => metric.render()).join("\n") + "\n";
+    }
+}
+
+
+const registry = new Registry();
+
+const metrics = {
+    replyLatency: registry.register(new Histogram(
+        "wickr_reply_latency_seconds",
+        "Time from receiving a Wickr message to sending the chatbot reply to the room."
+    )),
+    chatbotPostLatency: registry.register(new Histogram(
+        "chatbot_post_latency_seconds",
+        "Latency of GraphQL requests to the chatbot API."
+    )),
+    activeSubscriptions: registry.register(new Gauge(
+        "chatbot_active_subscriptions",
+        "Number of active chatbot response subscriptions."
+    )),
+    queueDepth: registry.register(new Gauge(
+        "scheduler_queue_depth",
+        "Number of messages waiting to be sent to the chatbot API."
+    )),
+    inFlightRequests: registry.register(new Gauge(
+        "scheduler_inflight_requests",
+        "Number of chatbot requests waiting for a response."
+    )),
+    webSocketReconnects: registry.register(new Counter(
+        "appsync_websocket_reconnects_total",
+        "Number of AppSync realtime WebSocket connections opened after the first one."
+    )),
+    keepAliveLapses: registry.register(new Counter(
+        "appsync_keepalive_lapses_total",
+        "Number of AppSync realtime connections closed because the keep-alive interval lapsed."
+    )),
+    chatbotApiErrors: registry.register(new Counter(
+        "chatbot_api_errors_total",
+        "Number of failed GraphQL requests to the chatbot API, including throttled requests."
+    )),
+    chatbotApiThrottles: registry.register(new Counter(
+        "chatbot_api_throttles_total",
+        "Number of GraphQL requests to the chatbot API rejected because of throttling."
+    )),
+    tokenRefreshes: registry.register(new Counter(
+        "cognito_token_refreshes_total",
+        "Number of Cognito ID token refreshes."
+    )),
+    sessionRollovers: registry.register(new Counter(
+        "chatbot_session_rollovers_total",
+        "Number of chatbot sessions deleted because they passed their turn or token limit."
+    )),
+    mergedMessages: registry.register(new Counter(
+        "wickr_merged_messages_total",
+        "Number of Wickr messages merged into the question of a previous message of the same room."
+    )),
+    modelFallbacks: registry.register(new Counter(
+        "chatbot_model_fallbacks_total",
+        "Number of questions sent to the fallback model because the configured model was slow or throttled."
+    )),
+    responseCacheHits: registry.register(new Counter(
+        "chatbot_response_cache_hits_total",
+        "Number of questions answered from the response cache."
+    )),
+    responseCacheMisses: registry.register(new Counter(
+        "chatbot_response_cache_misses_total",
+        "Number of cacheable questions sent to the chatbot API."
+    )),
+};
+
+
+function startMetricsServer(port, host) {
+    const server = http.createServer((req, res) => {
+        if (req.method === "GET" && req.url === "/metrics") {
+            res.writeHead(200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"});
+            res.end(registry.render());
+        } else {
+            res.writeHead(404);
+            res.end();
+        }
+    });
+    server.on("error", (err) => {
+        console.error("Metrics server error:", err);
+    });
+    server.listen(port, host, () => {
+        console.log(`metrics available at http://${host}:${port}/metrics`);
+    });
+    return server;
+}
+
+
+module.exports = {
+    Counter, Gauge, Histogram, Registry, metrics, registry, startMetricsServer
+};
@@ -0,0 +1,111 @@
+// Routes the questions to the chatbot models. The router keeps the reply latencies of every model over a rolling
+// time window. When the p95 latency of the configured model passes the latency SLO, or the model has been
+// throttled recently, questions go to the fallback model until the window no longer shows the problem. Short
+// questions can be sent with a lower token budget.
+
+const {metrics} = require("./metrics.js");
+
+// below this number of replies in the window the p95 of a model isn't used
+const MIN_SAMPLES = 10;
+// upper bound of the replies kept per model
+const MAX_SAMPLES = 500;
+
+
+function percentile(values, p) {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.min(sorted.length - 1, Math.ceil(p / 100 * sorted.length) - 1)];
+}
+
+
+class ModelRouter {
+
+    // sloMs of 0 disables the fallback, shortPromptChars of 0 the lower token budget of short questions
+    constructor({sloMs, windowMs, throttleCooldownMs, maxTokens, shortPromptChars, shortPromptMaxTokens,
+                    now = Date.now}) {
+        this.sloMs = sloMs;
+        this.windowMs = windowMs;
+        this.throttleCooldownMs = throttleCooldownMs;
+        this.maxTokens = maxTokens;
+        this.shortPromptChars = shortPromptChars;
+        this.shortPromptMaxTokens = shortPromptMaxTokens;
+        this.now = now;
+        this.fallback = null;  // {modelName, provider}
+        this.models = new Map();  // modelName -> {samples: [{at, latencyMs}], throttledUntil}
+    }
+
+    // the fallback model has to be one of the models of listModels, its provider is taken from there
+    async selectFallback(chatbotClient, modelName) {
+        if (!modelName) return null;
+        const response = await chatbotClient.listModels();
+        const model = response.data.listModels.find((candidate) => candidate.name === modelName);
+        if (model === undefined) {
+            console.error(`Fallback model ${modelName} is not available, the router doesn't fall back.`);
+            return null;
+        }
+        this.fallback = {modelName: model.name, provider: model.provider};
+        return this.fallback;
+    }
+
+    stats(modelName) {
+        let stats = this.models.get(modelName);
+        if (stats === undefined) {
+            stats = {samples: [], throttledUntil: 0};
+            this.models.set(modelName, stats);
+        }
+        const windowStart = this.now() - this.windowMs;
+        while (stats.samples.length > 0 && stats.samples[0].at < windowStart) {
+            stats.samples.shift();
+        }
+        return stats;
+    }
+
+    p95(modelName) {
+        const samples = this.stats(modelName).samples;
+        if (samples.length < MIN_SAMPLES) return undefined;
+        return percentile(samples.map((sample) => sample.latencyMs), 95);
+    }
+
+    // the reason why the model shouldn't be used, or null
+    degraded(modelName) {
+        if (this.stats(modelName).throttledUntil > this.now()) return "throttle";
+        const p95 = this.p95(modelName);
+        if (p95 !== undefined && p95 > this.sloMs) return "latency";
+        return null;
+    }
+
+    recordLatency(modelName, latencyMs) {
+        const stats = this.stats(modelName);
+        stats.samples.push({at: this.now(), latencyMs: latencyMs});
+        if (stats.samples.length > MAX_SAMPLES) {
+            stats.samples.shift();
+        }
+    }
+
+    recordThrottle(modelName) {
+        this.stats(modelName).throttledUntil = this.now() + this.throttleCooldownMs;
+    }
+
+    // returns the configuration for the question: the configuration of the room with model and token budget
+    route(config, text) {
+        const route = {...config, maxTokens: this.maxTokens};
+        if (this.shortPromptChars > 0 && text.length <= this.shortPromptChars) {
+            route.maxTokens = this.shortPromptMaxTokens;
+        }
+        if (this.sloMs > 0 && this.fallback && this.fallback.modelName !== config.modelName) {
+            const reason = this.degraded(config.modelName);
+            if (reason && !this.degraded(this.fallback.modelName)) {
+                metrics.modelFallbacks.inc();
+                // extracted by a CloudWatch Logs metric filter, see cdk_packages/cloudwatch_agent.py
+                console.log(`model_fallback ${reason}`);
+                route.modelName = this.fallback.modelName;
+                route.provider = this.fallback.provider;
+            }
+        }
+        return route;
+    }
+}
+
+
+module.exports = {
+    ModelRouter, percentile
+};
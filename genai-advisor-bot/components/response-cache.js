@@ -0,0 +1,65 @@
+// Cache of chatbot answers to repeated questions, e.g. the FAQ of an advisor room. The key is the normalized
+// question, the model, the RAG workspace and the token budget the question is routed with. Entries expire after a
+// TTL, the least recently used entry is evicted when the cache is full. Only questions without a conversation
+// history in their session are cached, the answer to a follow-up question depends on the history.
+
+const {metrics} = require("./metrics.js");
+
+
+function normalizeQuestion(text) {
+    return text
+        .normalize("NFKC")
+        .toLowerCase()
+        .replace(/\s+/g, " ")
+        .trim()
+        .replace(/[\s?!.]+$/, "");
+}
+
+
+class ResponseCache {
+
+    // maxEntries of 0 disables the cache
+    constructor({maxEntries, ttlMs, now = Date.now}) {
+        this.maxEntries = maxEntries;
+        this.ttlMs = ttlMs;
+        this.now = now;
+        this.entries = new Map();  // key -> {answer, expiresAt}, in order of use
+    }
+
+    get enabled() {
+        return this.maxEntries > 0;
+    }
+
+    // route: model, workspace and token budget of the question, see ModelRouter.route()
+    static key(text, {modelName, workspaceId, maxTokens}) {
+        return JSON.stringify([modelName, workspaceId, maxTokens, normalizeQuestion(text)]);
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        if (entry === undefined || entry.expiresAt <= this.now()) {
+            this.entries.delete(key);
+            metrics.responseCacheMisses.inc();
+            return undefined;
+        }
+        // move the entry to the end of the eviction order
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        metrics.responseCacheHits.inc();
+        return entry.answer;
+    }
+
+    set(key, answer) {
+        if (!this.enabled) return;
+        this.entries.delete(key);
+        this.entries.set(key, {answer: answer, expiresAt: this.now() + this.ttlMs});
+        while (this.entries.size > this.maxEntries) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+    }
+}
+
+
+module.exports = {
+    ResponseCache, normalizeQuestion
+};
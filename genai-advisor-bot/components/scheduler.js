@@ -0,0 +1,99 @@
+// Schedules messages to the chatbot backend. Every room (Wickr vGroupID) has its own ordered queue and at most
+// one request waiting for a response, so answers arrive in the order the questions were asked. Rooms with
+// pending messages are served round-robin while the number of requests in flight is capped globally. Messages
+// beyond the queue limits are shed instead of piling up. Every request gets a sequence number, so a late response
+// to a request that timed out can't complete the next request of the room.
+
+class MessageScheduler {
+
+    constructor({maxInFlight, maxQueuedPerRoom, maxQueuedTotal, requestTimeoutMs, dispatch, shed, timedOut}) {
+        this.maxInFlight = maxInFlight;
+        this.maxQueuedPerRoom = maxQueuedPerRoom;
+        this.maxQueuedTotal = maxQueuedTotal;
+        this.requestTimeoutMs = requestTimeoutMs;
+        this.dispatch = dispatch;
+        this.shed = shed;
+        this.timedOut = timedOut ?? (() => {});
+        this.queues = new Map();  // roomId -> array of pending messages
+        this.readyRooms = [];  // rooms with pending messages and no request in flight, in round-robin order
+        this.activeRooms = new Map();  // roomId -> request in flight ({id, message, timeout})
+        this.queued = 0;
+        this.lastRequestId = 0;
+    }
+
+    get inFlight() {
+        return this.activeRooms.size;
+    }
+
+    get queueDepth() {
+        return this.queued;
+    }
+
+    enqueue(roomId, message) {
+        const queue = this.queues.get(roomId) ?? [];
+        if (queue.length >= this.maxQueuedPerRoom || this.queued >= this.maxQueuedTotal) {
+            console.log(`scheduler: overloaded, dropping message for room ${roomId}`);
+            this.shed(roomId, message);
+            return false;
+        }
+        queue.push(message);
+        this.queues.set(roomId, queue);
+        this.queued++;
+        if (queue.length === 1 && !this.activeRooms.has(roomId)) {
+            this.readyRooms.push(roomId);
+        }
+        this.pump();
+        return true;
+    }
+
+    // frees the slot of the room and returns the message of the completed request, with a requestId only if it is
+    // the request in flight
+    complete(roomId, requestId) {
+        const request = this.activeRooms.get(roomId);
+        if (request === undefined) return undefined;
+        if (requestId !== undefined && request.id !== requestId) return undefined;
+        clearTimeout(request.timeout);
+        this.activeRooms.delete(roomId);
+        if (this.queues.has(roomId)) {
+            this.readyRooms.push(roomId);
+        }
+        this.pump();
+        return request.message;
+    }
+
+    pump() {
+        while (this.activeRooms.size < this.maxInFlight && this.readyRooms.length > 0) {
+            const roomId = this.readyRooms.shift();
+            const queue = this.queues.get(roomId);
+            const message = queue.shift();
+            if (queue.length === 0) {
+                this.queues.delete(roomId);
+            }
+            this.queued--;
+            this.start(roomId, message);
+        }
+    }
+
+    start(roomId, message) {
+        const id = ++this.lastRequestId;
+        const timeout = setTimeout(() => {
+            console.error(`scheduler: no response for room ${roomId} within ${this.requestTimeoutMs} ms`);
+            // before the next message of the room is dispatched
+            this.timedOut(roomId, id, message);
+            this.complete(roomId, id);
+        }, this.requestTimeoutMs);
+        this.activeRooms.set(roomId, {id, message, timeout});
+        Promise.resolve()
+            .then(() => this.dispatch(roomId, message, id))
+            .catch((err) => {
+                console.error(`scheduler: failed to send message for room ${roomId}`);
+                console.error(err);
+                this.complete(roomId, id);
+            });
+    }
+}
+
+
+module.exports = {
+    MessageScheduler
+};
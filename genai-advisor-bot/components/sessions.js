@@ -0,0 +1,110 @@
+// Rollover of the chatbot sessions. Every Wickr room (vGroupID) has one chatbot session with the same ID and the
+// backend sends the whole history of the session with every query. When a session has passed the maximum number
+// of turns or its estimated token budget, it is deleted with the deleteSession mutation, the next query of the
+// room starts a fresh session with the same ID. The deletion runs after the reply has been sent, the next query
+// of the room waits for it.
+
+const {metrics} = require("./metrics.js");
+
+// rough estimate for English text, the backend doesn't report the token usage of a session
+const CHARS_PER_TOKEN = 4;
+
+
+function estimateTokens(text) {
+    return Math.ceil((text ?? "").length / CHARS_PER_TOKEN);
+}
+
+
+class SessionManager {
+
+    // maxTurns and maxTokens of 0 disable the respective limit, sessionExists looks a session up in the backend
+    constructor({maxTurns, maxTokens, deleteSession, sessionExists}) {
+        this.maxTurns = maxTurns;
+        this.maxTokens = maxTokens;
+        this.deleteSession = deleteSession;
+        this.sessionExists = sessionExists;
+        this.sessions = new Map();  // sessionId -> {turns, tokens, rollover}
+        // sessionId -> true if the session had history before it was first used or deleted by this process
+        this.priorHistory = new Map();
+    }
+
+    state(sessionId) {
+        let session = this.sessions.get(sessionId);
+        if (session === undefined) {
+            session = {turns: 0, tokens: 0, rollover: null};
+            this.sessions.set(sessionId, session);
+        }
+        return session;
+    }
+
+    // true if the next query of the session starts without conversation history. The turns only count the
+    // queries of this process, e.g. after a restart the history of a session is looked up in the backend.
+    async isFresh(sessionId) {
+        const session = this.sessions.get(sessionId);
+        if (session !== undefined && (session.turns > 0 || session.rollover)) return false;
+        if (!this.priorHistory.has(sessionId)) {
+            try {
+                this.priorHistory.set(sessionId, await this.sessionExists(sessionId));
+            } catch (err) {
+                console.error(`Failed to look up session ${sessionId}: ${err.message}`);
+                return false;
+            }
+        }
+        return !this.priorHistory.get(sessionId);
+    }
+
+    // called before a query is sent, waits for a pending rollover of the session
+    async beforeQuery(sessionId, text) {
+        const session = this.state(sessionId);
+        if (session.rollover) {
+            await session.rollover;
+        }
+        session.turns++;
+        session.tokens += estimateTokens(text);
+    }
+
+    // called after the response has been sent to the room, starts the rollover of a session over its limits
+    afterResponse(sessionId, text) {
+        const session = this.state(sessionId);
+        session.tokens += estimateTokens(text);
+        const reason = this.exceededLimit(session);
+        if (reason && !session.rollover) {
+            session.rollover = this.rollover(sessionId, session, reason);
+        }
+        return session.rollover;
+    }
+
+    exceededLimit(session) {
+        if (this.maxTurns > 0 && session.turns >= this.maxTurns) return "turns";
+        if (this.maxTokens > 0 && session.tokens >= this.maxTokens) return "tokens";
+        return null;
+    }
+
+    async rollover(sessionId, session, reason) {
+        try {
+            await this.deleteSession(sessionId);
+            metrics.sessionRollovers.inc();
+            console.log(`session_rollover ${reason}`);
+        } catch (err) {
+            // the session grows further and is rolled over after the next response
+            console.error(`Failed to roll over session ${sessionId}: ${err.message}`);
+            return;
+        } finally {
+            session.rollover = null;
+        }
+        session.turns = 0;
+        session.tokens = 0;
+        this.priorHistory.set(sessionId, false);
+    }
+
+    // the session has been deleted elsewhere, e.g. after a change of the model
+    reset(sessionId) {
+        this.sessions.delete(sessionId);
+        this.priorHistory.set(sessionId, false);
+    }
+}
+
+
+module.exports = {
+    SessionManager, estimateTokens
+};
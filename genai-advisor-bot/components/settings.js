@@ -0,0 +1,70 @@
+// Runtime settings of the bot. Every setting can be overridden through an environment variable, e.g. as a
+// token of the Wickr IO client configuration (see cdk_packages/wickrio_config.py).
+
+function intFromEnv(name, defaultValue) {
+    const value = parseInt(process.env[name], 10);
+    return Number.isNaN(value) ? defaultValue : value;
+}
+
+function stringFromEnv(name, defaultValue) {
+    const value = process.env[name];
+    return value === undefined || value === "" ? defaultValue : value;
+}
+
+const settings = {
+    // maximum number of chatbot requests waiting for a response at the same time (across all rooms)
+    maxInFlightRequests: intFromEnv("CHATBOT_MAX_INFLIGHT_REQUESTS", 4),
+    // maximum number of messages waiting in the queue of a single room
+    maxQueuedPerRoom: intFromEnv("CHATBOT_MAX_QUEUED_PER_ROOM", 5),
+    // maximum number of messages waiting in all room queues
+    maxQueuedTotal: intFromEnv("CHATBOT_MAX_QUEUED_TOTAL", 100),
+    // time after which a request without response frees its slot again
+    requestTimeoutMs: intFromEnv("CHATBOT_REQUEST_TIMEOUT_MS", 60_000),
+    // reply sent to a room when its message has been dropped because the bot is overloaded
+    overloadReply: stringFromEnv(
+        "CHATBOT_OVERLOAD_REPLY",
+        "I am receiving too many questions at the moment. Please try again in a minute."
+    ),
+    // delay before the first attempt to re-establish a lost response subscription, doubled on every
+    // failed attempt up to the maximum delay
+    reconnectBaseDelayMs: intFromEnv("CHATBOT_RECONNECT_BASE_DELAY_MS", 500),
+    reconnectMaxDelayMs: intFromEnv("CHATBOT_RECONNECT_MAX_DELAY_MS", 30_000),
+    // local port of the Prometheus metrics endpoint, 0 disables the endpoint
+    metricsPort: intFromEnv("BOT_METRICS_PORT", 9464),
+    metricsHost: stringFromEnv("BOT_METRICS_HOST", "127.0.0.1"),
+    // CloudWatch namespace the queue depth is published to, empty disables publishing (set for bot fleets)
+    cloudWatchNamespace: stringFromEnv("CHATBOT_CLOUDWATCH_NAMESPACE", ""),
+    cloudWatchIntervalMs: intFromEnv("CHATBOT_CLOUDWATCH_INTERVAL_MS", 60_000),
+    fleetName: stringFromEnv("BOT_FLEET_NAME", ""),
+    // messages of a room arriving within this window are merged into one question (see debouncer.js), the merged
+    // question is sent early when it reaches the size limit, 0 (the default) disables merging
+    debounceWindowMs: intFromEnv("CHATBOT_DEBOUNCE_WINDOW_MS", 0),
+    debounceMaxChars: intFromEnv("CHATBOT_DEBOUNCE_MAX_CHARS", 2_000),
+    // a chatbot session is deleted after this number of questions or estimated tokens of questions and answers,
+    // the next question starts a fresh session (see sessions.js), 0 disables the limit. Off by default, the room
+    // loses its conversation history with the rollover.
+    sessionMaxTurns: intFromEnv("CHATBOT_SESSION_MAX_TURNS", 0),
+    sessionMaxTokens: intFromEnv("CHATBOT_SESSION_MAX_TOKENS", 0),
+    // answers to questions without conversation history are cached (see response-cache.js), 0 disables the cache
+    responseCacheMaxEntries: intFromEnv("CHATBOT_CACHE_MAX_ENTRIES", 0),
+    responseCacheTtlMs: intFromEnv("CHATBOT_CACHE_TTL_MS", 3_600_000),
+    // model routing (see model-router.js): questions go to the fallback model, one of the models of listModels,
+    // while the p95 reply latency of the configured model is above the SLO or after it has been throttled.
+    // An SLO of 0 or an empty fallback model disables the fallback.
+    latencySloMs: intFromEnv("CHATBOT_LATENCY_SLO_MS", 20_000),
+    latencyWindowMs: intFromEnv("CHATBOT_LATENCY_WINDOW_MS", 300_000),
+    throttleCooldownMs: intFromEnv("CHATBOT_THROTTLE_COOLDOWN_MS", 60_000),
+    fallbackModel: stringFromEnv("CHATBOT_FALLBACK_MODEL", ""),
+    // token budget of an answer, questions up to shortPromptChars characters get the lower budget (0 disables it)
+    maxTokens: intFromEnv("CHATBOT_MAX_TOKENS", 512),
+    shortPromptChars: intFromEnv("CHATBOT_SHORT_PROMPT_CHARS", 0),
+    shortPromptMaxTokens: intFromEnv("CHATBOT_SHORT_PROMPT_MAX_TOKENS", 256),
+    // query sent through a reserved session when the bot starts, empty disables the warm-up (see warmup.js)
+    warmUpQuery: stringFromEnv("CHATBOT_WARMUP_QUERY", ""),
+    warmUpTimeoutMs: intFromEnv("CHATBOT_WARMUP_TIMEOUT_MS", 60_000),
+};
+
+
+module.exports = {
+    settings, intFromEnv, stringFromEnv
+};
@@ -0,0 +1,48 @@
+// Warm-up of the chatbot path after a start of the bot, e.g. after a deployment or the replacement of an instance.
+// Authenticates, opens the realtime connection and the response subscription and sends a small query through a
+// reserved session, so the first user question doesn't pay for the cold path. Enabled with CHATBOT_WARMUP_QUERY.
+
+const {randomUUID} = require("crypto");
+
+// the session IDs of Wickr rooms are vGroupIDs, they never start with this prefix
+const WARMUP_SESSION_PREFIX = "warmup-";
+
+
+async function warmUp(chatbotClient, {query, timeoutMs, sessionId = WARMUP_SESSION_PREFIX + randomUUID()}) {
+    const startedAt = Date.now();
+    // Cognito authentication and AppSync client
+    await chatbotClient.ready();
+    // the first call of next() subscribes to the responses of the session, the abort ends the subscription even
+    // while next() waits for a response
+    const subscription = new AbortController();
+    const responses = chatbotClient.responseMessagesListener(sessionId, {signal: subscription.signal});
+    const response = responses.next();
+    let timer;
+    try {
+        await chatbotClient.send(query, sessionId);
+        await Promise.race([
+            response,
+            new Promise((resolve, reject) => {
+                timer = setTimeout(() => reject(new Error(`no response within ${timeoutMs} ms`)), timeoutMs);
+            }),
+        ]);
+    } finally {
+        clearTimeout(timer);
+        subscription.abort();
+        // finishes the generator after a response, without one the abort has ended it
+        responses.return().catch(() => {});
+        try {
+            await chatbotClient.deleteSession(sessionId);
+        } catch (err) {
+            console.error(`Failed to delete warm-up session ${sessionId}: ${err.message}`);
+        }
+    }
+    const durationMs = Date.now() - startedAt;
+    console.log(`warmup_ms ${durationMs}`);
+    return durationMs;
+}
+
+
+module.exports = {
+    warmUp, WARMUP_SESSION_PREFIX
+};
@@ -6,8 +6,17 @@ const {WickrIOBot, logger} = require('wickrio-bot-api');
 const fs = require('fs');
 const util = require('util');
 
-const {ChatbotClient} = require("./components/chatbot-graphql-api");
+const {ChatbotClient, isThrottlingError} = require("./components/chatbot-graphql-api");
 const {CommandInterpreter} = require('./components/commands.js');
+const {MessageScheduler} = require('./components/scheduler.js');
+const {SessionManager} = require('./components/sessions.js');
+const {ResponseCache} = require('./components/response-cache.js');
+const {MessageDebouncer} = require('./components/debouncer.js');
+const {ModelRouter} = require('./components/model-router.js');
+const {settings} = require('./components/settings.js');
+const {metrics, startMetricsServer} = require('./components/metrics.js');
+const {startMetricPublisher} = require('./components/cloudwatch.js');
+const {warmUp} = require('./components/warmup.js');
 
 
 console.log = function () {
@@ -24,6 +33,16 @@ let bot;
 const activeVGroupIDs = [];
 let awsChatbot;
 let commands;
+let scheduler;
+let sessions;
+let responseCache;
+let debouncer;
+let router;
+// vGroupID -> request waiting for its answer ({requestId, cacheKey, modelName, sentAt}). The answers don't carry
+// a request ID, but a session answers its questions in order.
+const pendingRequests = new Map();
+// vGroupID -> expiry times of the answers still expected for requests the scheduler timed out
+const lateAnswers = new Map();
 const defaultConfig = {
     modelName: "anthropic.claude-v2",
     provider: "bedrock",
@@ -110,13 +129,105 @@ async function returnMessageHandler(messageIterator) {
         } catch (err) {
             console.error('Error sending message back to Wickr client.');
             console.error(err);
+        } finally {
+            const vGroupID = data.data.sessionId.toString();
+            const failed = data.action === "error";
+            // a session over its limits is deleted before the next question of the room is sent
+            sessions.afterResponse(vGroupID, data.data.content?.toString());
+            const request = pendingRequests.get(vGroupID);
+            if (takeLateAnswer(vGroupID)) {
+                console.log(`late answer for room ${vGroupID}, not cached`);
+            } else if (request !== undefined) {
+                pendingRequests.delete(vGroupID);
+                if (failed && isThrottlingError({message: data.data.content})) {
+                    router.recordThrottle(request.modelName);
+                } else if (!failed) {
+                    router.recordLatency(request.modelName, Date.now() - request.sentAt);
+                }
+                if (request.cacheKey !== undefined && !failed) {
+                    responseCache.set(request.cacheKey, data.data.content.toString());
+                }
+                completeRequest(vGroupID, request.requestId);
+            }
+        }
+    }
+}
+
+
+// true if the answer belongs to the oldest request of the room the scheduler timed out
+function takeLateAnswer(vGroupID) {
+    const now = Date.now();
+    const expected = (lateAnswers.get(vGroupID) ?? []).filter((expiresAt) => expiresAt > now);
+    const late = expected.shift() !== undefined;
+    if (expected.length > 0) {
+        lateAnswers.set(vGroupID, expected);
+    } else {
+        lateAnswers.delete(vGroupID);
+    }
+    return late;
+}
+
+
+// called by the scheduler before it dispatches the next message of the room
+function requestTimedOut(vGroupID, requestId) {
+    const request = pendingRequests.get(vGroupID);
+    if (request?.requestId !== requestId) return;
+    pendingRequests.delete(vGroupID);
+    // a model that doesn't answer at all is the slowest, its late answer is not recorded
+    router.recordLatency(request.modelName, Math.max(settings.requestTimeoutMs, Date.now() - request.sentAt));
+    // the answer is expected within another request timeout, until then the room's next answer is not its own
+    const expected = lateAnswers.get(vGroupID) ?? [];
+    expected.push(Date.now() + settings.requestTimeoutMs);
+    lateAnswers.set(vGroupID, expected);
+}
+
+
+function completeRequest(vGroupID, requestId) {
+    const request = scheduler.complete(vGroupID, requestId);
+    if (request) {
+        const latencyMs = Date.now() - request.receivedAt;
+        metrics.replyLatency.observe(latencyMs / 1000);
+        // extracted by a CloudWatch Logs metric filter, see cdk_packages/cloudwatch_agent.py
+        console.log(`reply_latency_ms ${latencyMs}`);
+    }
+}
+
+
+// Sends a question to the chatbot API or answers it from the response cache. Only questions of rooms without
+// conversation history are cached, keyed by the model and token budget the question is routed to.
+async function dispatchMessage(vGroupID, message, requestId) {
+    const route = router.route(awsChatbot.config, message.text);
+    let cacheKey;
+    if (responseCache.enabled && await sessions.isFresh(vGroupID)) {
+        cacheKey = ResponseCache.key(message.text, route);
+        const answer = responseCache.get(cacheKey);
+        if (answer !== undefined) {
+            console.log("answering message from response cache");
+            try {
+                await WickrIOAPI.cmdSendRoomMessage(vGroupID, answer);
+            } finally {
+                completeRequest(vGroupID, requestId);
+            }
+            return;
         }
     }
+    await sessions.beforeQuery(vGroupID, message.text);
+    pendingRequests.set(vGroupID, {requestId, cacheKey, modelName: route.modelName, sentAt: Date.now()});
+    console.log("sending message to chatbot API");
+    try {
+        return await awsChatbot.send(message.text, vGroupID, route);
+    } catch (err) {
+        if (pendingRequests.get(vGroupID)?.requestId === requestId) {
+            pendingRequests.delete(vGroupID);
+        }
+        throw err;
+    }
 }
 
 
 async function listen(rMessage) { // starts a listener. Message payload accessible as 'message'
     console.log('entered listen()');
+    const receivedAt = Date.now();
     const parsedMessage = bot.parseMessage(rMessage);
     const vGroupID = parsedMessage.vgroupid;
     if (parsedMessage.message) {
@@ -129,12 +240,16 @@ async function listen(rMessage) { // starts a listener. Message payload accessib
                 activeVGroupIDs.push(vGroupID);
                 console.log("creating response message iterator");
                 const messageIterator = awsChatbot.responseMessagesListener(vGroupID);
-                returnMessageHandler(messageIterator).then(() => {
-                    console.log("returnMessageHandler().then()");
+                returnMessageHandler(messageIterator).catch((err) => {
+                    console.error(err);
+                }).finally(() => {
+                    // the listener only ends when the chatbot client is closed, create a new one on the next message
+                    console.log("returnMessageHandler() finished");
+                    activeVGroupIDs.splice(activeVGroupIDs.indexOf(vGroupID), 1);
                 });
             }
-            console.log("sending message to chatbot API");
-            awsChatbot.send(parsedMessage.message, vGroupID);
+            // messages sent in quick succession are queued as one question
+            debouncer.add(vGroupID, {text: parsedMessage.message, receivedAt: receivedAt});
         }
     }
 }
@@ -143,7 +258,71 @@ async function listen(rMessage) { // starts a listener. Message payload accessib
 async function main() { // entry point
     console.log('entered main()');
     awsChatbot = new ChatbotClient(defaultConfig);
-    commands = new CommandInterpreter(awsChatbot);
+    sessions = new SessionManager({
+        maxTurns: settings.sessionMaxTurns,
+        maxTokens: settings.sessionMaxTokens,
+        deleteSession: (sessionId) => awsChatbot.deleteSession(sessionId),
+        sessionExists: (sessionId) => awsChatbot.sessionExists(sessionId),
+    });
+    responseCache = new ResponseCache({
+        maxEntries: settings.responseCacheMaxEntries,
+        ttlMs: settings.responseCacheTtlMs,
+    });
+    router = new ModelRouter({
+        sloMs: settings.latencySloMs,
+        windowMs: settings.latencyWindowMs,
+        throttleCooldownMs: settings.throttleCooldownMs,
+        maxTokens: settings.maxTokens,
+        shortPromptChars: settings.shortPromptChars,
+        shortPromptMaxTokens: settings.shortPromptMaxTokens,
+    });
+    awsChatbot.ready().then(() => router.selectFallback(awsChatbot, settings.fallbackModel)).catch((err) => {
+        console.error(`Failed to select the fallback model: ${err.message}`);
+    });
+    commands = new CommandInterpreter(awsChatbot, sessions);
+    scheduler = new MessageScheduler({
+        maxInFlight: settings.maxInFlightRequests,
+        maxQueuedPerRoom: settings.maxQueuedPerRoom,
+        maxQueuedTotal: settings.maxQueuedTotal,
+        requestTimeoutMs: settings.requestTimeoutMs,
+        dispatch: dispatchMessage,
+        timedOut: requestTimedOut,
+        shed: async (vGroupID) => {
+            try {
+                await WickrIOAPI.cmdSendRoomMessage(vGroupID, settings.overloadReply);
+            } catch (err) {
+                console.error('Error sending overload reply to Wickr client.');
+                console.error(err);
+            }
+        },
+    });
+    debouncer = new MessageDebouncer({
+        windowMs: settings.debounceWindowMs,
+        maxChars: settings.debounceMaxChars,
+        flush: (vGroupID, message) => {
+            console.log("queueing message for chatbot API");
+            scheduler.enqueue(vGroupID, message);
+        },
+    });
+    metrics.queueDepth.setCollector(() => scheduler.queueDepth);
+    metrics.inFlightRequests.setCollector(() => scheduler.inFlight);
+    if (settings.metricsPort > 0) {
+        startMetricsServer(settings.metricsPort, settings.metricsHost);
+    }
+    if (settings.cloudWatchNamespace) {
+        startMetricPublisher({
+            namespace: settings.cloudWatchNamespace,
+            dimensions: {Fleet: settings.fleetName},
+            intervalMs: settings.cloudWatchIntervalMs,
+            collect: () => ({QueueDepth: scheduler.queueDepth, InFlightRequests: scheduler.inFlight}),
+        });
+    }
+    if (settings.warmUpQuery) {
+        // runs while the Wickr IO client starts, user messages don't wait for it
+        warmUp(awsChatbot, {query: settings.warmUpQuery, timeoutMs: settings.warmUpTimeoutMs}).catch((err) => {
+            console.error(`Warm-up of the chatbot path failed: ${err.message}`);
+        });
+    }
     try {
         await startWickrIoBot();
     } catch (err) {
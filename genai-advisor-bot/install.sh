@@ -7,4 +7,8 @@ fi
 if [ ! -d "files" ]; then
   mkdir files
 fi
-npm install
+# The deployed archive contains node_modules installed for package.json and the checksum of that package.json (see
+# cdk_packages/wickrio_code.py). npm only runs if node_modules are missing or installed for another package.json.
+if [ "$(cat node_modules/.package.json.sha256 2>/dev/null)" != "$(sha256sum package.json)" ]; then
+  npm install && sha256sum package.json > node_modules/.package.json.sha256
+fi
@@ -0,0 +1,58 @@
+// Fakes of the Wickr IO modules "wickrio_addon" and "wickrio-bot-api". Messages the bot sends to rooms are
+// recorded instead of being delivered, and incoming messages are injected through the listener the bot
+// registers with startListening().
+
+const EventEmitter = require("events");
+
+const sentMessages = new EventEmitter();
+
+const wickrIOAddon = {
+    cmdSendRoomMessage(vGroupID, message) {
+        sentMessages.emit("message", {vGroupID: vGroupID, message: message, sentAt: Date.now()});
+        return "Sending message";
+    },
+};
+
+let listener = null;
+const listenerRegistered = new EventEmitter();
+
+class WickrIOBot {
+    async start() {
+        return true;
+    }
+
+    async startListening(callback) {
+        listener = callback;
+        listenerRegistered.emit("registered", callback);
+    }
+
+    parseMessage(rMessage) {
+        return JSON.parse(rMessage);
+    }
+
+    async close() {
+        return true;
+    }
+}
+
+const silent = () => {
+};
+const logger = {
+    info: process.env.LOADTEST_VERBOSE ? console.info : silent,
+    error: process.env.LOADTEST_VERBOSE ? console.error : silent,
+    warn: silent,
+    debug: silent,
+};
+
+function waitForListener() {
+    if (listener) return Promise.resolve(listener);
+    return new Promise((resolve) => listenerRegistered.once("registered", resolve));
+}
+
+
+module.exports = {
+    wickrIOAddon,
+    wickrIOBotAPI: {WickrIOBot, logger},
+    sentMessages,
+    waitForListener,
+};
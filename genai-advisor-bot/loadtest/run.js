@@ -0,0 +1,173 @@
+// Load test of the integration code without network access. Runs listen(), ChatbotClient and AppSyncClient
+// against the stand-in GraphQL API (started as child process) and the fake Wickr IO modules, drives
+// N rooms x M messages and reports throughput, latency percentiles and memory usage.
+//
+// usage: node loadtest/run.js [--rooms 10] [--messages 5] [--llm-latency-ms 1000] [--llm-latency-jitter-ms 0]
+//                             [--message-interval-ms 100] [--timeout-ms 120000]
+//
+// Bot settings (see components/settings.js) are taken from the environment as usual.
+
+const path = require("path");
+const Module = require("module");
+const {fork} = require("child_process");
+const fake = require("./fake-wickrio.js");
+
+
+function parseArgs(argv) {
+    const options = {
+        rooms: 10,
+        messages: 5,
+        llmLatencyMs: 1000,
+        llmLatencyJitterMs: 0,
+        messageIntervalMs: 100,
+        timeoutMs: 120_000,
+    };
+    for (let i = 0; i < argv.length; i += 2) {
+        const name = argv[i].replace(/^--/, "").replace(/-([a-z])/g, (_, c) => c.toUpperCase());
+        if (!(name in options)) {
+            throw new Error(`unknown option ${argv[i]}`);
+        }
+        options[name] = parseInt(argv[i + 1], 10);
+    }
+    return options;
+}
+
+function percentile(sorted, p) {
+    if (sorted.length === 0) return NaN;
+    return sorted[Math.min(sorted.length - 1, Math.ceil(p / 100 * sorted.length) - 1)];
+}
+
+function fakeIdToken() {
+    const encode = (obj) => Buffer.from(JSON.stringify(obj)).toString("base64url");
+    return `${encode({alg: "none"})}.${encode({exp: Math.floor(Date.now() / 1000) + 24 * 3600})}.stand-in`;
+}
+
+function startStandIn(options) {
+    const child = fork(path.join(__dirname, "stand-in-appsync.js"), [], {
+        env: {
+            ...process.env,
+            LLM_LATENCY_MS: options.llmLatencyMs.toString(),
+            LLM_LATENCY_JITTER_MS: options.llmLatencyJitterMs.toString(),
+        },
+    });
+    return new Promise((resolve, reject) => {
+        child.once("message", ({port}) => resolve({child, port}));
+        child.once("error", reject);
+    });
+}
+
+function loadBot(port) {
+    // replace the Wickr IO modules, they are only available inside the Wickr IO container
+    const load = Module._load;
+    Module._load = function (request, ...args) {
+        if (request === "wickrio_addon") return fake.wickrIOAddon;
+        if (request === "wickrio-bot-api") return fake.wickrIOBotAPI;
+        return load.call(this, request, ...args);
+    };
+
+    // bootstrap configuration and authentication are served locally
+    const config = require("../components/config.js");
+    config.getBootstrapConfig = async () => ({
+        graphqlUrl: `http://127.0.0.1:${port}/graphql`,
+        realtimeUrl: `ws://127.0.0.1:${port}/graphql`,
+        cognitoUser: {userPoolWebClientId: "stand-in", user: "stand-in", password: "stand-in"},
+        workspace: {name: "", id: ""},
+    });
+    require("../components/cognito.js").getIdToken = async () => fakeIdToken();
+
+    // the realtime connection is signed with IAM credentials
+    process.env.AWS_ACCESS_KEY_ID = process.env.AWS_ACCESS_KEY_ID ?? "stand-in";
+    process.env.AWS_SECRET_ACCESS_KEY = process.env.AWS_SECRET_ACCESS_KEY ?? "stand-in";
+    process.env.AWS_REGION = process.env.AWS_REGION ?? "eu-west-1";
+    process.env.BOT_METRICS_PORT = process.env.BOT_METRICS_PORT ?? "0";
+
+    process.argv[2] = "loadtest-bot";
+    require("../genai-advisor-bot.js");
+    return fake.waitForListener();
+}
+
+async function run(options) {
+    const {child, port} = await startStandIn(options);
+    const listen = await loadBot(port);
+    const {settings} = require("../components/settings.js");
+
+    const expected = options.rooms * options.messages;
+    const sentAt = new Map();  // message text -> time the message was passed to listen()
+    const latencies = [];  // one per answered message, merged messages share the reply
+    let replies = 0;
+    let shed = 0;
+    let peakRss = 0;
+    let peakHeapUsed = 0;
+    const sampleMemory = () => {
+        const usage = process.memoryUsage();
+        peakRss = Math.max(peakRss, usage.rss);
+        peakHeapUsed = Math.max(peakHeapUsed, usage.heapUsed);
+    };
+    const memorySampler = setInterval(sampleMemory, 100);
+
+    const done = new Promise((resolve) => {
+        fake.sentMessages.on("message", ({message, sentAt: repliedAt}) => {
+            if (message === settings.overloadReply) {
+                shed++;
+            } else {
+                replies++;
+                // messages merged by the debouncer are answered as one question, joined by newlines
+                const texts = message.replace(/^stand-in answer to: /, "").split("\n");
+                for (const text of texts.filter((text) => sentAt.has(text))) {
+                    latencies.push(repliedAt - sentAt.get(text));
+                    sentAt.delete(text);
+                }
+            }
+            if (latencies.length + shed >= expected) resolve();
+        });
+    });
+    const timeout = new Promise((resolve) => setTimeout(resolve, options.timeoutMs));
+
+    const start = Date.now();
+    for (let m = 0; m < options.messages; m++) {
+        for (let r = 0; r < options.rooms; r++) {
+            const text = `room ${r} message ${m}`;
+            sentAt.set(text, Date.now());
+            listen(JSON.stringify({vgroupid: `room-${r}`, message: text}));
+        }
+        await new Promise((resolve) => setTimeout(resolve, options.messageIntervalMs));
+    }
+    await Promise.race([done, timeout]);
+    const elapsedS = (Date.now() - start) / 1000;
+    clearInterval(memorySampler);
+    sampleMemory();
+
+    latencies.sort((a, b) => a - b);
+    const report = {
+        rooms: options.rooms,
+        messagesPerRoom: options.messages,
+        llmLatencyMs: options.llmLatencyMs,
+        maxInFlightRequests: settings.maxInFlightRequests,
+        debounceWindowMs: settings.debounceWindowMs,
+        replies: replies,
+        answeredMessages: latencies.length,
+        shed: shed,
+        missing: expected - latencies.length - shed,
+        elapsedS: elapsedS,
+        throughputPerS: latencies.length / elapsedS,
+        latencyMs: {
+            p50: percentile(latencies, 50),
+            p95: percentile(latencies, 95),
+            p99: percentile(latencies, 99),
+            max: latencies[latencies.length - 1],
+        },
+        memoryMb: {
+            peakRss: peakRss / 2 ** 20,
+            peakHeapUsed: peakHeapUsed / 2 ** 20,
+        },
+    };
+    process.stdout.write(JSON.stringify(report, null, 2) + "\n");
+    child.disconnect();
+    process.exit(report.missing === 0 ? 0 : 1);
+}
+
+
+run(parseArgs(process.argv.slice(2))).catch((err) => {
+    process.stderr.write(`${err.stack}\n`);
+    process.exit(1);
+});
@@ -0,0 +1,143 @@
+// Stand-in for the GraphQL API of the AWS GenAI Chatbot. Serves the queries and mutations used by the bot over
+// HTTP and the AppSync realtime protocol over a WebSocket on the same port. Every sendQuery is answered on the
+// receiveMessages subscription of its session after a configurable LLM latency.
+
+const http = require("http");
+const WebSocket = require("ws");
+
+const MODELS = [
+    {name: "anthropic.claude-v2", provider: "bedrock"},
+    {name: "amazon.titan-text-express-v1", provider: "bedrock"},
+];
+
+
+class StandInAppSync {
+
+    constructor({llmLatencyMs = 1000, llmLatencyJitterMs = 0, keepAliveIntervalMs = 60_000} = {}) {
+        this.llmLatencyMs = llmLatencyMs;
+        this.llmLatencyJitterMs = llmLatencyJitterMs;
+        this.keepAliveIntervalMs = keepAliveIntervalMs;
+        this.subscriptions = new Map();  // subscription id -> {ws, sessionId}
+        this.sessions = new Set();  // IDs of the sessions with history
+        this.server = http.createServer(this.handleRequest.bind(this));
+        this.wss = new WebSocket.Server({noServer: true});
+        this.server.on("upgrade", (req, socket, head) => {
+            this.wss.handleUpgrade(req, socket, head, (ws) => this.handleConnection(ws));
+        });
+    }
+
+    listen(port = 0) {
+        return new Promise((resolve) => {
+            this.server.listen(port, "127.0.0.1", () => resolve(this.server.address().port));
+        });
+    }
+
+    close() {
+        this.wss.clients.forEach((ws) => ws.terminate());
+        this.server.close();
+    }
+
+    handleRequest(req, res) {
+        const chunks = [];
+        req.on("data", (chunk) => chunks.push(chunk));
+        req.on("end", () => {
+            let result;
+            try {
+                const {query, variables} = JSON.parse(Buffer.concat(chunks).toString());
+                result = {data: this.execute(query, variables ?? {})};
+            } catch (err) {
+                result = {errors: [{message: err.message}]};
+            }
+            res.writeHead(200, {"Content-Type": "application/json; charset=UTF-8"});
+            res.end(JSON.stringify(result));
+        });
+    }
+
+    execute(query, variables) {
+        if (query.includes("sendQuery")) {
+            const request = JSON.parse(variables.data);
+            this.sessions.add(request.data.sessionId);
+            this.answer(request.data.sessionId, request.data.text);
+            return {sendQuery: '{"ResponseMetadata": {"HTTPStatusCode=200"}}'};
+        }
+        if (query.includes("listModels")) {
+            return {listModels: MODELS};
+        }
+        if (query.includes("listWorkspaces")) {
+            return {listWorkspaces: []};
+        }
+        const getSession = query.match(/getSession\(id: "([^"]+)"\)/);
+        if (getSession) {
+            return {getSession: this.sessions.has(getSession[1]) ? {id: getSession[1]} : null};
+        }
+        const deleteSession = query.match(/deleteSession\(id: "([^"]+)"\)/);
+        if (deleteSession) {
+            this.sessions.delete(deleteSession[1]);
+            return {deleteSession: {id: deleteSession[1], deleted: true}};
+        }
+        throw new Error(`stand-in does not support the query: ${query}`);
+    }
+
+    answer(sessionId, text) {
+        const latency = this.llmLatencyMs + Math.random() * this.llmLatencyJitterMs;
+        setTimeout(() => {
+            const data = JSON.stringify({
+                type: "text",
+                action: "final_response",
+                data: {sessionId: sessionId, content: `stand-in answer to: ${text}`},
+            });
+            for (const [id, subscription] of this.subscriptions) {
+                if (subscription.sessionId === sessionId && subscription.ws.readyState === WebSocket.OPEN) {
+                    subscription.ws.send(JSON.stringify({
+                        type: "data",
+                        id: id,
+                        payload: {data: {receiveMessages: {data: data}}},
+                    }));
+                }
+            }
+        }, latency);
+    }
+
+    handleConnection(ws) {
+        const keepAlive = setInterval(() => ws.send(JSON.stringify({type: "ka"})), this.keepAliveIntervalMs);
+        ws.on("close", () => {
+            clearInterval(keepAlive);
+            for (const [id, subscription] of this.subscriptions) {
+                if (subscription.ws === ws) this.subscriptions.delete(id);
+            }
+        });
+        ws.on("message", (raw) => {
+            const message = JSON.parse(raw.toString());
+            if (message.type === "connection_init") {
+                ws.send(JSON.stringify({
+                    type: "connection_ack",
+                    payload: {connectionTimeoutMs: this.keepAliveIntervalMs * 5},
+                }));
+            } else if (message.type === "start") {
+                const {query} = JSON.parse(message.payload.data);
+                const sessionId = query.match(/receiveMessages\(sessionId: "([^"]+)"\)/)[1];
+                this.subscriptions.set(message.id, {ws: ws, sessionId: sessionId});
+                ws.send(JSON.stringify({type: "start_ack", id: message.id}));
+            } else if (message.type === "stop") {
+                this.subscriptions.delete(message.id);
+                ws.send(JSON.stringify({type: "complete", id: message.id}));
+            }
+        });
+    }
+}
+
+
+// run as child process of the load test: report the port to the parent process
+if (require.main === module) {
+    const standIn = new StandInAppSync({
+        llmLatencyMs: parseInt(process.env.LLM_LATENCY_MS ?? "1000", 10),
+        llmLatencyJitterMs: parseInt(process.env.LLM_LATENCY_JITTER_MS ?? "0", 10),
+    });
+    standIn.listen().then((port) => process.send({port: port}));
+    process.on("disconnect", () => process.exit(0));
+}
+
+
+module.exports = {
+    StandInAppSync
+};
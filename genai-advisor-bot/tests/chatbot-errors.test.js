@@ -0,0 +1,48 @@
+import {describe, it, expect, beforeAll} from '@jest/globals';
+
+
+describe("chatbot API errors", () => {
+
+    let ChatbotClient;
+    let metrics;
+
+    function idToken() {
+        const payload = Buffer.from(JSON.stringify({exp: Math.floor(Date.now() / 1000) + 3600})).toString("base64url");
+        return `header.${payload}.signature`;
+    }
+
+    // chatbot client without bootstrap, posting fails with the given error
+    function createClient(error) {
+        const client = Object.create(ChatbotClient.prototype);
+        client.closed = false;
+        client.idToken = idToken();
+        client.appSyncClient = {post: async () => { throw error; }};
+        return client;
+    }
+
+    beforeAll(() => {
+        ({ChatbotClient} = require("../components/chatbot-graphql-api.js"));
+        ({metrics} = require("../components/metrics.js"));
+    });
+
+    it("counts throttled requests as errors and throttles", async () => {
+        const errors = metrics.chatbotApiErrors.value;
+        const throttles = metrics.chatbotApiThrottles.value;
+
+        await expect(createClient(new Error("Rate exceeded")).listModels()).rejects.toThrow("Rate exceeded");
+
+        expect(metrics.chatbotApiErrors.value).toEqual(errors + 1);
+        expect(metrics.chatbotApiThrottles.value).toEqual(throttles + 1);
+    });
+
+    it("counts other failures as errors only", async () => {
+        const errors = metrics.chatbotApiErrors.value;
+        const throttles = metrics.chatbotApiThrottles.value;
+
+        await expect(createClient(new Error("Unauthorized")).listModels()).rejects.toThrow("Unauthorized");
+
+        expect(metrics.chatbotApiErrors.value).toEqual(errors + 1);
+        expect(metrics.chatbotApiThrottles.value).toEqual(throttles);
+    });
+
+});
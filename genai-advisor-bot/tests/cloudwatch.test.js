@@ -0,0 +1,64 @@
+import {describe, it, expect, jest, beforeEach, afterEach} from '@jest/globals';
+
+
+describe("CloudWatch metric publisher", () => {
+
+    let startMetricPublisher;
+
+    beforeEach(() => {
+        jest.useFakeTimers();
+        startMetricPublisher = require("../components/cloudwatch.js").startMetricPublisher;
+    });
+
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    it("publishes the collected values with the fleet dimension", async () => {
+        const client = {send: jest.fn().mockResolvedValue({})};
+        let queueDepth = 3;
+        const timer = startMetricPublisher({
+            namespace: "Test",
+            dimensions: {Fleet: "fleet-1"},
+            intervalMs: 60_000,
+            collect: () => ({QueueDepth: queueDepth}),
+            client: client,
+        });
+        try {
+            expect(client.send).not.toHaveBeenCalled();
+            jest.advanceTimersByTime(60_000);
+            queueDepth = 7;
+            jest.advanceTimersByTime(60_000);
+            expect(client.send).toHaveBeenCalledTimes(2);
+            const input = client.send.mock.calls[1][0].input;
+            expect(input.Namespace).toEqual("Test");
+            expect(input.MetricData).toEqual([expect.objectContaining({
+                MetricName: "QueueDepth",
+                Dimensions: [{Name: "Fleet", Value: "fleet-1"}],
+                Value: 7,
+            })]);
+        } finally {
+            clearInterval(timer);
+        }
+    });
+
+    it("keeps publishing after a failed request", async () => {
+        const client = {send: jest.fn().mockRejectedValue(new Error("throttled"))};
+        const timer = startMetricPublisher({
+            namespace: "Test",
+            dimensions: {Fleet: "fleet-1"},
+            intervalMs: 1_000,
+            collect: () => ({QueueDepth: 0}),
+            client: client,
+        });
+        try {
+            jest.advanceTimersByTime(1_000);
+            await Promise.resolve();
+            jest.advanceTimersByTime(1_000);
+            expect(client.send).toHaveBeenCalledTimes(2);
+        } finally {
+            clearInterval(timer);
+        }
+    });
+
+});
@@ -5,15 +5,21 @@ describe("Cognito user authentication - invalid credentials", () => {
 
     it("attempts to authenticate with invalid credentials", async () => {
         const mockConfigModule = jest.requireActual("../components/config.js");
-        const mockGetCognitoUser = jest.fn().mockReturnValue({
-            userPoolWebClientId: "invalidPoolId",
-            user: "invalidUserId",
-            password: "invalidPassword"
+        const mockGetBootstrapConfig = jest.fn().mockImplementation(async () => {
+            const bootstrapConfig = await mockConfigModule.getBootstrapConfig();
+            return {
+                ...bootstrapConfig,
+                cognitoUser: {
+                    userPoolWebClientId: "invalidPoolId",
+                    user: "invalidUserId",
+                    password: "invalidPassword"
+                },
+            };
         })
         jest.mock("../components/config.js", () => {
             return {
                 ...mockConfigModule,
-                getCognitoUser: mockGetCognitoUser,
+                getBootstrapConfig: mockGetBootstrapConfig,
             };
         });
         const {ChatbotClient} = require("../components/chatbot-graphql-api.js");
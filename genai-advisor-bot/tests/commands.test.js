@@ -20,11 +20,12 @@ describe("bot commands", () => {
 
     it("checks the command interpreter has been initialized", () => {
         expect(commands).toHaveProperty("chatbotClient");
+        // the default workspace of the deployment, see cdk_packages/rag_workspace.py
         expect(commands.chatbotClient.config).toEqual({
             modelName: "anthropic.claude-v2",
             provider: "bedrock",
-            workspaceName: "",
-            workspaceId: "",
+            workspaceName: "WickrIO-Bot-Advisor",
+            workspaceId: expect.stringMatching(/^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/),
         });
         expect(commands.chatbotClient.appSyncClient).toBeDefined();
     }, 10_000);
@@ -121,8 +122,6 @@ describe("bot commands", () => {
 
     it("selects a valid workspace", async () => {
         const testCmd = "/select-rag-workspace 0";
-        expect(commands.chatbotClient.config.workspaceId).toEqual("");
-        expect(commands.chatbotClient.config.workspaceName).toEqual("");
         const resp = await commands.processCommand(testCmd);
         expect(resp.message).toContain("active workspace: ");
         expect(resp.metaMessage).toEqual("");
@@ -133,15 +132,14 @@ describe("bot commands", () => {
 
     it("selects an invalid menu item for a workspace", async () => {
         const testCmd = "/select-rag-workspace 994";
-        expect(commands.chatbotClient.config.workspaceId).toEqual("");
-        expect(commands.chatbotClient.config.workspaceName).toEqual("");
+        const {workspaceId, workspaceName} = commands.chatbotClient.config;
         const resp = await commands.processCommand(testCmd);
         expect(resp).toEqual({
             message: "invalid menu item selected: 994",
             metaMessage: ""
         });
-        expect(commands.chatbotClient.config.workspaceId).toEqual("");
-        expect(commands.chatbotClient.config.workspaceName).toEqual("");
+        expect(commands.chatbotClient.config.workspaceId).toEqual(workspaceId);
+        expect(commands.chatbotClient.config.workspaceName).toEqual(workspaceName);
     }, 10_000);
 
     it("requests the current configuration", async () => {
@@ -149,7 +147,7 @@ describe("bot commands", () => {
         let resp = await commands.processCommand(testCmd);
         expect(resp).toEqual({
             message: "active large language model: **anthropic.claude-v2**\n" +
-                "active workspace: **none selected**",
+                "active workspace: **WickrIO-Bot-Advisor**",
             metaMessage: ""
         });
         await commands.processCommand("/select-model 0");
@@ -0,0 +1,93 @@
+import {describe, it, expect, jest, afterEach} from '@jest/globals';
+const {SSMClient} = require("@aws-sdk/client-ssm");
+const {SecretsManagerClient} = require("@aws-sdk/client-secrets-manager");
+
+
+describe("Bootstrap configuration", () => {
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+    });
+
+    it("reads the bot section of the bootstrap document with a single parameter request", async () => {
+        const ssmSend = jest.spyOn(SSMClient.prototype, "send").mockResolvedValue({
+            Parameter: {
+                Value: JSON.stringify({
+                    bot: {
+                        graphql_url: "https://example.appsync-api.eu-west-1.amazonaws.com/graphql",
+                        realtime_url: "wss://example.appsync-realtime-api.eu-west-1.amazonaws.com/graphql",
+                        user_pool_web_client_id: "client-id",
+                        cognito_user_id: "bot-0123abcd@example.com",
+                        rag_workspace_name: "WickrIO-Bot-Advisor",
+                        rag_workspace_id: "5f3c1b8e-2d4a-4c6e-9b1a-0e7d2f4a6c8b",
+                    },
+                    instance: {integration_bucket: "bucket", container_image: "image"},
+                }),
+            },
+        });
+        jest.spyOn(SecretsManagerClient.prototype, "send").mockResolvedValue({SecretString: "password"});
+        const {getBootstrapConfig} = require("../components/config.js");
+
+        const config = await getBootstrapConfig();
+
+        expect(ssmSend).toHaveBeenCalledTimes(1);
+        expect(ssmSend.mock.calls[0][0].input).toEqual({Name: "/Wickr-GenAI-Chatbot/bootstrap"});
+        expect(config).toEqual({
+            graphqlUrl: "https://example.appsync-api.eu-west-1.amazonaws.com/graphql",
+            realtimeUrl: "wss://example.appsync-realtime-api.eu-west-1.amazonaws.com/graphql",
+            cognitoUser: {
+                userPoolWebClientId: "client-id",
+                user: "bot-0123abcd@example.com",
+                password: "password",
+            },
+            workspace: {name: "WickrIO-Bot-Advisor", id: "5f3c1b8e-2d4a-4c6e-9b1a-0e7d2f4a6c8b"},
+        });
+    });
+
+    it("starts without workspace if the default workspace doesn't exist", async () => {
+        jest.spyOn(SSMClient.prototype, "send").mockResolvedValue({
+            Parameter: {
+                Value: JSON.stringify({
+                    bot: {
+                        graphql_url: "https://example.appsync-api.eu-west-1.amazonaws.com/graphql",
+                        realtime_url: "wss://example.appsync-realtime-api.eu-west-1.amazonaws.com/graphql",
+                        user_pool_web_client_id: "client-id",
+                        cognito_user_id: "bot-0123abcd@example.com",
+                        rag_workspace_name: "WickrIO-Bot-Advisor",
+                        rag_workspace_id: "none",
+                    },
+                }),
+            },
+        });
+        jest.spyOn(SecretsManagerClient.prototype, "send").mockResolvedValue({SecretString: "password"});
+        const {getBootstrapConfig} = require("../components/config.js");
+
+        const config = await getBootstrapConfig();
+
+        expect(config.workspace).toEqual({name: "", id: ""});
+    });
+
+    it("starts the chatbot client with the default workspace and keeps a configured one", async () => {
+        const config = require("../components/config.js");
+        jest.spyOn(config, "getBootstrapConfig").mockResolvedValue({
+            graphqlUrl: "https://example.appsync-api.eu-west-1.amazonaws.com/graphql",
+            realtimeUrl: "wss://example.appsync-realtime-api.eu-west-1.amazonaws.com/graphql",
+            cognitoUser: {userPoolWebClientId: "client-id", user: "user", password: "password"},
+            workspace: {name: "WickrIO-Bot-Advisor", id: "5f3c1b8e-2d4a-4c6e-9b1a-0e7d2f4a6c8b"},
+        });
+        jest.spyOn(require("../components/cognito.js"), "getIdToken").mockResolvedValue("id-token");
+        const {ChatbotClient} = require("../components/chatbot-graphql-api.js");
+
+        const defaultClient = await new ChatbotClient({workspaceName: "", workspaceId: ""}).ready();
+        const configuredClient = await new ChatbotClient({workspaceName: "other", workspaceId: "other-id"}).ready();
+
+        expect(defaultClient.config).toEqual({
+            workspaceName: "WickrIO-Bot-Advisor",
+            workspaceId: "5f3c1b8e-2d4a-4c6e-9b1a-0e7d2f4a6c8b",
+        });
+        expect(configuredClient.config).toEqual({workspaceName: "other", workspaceId: "other-id"});
+        defaultClient.close();
+        configuredClient.close();
+    });
+
+});
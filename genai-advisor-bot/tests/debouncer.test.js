@@ -0,0 +1,75 @@
+import {describe, it, expect, jest, beforeEach, afterEach} from '@jest/globals';
+
+
+describe("message debouncer", () => {
+
+    let MessageDebouncer;
+    let flushed;
+
+    function createDebouncer(options) {
+        return new MessageDebouncer({
+            windowMs: 1_000,
+            maxChars: 100,
+            flush: (roomId, message) => {
+                flushed.push([roomId, message]);
+            },
+            ...options,
+        });
+    }
+
+    beforeEach(() => {
+        jest.useFakeTimers();
+        MessageDebouncer = require("../components/debouncer.js").MessageDebouncer;
+        flushed = [];
+    });
+
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    it("merges messages arriving within the window", () => {
+        const debouncer = createDebouncer();
+        debouncer.add("room-1", {text: "How do I", receivedAt: 1});
+        jest.advanceTimersByTime(900);
+        debouncer.add("room-1", {text: "rotate the password?", receivedAt: 2});
+        jest.advanceTimersByTime(900);
+        expect(flushed).toEqual([]);
+
+        jest.advanceTimersByTime(100);
+        expect(flushed).toEqual([["room-1", {text: "How do I\nrotate the password?", receivedAt: 1}]]);
+    });
+
+    it("keeps the rooms apart", () => {
+        const debouncer = createDebouncer();
+        debouncer.add("room-1", {text: "first", receivedAt: 1});
+        debouncer.add("room-2", {text: "second", receivedAt: 2});
+        jest.advanceTimersByTime(1_000);
+
+        expect(flushed).toEqual([
+            ["room-1", {text: "first", receivedAt: 1}],
+            ["room-2", {text: "second", receivedAt: 2}],
+        ]);
+    });
+
+    it("flushes early at the size limit", () => {
+        const debouncer = createDebouncer({maxChars: 10});
+        debouncer.add("room-1", {text: "12345", receivedAt: 1});
+        debouncer.add("room-1", {text: "67890", receivedAt: 2});
+
+        expect(flushed).toEqual([["room-1", {text: "12345\n67890", receivedAt: 1}]]);
+        jest.advanceTimersByTime(1_000);
+        expect(flushed.length).toEqual(1);
+    });
+
+    it("passes messages on immediately without a window", () => {
+        const debouncer = createDebouncer({windowMs: 0});
+        debouncer.add("room-1", {text: "first", receivedAt: 1});
+        debouncer.add("room-1", {text: "second", receivedAt: 2});
+
+        expect(flushed).toEqual([
+            ["room-1", {text: "first", receivedAt: 1}],
+            ["room-1", {text: "second", receivedAt: 2}],
+        ]);
+    });
+
+});
@@ -0,0 +1,50 @@
+import {describe, it, expect} from '@jest/globals';
+
+
+describe("metrics", () => {
+
+    const {Counter, Gauge, Histogram, Registry} = require("../components/metrics.js");
+
+    it("renders counters and gauges in the Prometheus text format", () => {
+        const registry = new Registry();
+        const counter = registry.register(new Counter("test_events_total", "Test events."));
+        const gauge = registry.register(new Gauge("test_depth", "Test depth."));
+        counter.inc();
+        counter.inc(2);
+        gauge.set(7);
+        gauge.dec();
+        expect(registry.render()).toEqual(
+            "# HELP test_events_total Test events.\n" +
+            "# TYPE test_events_total counter\n" +
+            "test_events_total 3\n" +
+            "# HELP test_depth Test depth.\n" +
+            "# TYPE test_depth gauge\n" +
+            "test_depth 6\n"
+        );
+    });
+
+    it("reads gauge values from a collector", () => {
+        const gauge = new Gauge("test_collected", "Collected.");
+        let depth = 4;
+        gauge.setCollector(() => depth);
+        depth = 5;
+        expect(gauge.render()[2]).toEqual("test_collected 5");
+    });
+
+    it("renders cumulative histogram buckets", () => {
+        const histogram = new Histogram("test_latency_seconds", "Latency.", [0.5, 1]);
+        histogram.observe(0.25);
+        histogram.observe(0.75);
+        histogram.observe(2);
+        expect(histogram.render()).toEqual([
+            "# HELP test_latency_seconds Latency.",
+            "# TYPE test_latency_seconds histogram",
+            'test_latency_seconds_bucket{le="0.5"} 1',
+            'test_latency_seconds_bucket{le="1"} 2',
+            'test_latency_seconds_bucket{le="+Inf"} 3',
+            "test_latency_seconds_sum 3",
+            "test_latency_seconds_count 3",
+        ]);
+    });
+
+});
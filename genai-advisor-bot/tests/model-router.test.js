@@ -0,0 +1,118 @@
+import {describe, it, expect, jest, beforeAll} from '@jest/globals';
+
+
+describe("model router", () => {
+
+    let ModelRouter;
+    let percentile;
+    let metrics;
+    const config = {modelName: "anthropic.claude-v2", provider: "bedrock", workspaceId: "workspace-1"};
+
+    function createRouter(options) {
+        let time = 0;
+        const router = new ModelRouter({
+            sloMs: 5_000,
+            windowMs: 60_000,
+            throttleCooldownMs: 10_000,
+            maxTokens: 512,
+            shortPromptChars: 0,
+            shortPromptMaxTokens: 256,
+            now: () => time,
+            ...options,
+        });
+        router.fallback = {modelName: "anthropic.claude-instant-v1", provider: "bedrock"};
+        router.advance = (ms) => {
+            time += ms;
+        };
+        return router;
+    }
+
+    function recordLatencies(router, modelName, latencyMs, count = 20) {
+        for (let i = 0; i < count; i++) {
+            router.recordLatency(modelName, latencyMs);
+        }
+    }
+
+    beforeAll(() => {
+        ({ModelRouter, percentile} = require("../components/model-router.js"));
+        ({metrics} = require("../components/metrics.js"));
+    });
+
+    it("computes the nearest-rank percentile", () => {
+        const values = Array.from({length: 100}, (_, i) => 100 - i);
+        expect(percentile(values, 95)).toEqual(95);
+        expect(percentile([7], 95)).toEqual(7);
+    });
+
+    it("keeps the configured model and token budget within the SLO", () => {
+        const router = createRouter();
+        recordLatencies(router, config.modelName, 4_000);
+
+        expect(router.route(config, "question")).toEqual({...config, maxTokens: 512});
+    });
+
+    it("falls back while the p95 latency is above the SLO", () => {
+        const router = createRouter();
+        const fallbacks = metrics.modelFallbacks.value;
+        recordLatencies(router, config.modelName, 4_000, 18);
+        recordLatencies(router, config.modelName, 9_000, 2);
+
+        expect(router.route(config, "question").modelName).toEqual("anthropic.claude-instant-v1");
+        expect(metrics.modelFallbacks.value).toEqual(fallbacks + 1);
+
+        // the slow replies leave the window, the configured model is used again
+        router.advance(60_001);
+        expect(router.route(config, "question").modelName).toEqual(config.modelName);
+    });
+
+    it("doesn't judge a model on a few replies", () => {
+        const router = createRouter();
+        recordLatencies(router, config.modelName, 9_000, 9);
+
+        expect(router.route(config, "question").modelName).toEqual(config.modelName);
+    });
+
+    it("falls back after a throttle until the cooldown has passed", () => {
+        const router = createRouter();
+        router.recordThrottle(config.modelName);
+
+        expect(router.route(config, "question")).toEqual({
+            ...config, modelName: "anthropic.claude-instant-v1", provider: "bedrock", maxTokens: 512,
+        });
+        router.advance(10_000);
+        expect(router.route(config, "question").modelName).toEqual(config.modelName);
+    });
+
+    it("keeps the configured model when the fallback is degraded as well", () => {
+        const router = createRouter();
+        router.recordThrottle(config.modelName);
+        router.recordThrottle("anthropic.claude-instant-v1");
+
+        expect(router.route(config, "question").modelName).toEqual(config.modelName);
+    });
+
+    it("sends short questions with the lower token budget", () => {
+        const router = createRouter({shortPromptChars: 20});
+
+        expect(router.route(config, "short question").maxTokens).toEqual(256);
+        expect(router.route(config, "a question longer than twenty characters").maxTokens).toEqual(512);
+    });
+
+    it("selects the fallback model from listModels", async () => {
+        const router = createRouter();
+        router.fallback = null;
+        const chatbotClient = {
+            listModels: jest.fn().mockResolvedValue({
+                data: {listModels: [{name: "amazon.titan-text-express-v1", provider: "bedrock"}]},
+            }),
+        };
+
+        expect(await router.selectFallback(chatbotClient, "")).toBeNull();
+        expect(chatbotClient.listModels).not.toHaveBeenCalled();
+        expect(await router.selectFallback(chatbotClient, "unknown-model")).toBeNull();
+        expect(await router.selectFallback(chatbotClient, "amazon.titan-text-express-v1")).toEqual({
+            modelName: "amazon.titan-text-express-v1", provider: "bedrock",
+        });
+    });
+
+});
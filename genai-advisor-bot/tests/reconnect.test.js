@@ -0,0 +1,100 @@
+import {describe, it, expect, jest, beforeAll} from '@jest/globals';
+import {Readable} from 'stream';
+
+
+describe("response subscription reconnect", () => {
+
+    let ChatbotClient;
+    let reconnectDelay;
+
+    function idToken() {
+        const payload = Buffer.from(JSON.stringify({exp: Math.floor(Date.now() / 1000) + 3600})).toString("base64url");
+        return `header.${payload}.signature`;
+    }
+
+    // chatbot client without bootstrap, the AppSync client is replaced by the given fake
+    function createClient(appSyncClient) {
+        const client = Object.create(ChatbotClient.prototype);
+        client.closed = false;
+        client.idToken = idToken();
+        client.appSyncClient = appSyncClient;
+        return client;
+    }
+
+    function subscription(...messages) {
+        return Readable.from(messages.map((data) => ({data: data})));
+    }
+
+    beforeAll(() => {
+        process.env.CHATBOT_RECONNECT_BASE_DELAY_MS = "1";
+        process.env.CHATBOT_RECONNECT_MAX_DELAY_MS = "8";
+        ({ChatbotClient, reconnectDelay} = require("../components/chatbot-graphql-api.js"));
+    });
+
+    it("grows the delay exponentially up to the maximum", () => {
+        const random = jest.spyOn(Math, "random").mockReturnValue(0.999999);
+        try {
+            expect(Math.ceil(reconnectDelay(0))).toEqual(1);
+            expect(Math.ceil(reconnectDelay(2))).toEqual(4);
+            expect(Math.ceil(reconnectDelay(10))).toEqual(8);
+        } finally {
+            random.mockRestore();
+        }
+    });
+
+    it("resubscribes after the subscription ended", async () => {
+        const appSyncClient = {
+            subscribeAsync: jest.fn()
+                .mockResolvedValueOnce(subscription("first"))
+                .mockResolvedValueOnce(subscription("second")),
+        };
+        const listener = createClient(appSyncClient).responseMessagesListener("session-1");
+        expect((await listener.next()).value).toEqual("first");
+        expect((await listener.next()).value).toEqual("second");
+        expect(appSyncClient.subscribeAsync).toHaveBeenCalledTimes(2);
+        expect(appSyncClient.subscribeAsync.mock.calls[1][2]).toEqual("session-1");
+        await listener.return();
+    });
+
+    it("retries a failed subscription attempt", async () => {
+        const appSyncClient = {
+            subscribeAsync: jest.fn()
+                .mockRejectedValueOnce(new Error("Socket to AppSync closed prematurely"))
+                .mockRejectedValueOnce(new Error("Socket to AppSync closed prematurely"))
+                .mockResolvedValueOnce(subscription("recovered")),
+        };
+        const listener = createClient(appSyncClient).responseMessagesListener("session-1");
+        expect((await listener.next()).value).toEqual("recovered");
+        expect(appSyncClient.subscribeAsync).toHaveBeenCalledTimes(3);
+        await listener.return();
+    });
+
+    it("stops resubscribing when the client is closed", async () => {
+        const appSyncClient = {
+            subscribeAsync: jest.fn().mockResolvedValue(subscription("only")),
+            close: jest.fn(),
+        };
+        const client = createClient(appSyncClient);
+        const listener = client.responseMessagesListener("session-1");
+        expect((await listener.next()).value).toEqual("only");
+        client.close();
+        expect((await listener.next()).done).toEqual(true);
+        expect(appSyncClient.close).toHaveBeenCalled();
+    });
+
+    it("ends a subscription waiting for a response when the signal is aborted", async () => {
+        const pending = new Readable({objectMode: true, read() {}});
+        const appSyncClient = {subscribeAsync: jest.fn().mockResolvedValue(pending)};
+        const controller = new AbortController();
+        const listener = createClient(appSyncClient).responseMessagesListener("session-1", {signal: controller.signal});
+
+        const next = listener.next();
+        await new Promise((resolve) => setImmediate(resolve));
+        controller.abort();
+
+        expect((await next).done).toEqual(true);
+        expect(pending.destroyed).toBe(true);
+        expect(appSyncClient.subscribeAsync).toHaveBeenCalledTimes(1);
+    });
+
+});
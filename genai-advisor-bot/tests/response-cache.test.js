@@ -0,0 +1,79 @@
+import {describe, it, expect, beforeAll} from '@jest/globals';
+
+
+describe("response cache", () => {
+
+    let ResponseCache;
+    let normalizeQuestion;
+    let metrics;
+    const route = {modelName: "anthropic.claude-v2", workspaceId: "workspace-1", maxTokens: 512};
+
+    function createCache(options) {
+        let time = 0;
+        const cache = new ResponseCache({maxEntries: 2, ttlMs: 1_000, now: () => time, ...options});
+        cache.advance = (ms) => {
+            time += ms;
+        };
+        return cache;
+    }
+
+    beforeAll(() => {
+        ({ResponseCache, normalizeQuestion} = require("../components/response-cache.js"));
+        ({metrics} = require("../components/metrics.js"));
+    });
+
+    it("normalizes case, whitespace and trailing punctuation", () => {
+        expect(normalizeQuestion("  What is  Wickr IO? ")).toEqual("what is wickr io");
+        expect(ResponseCache.key("What is Wickr IO", route)).toEqual(ResponseCache.key("what is wickr io ?!", route));
+    });
+
+    it("keys the answers by model, workspace and token budget", () => {
+        const key = ResponseCache.key("question", route);
+        expect(ResponseCache.key("question", {...route, modelName: "other"})).not.toEqual(key);
+        expect(ResponseCache.key("question", {...route, workspaceId: ""})).not.toEqual(key);
+        expect(ResponseCache.key("question", {...route, maxTokens: 128})).not.toEqual(key);
+    });
+
+    it("counts hits and misses", () => {
+        const cache = createCache();
+        const hits = metrics.responseCacheHits.value;
+        const misses = metrics.responseCacheMisses.value;
+
+        expect(cache.get("question")).toBeUndefined();
+        cache.set("question", "answer");
+        expect(cache.get("question")).toEqual("answer");
+
+        expect(metrics.responseCacheHits.value).toEqual(hits + 1);
+        expect(metrics.responseCacheMisses.value).toEqual(misses + 1);
+    });
+
+    it("expires entries after the TTL", () => {
+        const cache = createCache();
+        cache.set("question", "answer");
+        cache.advance(999);
+        expect(cache.get("question")).toEqual("answer");
+        cache.advance(1);
+        expect(cache.get("question")).toBeUndefined();
+        expect(cache.entries.size).toEqual(0);
+    });
+
+    it("evicts the least recently used entry", () => {
+        const cache = createCache();
+        cache.set("first", "answer 1");
+        cache.set("second", "answer 2");
+        cache.get("first");
+        cache.set("third", "answer 3");
+
+        expect(cache.get("second")).toBeUndefined();
+        expect(cache.get("first")).toEqual("answer 1");
+        expect(cache.get("third")).toEqual("answer 3");
+    });
+
+    it("stores nothing when disabled", () => {
+        const cache = createCache({maxEntries: 0});
+        cache.set("question", "answer");
+        expect(cache.enabled).toBe(false);
+        expect(cache.get("question")).toBeUndefined();
+    });
+
+});
@@ -0,0 +1,141 @@
+import {describe, it, expect, jest, beforeEach, afterEach} from '@jest/globals';
+
+
+describe("message scheduler", () => {
+
+    let MessageScheduler;
+    let dispatched;
+    let shed;
+
+    function createScheduler(options) {
+        return new MessageScheduler({
+            maxInFlight: 2,
+            maxQueuedPerRoom: 3,
+            maxQueuedTotal: 10,
+            requestTimeoutMs: 1_000,
+            dispatch: (roomId, message) => {
+                dispatched.push([roomId, message]);
+            },
+            shed: (roomId, message) => {
+                shed.push([roomId, message]);
+            },
+            ...options,
+        });
+    }
+
+    beforeEach(() => {
+        jest.useFakeTimers();
+        MessageScheduler = require("../components/scheduler.js").MessageScheduler;
+        dispatched = [];
+        shed = [];
+    });
+
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    it("keeps the order of messages within a room", async () => {
+        const scheduler = createScheduler();
+        scheduler.enqueue("room-1", "first");
+        scheduler.enqueue("room-1", "second");
+        await Promise.resolve();
+        expect(dispatched).toEqual([["room-1", "first"]]);
+        expect(scheduler.queueDepth).toEqual(1);
+        expect(scheduler.complete("room-1")).toEqual("first");
+        await Promise.resolve();
+        expect(dispatched).toEqual([["room-1", "first"], ["room-1", "second"]]);
+        expect(scheduler.queueDepth).toEqual(0);
+        expect(scheduler.complete("room-1")).toEqual("second");
+        expect(scheduler.complete("room-1")).toBeUndefined();
+    });
+
+    it("limits the number of requests in flight", async () => {
+        const scheduler = createScheduler();
+        scheduler.enqueue("room-1", "a");
+        scheduler.enqueue("room-2", "b");
+        scheduler.enqueue("room-3", "c");
+        await Promise.resolve();
+        expect(scheduler.inFlight).toEqual(2);
+        expect(dispatched.map(([roomId]) => roomId)).toEqual(["room-1", "room-2"]);
+        scheduler.complete("room-2");
+        await Promise.resolve();
+        expect(dispatched.map(([roomId]) => roomId)).toEqual(["room-1", "room-2", "room-3"]);
+    });
+
+    it("serves rooms round-robin", async () => {
+        const scheduler = createScheduler({maxInFlight: 1});
+        scheduler.enqueue("busy", "1");
+        scheduler.enqueue("busy", "2");
+        scheduler.enqueue("busy", "3");
+        scheduler.enqueue("quiet", "x");
+        for (let i = 0; i < 4; i++) {
+            await Promise.resolve();
+            scheduler.complete(dispatched[dispatched.length - 1][0]);
+        }
+        expect(dispatched).toEqual([["busy", "1"], ["quiet", "x"], ["busy", "2"], ["busy", "3"]]);
+    });
+
+    it("sheds messages beyond the queue limits", () => {
+        const scheduler = createScheduler({maxInFlight: 0, maxQueuedTotal: 4});
+        for (const message of ["1", "2", "3", "4"]) {
+            expect(scheduler.enqueue("room-1", message)).toEqual(message !== "4");
+        }
+        expect(scheduler.enqueue("room-2", "5")).toEqual(true);
+        expect(scheduler.enqueue("room-3", "6")).toEqual(false);
+        expect(shed).toEqual([["room-1", "4"], ["room-3", "6"]]);
+    });
+
+    it("frees the slot of a request without response", async () => {
+        const scheduler = createScheduler({maxInFlight: 1});
+        scheduler.enqueue("room-1", "lost");
+        scheduler.enqueue("room-2", "waiting");
+        await Promise.resolve();
+        expect(dispatched).toEqual([["room-1", "lost"]]);
+        jest.advanceTimersByTime(1_000);
+        await Promise.resolve();
+        expect(dispatched).toEqual([["room-1", "lost"], ["room-2", "waiting"]]);
+    });
+
+    it("ignores the completion of a request that timed out", async () => {
+        const timedOut = [];
+        const requestIds = [];
+        const scheduler = createScheduler({
+            maxInFlight: 1,
+            dispatch: (roomId, message, requestId) => {
+                dispatched.push([roomId, message]);
+                requestIds.push(requestId);
+            },
+            timedOut: (roomId, requestId, message) => {
+                timedOut.push([roomId, requestId, message]);
+            },
+        });
+        scheduler.enqueue("room-1", "slow");
+        scheduler.enqueue("room-1", "next");
+        await Promise.resolve();
+        jest.advanceTimersByTime(1_000);
+        await Promise.resolve();
+        expect(timedOut).toEqual([["room-1", requestIds[0], "slow"]]);
+        expect(dispatched).toEqual([["room-1", "slow"], ["room-1", "next"]]);
+        // the late response of the first request
+        expect(scheduler.complete("room-1", requestIds[0])).toBeUndefined();
+        expect(scheduler.inFlight).toEqual(1);
+        expect(scheduler.complete("room-1", requestIds[1])).toEqual("next");
+        expect(scheduler.inFlight).toEqual(0);
+    });
+
+    it("frees the slot of a request that failed to send", async () => {
+        const scheduler = createScheduler({
+            maxInFlight: 1,
+            dispatch: (roomId, message) => {
+                dispatched.push([roomId, message]);
+                if (message === "fails") throw new Error("network down");
+            },
+        });
+        scheduler.enqueue("room-1", "fails");
+        scheduler.enqueue("room-2", "succeeds");
+        for (let i = 0; i < 5; i++) await Promise.resolve();
+        expect(dispatched).toEqual([["room-1", "fails"], ["room-2", "succeeds"]]);
+        expect(scheduler.inFlight).toEqual(1);
+    });
+
+});
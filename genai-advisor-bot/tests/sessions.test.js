@@ -0,0 +1,124 @@
+import {describe, it, expect, jest, beforeAll} from '@jest/globals';
+
+
+describe("session rollover", () => {
+
+    let SessionManager;
+    let estimateTokens;
+    let metrics;
+
+    beforeAll(() => {
+        ({SessionManager, estimateTokens} = require("../components/sessions.js"));
+        ({metrics} = require("../components/metrics.js"));
+    });
+
+    async function turn(sessions, sessionId, question, answer) {
+        await sessions.beforeQuery(sessionId, question);
+        await sessions.afterResponse(sessionId, answer);
+    }
+
+    it("estimates four characters per token", () => {
+        expect(estimateTokens("")).toEqual(0);
+        expect(estimateTokens("abcde")).toEqual(2);
+        expect(estimateTokens(undefined)).toEqual(0);
+    });
+
+    it("deletes the session after the maximum number of turns", async () => {
+        const deleteSession = jest.fn().mockResolvedValue({});
+        const sessions = new SessionManager({maxTurns: 2, maxTokens: 0, deleteSession});
+        const rollovers = metrics.sessionRollovers.value;
+
+        await turn(sessions, "room-1", "question", "answer");
+        expect(deleteSession).not.toHaveBeenCalled();
+        await turn(sessions, "room-1", "question", "answer");
+        expect(deleteSession).toHaveBeenCalledWith("room-1");
+        expect(sessions.state("room-1")).toEqual({turns: 0, tokens: 0, rollover: null});
+        expect(metrics.sessionRollovers.value).toEqual(rollovers + 1);
+
+        await turn(sessions, "room-2", "question", "answer");
+        expect(deleteSession).toHaveBeenCalledTimes(1);
+    });
+
+    it("deletes the session when the estimated tokens pass the budget", async () => {
+        const deleteSession = jest.fn().mockResolvedValue({});
+        const sessions = new SessionManager({maxTurns: 0, maxTokens: 100, deleteSession});
+
+        await turn(sessions, "room-1", "q".repeat(40), "a".repeat(200));
+        expect(deleteSession).not.toHaveBeenCalled();
+        await turn(sessions, "room-1", "q".repeat(40), "a".repeat(160));
+        expect(deleteSession).toHaveBeenCalledTimes(1);
+    });
+
+    it("sends the next question after the pending rollover", async () => {
+        const calls = [];
+        let finishDelete;
+        const deleteSession = jest.fn(() => new Promise((resolve) => {
+            calls.push("delete started");
+            finishDelete = () => {
+                calls.push("delete finished");
+                resolve({});
+            };
+        }));
+        const sessions = new SessionManager({maxTurns: 1, maxTokens: 0, deleteSession});
+
+        await sessions.beforeQuery("room-1", "first");
+        sessions.afterResponse("room-1", "answer");
+        const next = sessions.beforeQuery("room-1", "second").then(() => calls.push("second question"));
+        await Promise.resolve();
+        finishDelete();
+        await next;
+
+        expect(calls).toEqual(["delete started", "delete finished", "second question"]);
+        expect(sessions.state("room-1").turns).toEqual(1);
+    });
+
+    it("keeps the session when the deletion fails", async () => {
+        const deleteSession = jest.fn().mockRejectedValue(new Error("throttled"));
+        const sessions = new SessionManager({maxTurns: 1, maxTokens: 0, deleteSession});
+
+        await turn(sessions, "room-1", "question", "answer");
+        expect(sessions.state("room-1")).toEqual(expect.objectContaining({turns: 1, rollover: null}));
+        await turn(sessions, "room-1", "question", "answer");
+        expect(deleteSession).toHaveBeenCalledTimes(2);
+    });
+
+    it("looks up the history of a session the bot hasn't used yet", async () => {
+        // e.g. after a restart of the bot, room-old has a conversation from before
+        const sessionExists = jest.fn(async (sessionId) => sessionId === "room-old");
+        const sessions = new SessionManager({
+            maxTurns: 2, maxTokens: 0, deleteSession: jest.fn().mockResolvedValue({}), sessionExists,
+        });
+
+        expect(await sessions.isFresh("room-old")).toEqual(false);
+        expect(await sessions.isFresh("room-new")).toEqual(true);
+        await turn(sessions, "room-new", "question", "answer");
+        expect(await sessions.isFresh("room-new")).toEqual(false);
+        expect(await sessions.isFresh("room-old")).toEqual(false);
+        expect(sessionExists).toHaveBeenCalledTimes(2);
+
+        // the rollover deletes the history of the session
+        await turn(sessions, "room-old", "question", "answer");
+        await turn(sessions, "room-old", "question", "answer");
+        expect(await sessions.isFresh("room-old")).toEqual(true);
+    });
+
+    it("is not fresh while the session can't be looked up", async () => {
+        const sessionExists = jest.fn().mockRejectedValue(new Error("network down"));
+        const sessions = new SessionManager({maxTurns: 0, maxTokens: 0, deleteSession: jest.fn(), sessionExists});
+
+        expect(await sessions.isFresh("room-1")).toEqual(false);
+        sessionExists.mockResolvedValue(false);
+        expect(await sessions.isFresh("room-1")).toEqual(true);
+    });
+
+    it("forgets a session deleted by a command", async () => {
+        const sessions = new SessionManager({maxTurns: 5, maxTokens: 0, deleteSession: jest.fn()});
+        await turn(sessions, "room-1", "question", "answer");
+
+        sessions.reset("room-1");
+
+        expect(sessions.state("room-1").turns).toEqual(0);
+        expect(await sessions.isFresh("room-1")).toEqual(true);
+    });
+
+});
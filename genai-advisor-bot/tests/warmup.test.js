@@ -0,0 +1,77 @@
+import {describe, it, expect, jest, beforeAll} from '@jest/globals';
+
+
+describe("warm-up of the chatbot path", () => {
+
+    let warmUp;
+    let WARMUP_SESSION_PREFIX;
+
+    // chatbot client that answers every query in the session after the given delay, or never
+    function fakeClient(responseDelayMs) {
+        const calls = [];
+        let respond;
+        const response = new Promise((resolve) => {
+            respond = resolve;
+        });
+        let subscriptionEnded = false;
+        return {
+            calls: calls,
+            subscriptionEnded: () => subscriptionEnded,
+            ready: jest.fn(async function () {
+                calls.push("ready");
+                return this;
+            }),
+            responseMessagesListener: async function* (sessionId, {signal}) {
+                calls.push("subscribe");
+                const aborted = new Promise((resolve) => signal.addEventListener("abort", resolve, {once: true}));
+                try {
+                    const message = await Promise.race([response, aborted]);
+                    if (!signal.aborted) yield message;
+                } finally {
+                    subscriptionEnded = true;
+                }
+            },
+            send: jest.fn(async (text, sessionId) => {
+                calls.push("send");
+                if (responseDelayMs !== undefined) {
+                    setTimeout(() => respond({receiveMessages: {data: "{}"}}), responseDelayMs);
+                }
+                return {data: {sendQuery: "ok"}};
+            }),
+            deleteSession: jest.fn(async () => {
+                calls.push("deleteSession");
+            }),
+        };
+    }
+
+    beforeAll(() => {
+        ({warmUp, WARMUP_SESSION_PREFIX} = require("../components/warmup.js"));
+    });
+
+    it("sends a query through a reserved session and deletes the session", async () => {
+        const client = fakeClient(1);
+
+        const durationMs = await warmUp(client, {query: "Hello", timeoutMs: 1_000});
+
+        expect(durationMs).toBeGreaterThanOrEqual(0);
+        expect(client.calls).toEqual(["ready", "subscribe", "send", "deleteSession"]);
+        const sessionId = client.send.mock.calls[0][1];
+        expect(sessionId.startsWith(WARMUP_SESSION_PREFIX)).toBe(true);
+        expect(client.send.mock.calls[0][0]).toEqual("Hello");
+        expect(client.deleteSession).toHaveBeenCalledWith(sessionId);
+        await new Promise((resolve) => setImmediate(resolve));
+        expect(client.subscriptionEnded()).toBe(true);
+    });
+
+    it("deletes the session when no response arrives in time", async () => {
+        const client = fakeClient();
+
+        await expect(warmUp(client, {query: "Hello", timeoutMs: 10, sessionId: "warmup-test"}))
+            .rejects.toThrow("no response within 10 ms");
+        expect(client.deleteSession).toHaveBeenCalledWith("warmup-test");
+        // the subscription doesn't wait for a response that never comes
+        await new Promise((resolve) => setImmediate(resolve));
+        expect(client.subscriptionEnded()).toBe(true);
+    });
+
+});
@@ -0,0 +1,12 @@
+from genai_chatbot_client.auth import CognitoAuth
+from genai_chatbot_client.client import ChatbotApiError, ChatbotClient
+from genai_chatbot_client.config import load_deployment_config
+from genai_chatbot_client.realtime import RealtimeError
+
+__all__ = [
+    'ChatbotApiError',
+    'ChatbotClient',
+    'CognitoAuth',
+    'RealtimeError',
+    'load_deployment_config',
+]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import asyncio
+import base64
+import json
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+# refresh the ID token when it expires within this time
+TOKEN_REFRESH_MARGIN = 5 * 60
+
+
+def token_expires_at(jwt_token: str) -> float:
+    payload = jwt_token.split('.')[1]
+    payload += '=' * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))['exp']
+
+
+class CognitoAuth:
+    """
+    ID token of the Cognito user the Wickr IO integration created in the user pool of the AWS GenAI Chatbot. The
+    token is kept until shortly before it expires. The password is rotated regularly, when the authentication fails
+    the password is read again with load_password.
+
+    The calls to Cognito are blocking boto3 calls, they run in a thread.
+    """
+
+    def __init__(self, client_id: str, user_id: str, password: str, load_password=None, cognito_client=None):
+        self.client_id = client_id
+        self.user_id = user_id
+        self.password = password
+        self.load_password = load_password
+        self.cognito_client = cognito_client or boto3.client('cognito-idp')
+        self._id_token = None
+        self._lock = asyncio.Lock()
+
+    async def id_token(self) -> str:
+        if self._id_token and token_expires_at(self._id_token) - time.time() > TOKEN_REFRESH_MARGIN:
+            return self._id_token
+        # concurrent callers share one authentication
+        async with self._lock:
+            if self._id_token and token_expires_at(self._id_token) - time.time() > TOKEN_REFRESH_MARGIN:
+                return self._id_token
+            try:
+                self._id_token = await self._authenticate()
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'NotAuthorizedException' or not self.load_password:
+                    raise
+                # the password may have been rotated in the meantime
+                self.password = await self.load_password()
+                self._id_token = await self._authenticate()
+        return self._id_token
+
+    async def _authenticate(self) -> str:
+        response = await asyncio.to_thread(
+            self.cognito_client.initiate_auth,
+            AuthFlow='USER_PASSWORD_AUTH',
+            ClientId=self.client_id,
+            AuthParameters={
+                'USERNAME': self.user_id,
+                'PASSWORD': self.password,
+            },
+        )
+        return response['AuthenticationResult']['IdToken']
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+
+import aiohttp
+import boto3
+
+from genai_chatbot_client.auth import CognitoAuth
+from genai_chatbot_client.config import load_deployment_config
+from genai_chatbot_client.realtime import RealtimeConnection, Subscription
+
+# token budget of an answer, the default of the bot (see genai-advisor-bot/components/chatbot-graphql-api.js)
+DEFAULT_MAX_TOKENS = 512
+
+
+class ChatbotApiError(Exception):
+    """
+    The GraphQL API of the AWS GenAI Chatbot returned errors.
+    """
+
+    def __init__(self, errors: list):
+        super().__init__('; '.join(error.get('message', str(error)) for error in errors))
+        self.errors = errors
+
+
+def create_query_data(text: str, session_id: str, model_name: str, provider: str, workspace_id: str,
+                      max_tokens: int) -> dict:
+    return {
+        'action': 'run',
+        'modelInterface': 'langchain',
+        'data': {
+            'mode': 'chain',
+            'text': text,
+            'files': [],
+            'modelName': model_name,
+            'provider': provider,
+            'sessionId': session_id,
+            'workspaceId': workspace_id,
+            'modelKwargs': {
+                'streaming': False, 'maxTokens': max_tokens, 'temperature': 0.6, 'topP': 0.9
+            },
+        },
+    }
+
+
+class ChatbotClient:
+    """
+    Asynchronous client of the GraphQL API of the AWS GenAI Chatbot, authenticated as the Cognito user of the Wickr
+    IO integration. Queries and mutations share a pool of keep-alive HTTPS connections of at most connection_limit
+    connections, the subscriptions share one WebSocket connection to the realtime endpoint.
+
+        async with await ChatbotClient.from_deployment() as client:
+            async with await client.receive_messages(session_id) as messages:
+                await client.send_query('Hello', session_id, 'anthropic.claude-v2', 'bedrock')
+                async for message in messages:
+                    ...
+    """
+
+    def __init__(self, graphql_url: str, realtime_url: str, auth: CognitoAuth, connection_limit: int = 10,
+                 timeout: float = 60):
+        self.graphql_url = graphql_url
+        self.realtime_url = realtime_url
+        self.auth = auth
+        self.connection_limit = connection_limit
+        self.timeout = timeout
+        self.workspace_id = ''
+        self._http_session = None
+        self._realtime = None
+        self._realtime_lock = asyncio.Lock()
+
+    @classmethod
+    async def from_deployment(cls, region_name: str = None, **kwargs) -> 'ChatbotClient':
+        """
+        Client for the deployment of the Wickr IO integration in the region, see load_deployment_config.
+        """
+        config = await load_deployment_config(region_name)
+        auth = CognitoAuth(
+            config.user_pool_web_client_id, config.user_id, config.password,
+            load_password=config.load_password,
+            cognito_client=boto3.client('cognito-idp', region_name=config.region_name),
+        )
+        client = cls(config.graphql_url, config.realtime_url, auth, **kwargs)
+        client.workspace_id = config.workspace_id
+        return client
+
+    @property
+    def http_session(self) -> aiohttp.ClientSession:
+        # created lazily, a ClientSession needs a running event loop
+        if self._http_session is None:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._http_session
+
+    async def post(self, query: str, variables: dict = None) -> dict:
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': await self.auth.id_token(),
+        }
+        async with self.http_session.post(
+                self.graphql_url, json={'query': query, 'variables': variables or {}}, headers=headers
+        ) as response:
+            if response.status != 200:
+                raise ChatbotApiError([{'message': f'HTTP {response.status}: {await response.text()}'}])
+            result = await response.json()
+        if result.get('errors'):
+            raise ChatbotApiError(result['errors'])
+        return result['data']
+
+    async def list_models(self) -> list:
+        data = await self.post("""
+            query MyQuery {
+                listModels {
+                    inputModalities
+                    interface
+                    name
+                    outputModalities
+                    provider
+                    ragSupported
+                    streaming
+                }
+            }
+        """)
+        return data['listModels']
+
+    async def list_workspaces(self) -> list:
+        data = await self.post("""
+            query MyQuery {
+                listWorkspaces {
+                    id
+                    name
+                }
+            }
+        """)
+        return data['listWorkspaces']
+
+    async def delete_session(self, session_id: str) -> dict:
+        data = await self.post(f"""
+            mutation MyMutation {{
+                deleteSession(id: "{session_id}") {{
+                    id
+                    deleted
+                }}
+            }}
+        """)
+        return data['deleteSession']
+
+    async def send_query(self, text: str, session_id: str, model_name: str, provider: str,
+                         workspace_id: str = None, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+        """
+        Send a question of the session, the answer arrives on the receive_messages subscription of the session.
+        The default workspace is the default RAG workspace of the deployment.
+        """
+        query_data = create_query_data(
+            text, session_id, model_name, provider,
+            self.workspace_id if workspace_id is None else workspace_id, max_tokens,
+        )
+        data = await self.post("""
+            mutation MyMutation($data: String!) {
+                sendQuery(data: $data)
+            }
+        """, {'data': json.dumps(query_data)})
+        return data['sendQuery']
+
+    async def receive_messages(self, session_id: str) -> Subscription:
+        """
+        Established subscription to the messages of the session, yields the parsed messages, e.g.
+        {'type': 'text', 'action': 'final_response', 'data': {'sessionId': ..., 'content': ...}}. Subscribe before
+        sending the question, otherwise the answer may be missed.
+        """
+        id_token = await self.auth.id_token()
+        async with self._realtime_lock:
+            if self._realtime is None or self._realtime.closed:
+                self._realtime = RealtimeConnection(self.http_session, self.graphql_url, self.realtime_url)
+                await self._realtime.connect(id_token)
+        subscription = await self._realtime.start(f"""
+            subscription MySubscription {{
+                receiveMessages(sessionId: "{session_id}") {{
+                    data
+                }}
+            }}
+        """, id_token)
+        return MessageSubscription(subscription)
+
+    async def close(self):
+        if self._realtime:
+            await self._realtime.close()
+            self._realtime = None
+        if self._http_session:
+            await self._http_session.close()
+            self._http_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class MessageSubscription(Subscription):
+    """
+    Subscription to receiveMessages, yields the parsed JSON document of the data field.
+    """
+
+    def __init__(self, subscription: Subscription):
+        super().__init__(subscription.connection, subscription.id, subscription.queue)
+
+    async def __anext__(self) -> dict:
+        data = await super().__anext__()
+        return json.loads(data['receiveMessages']['data'])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import types
+
+import boto3
+
+# written by the deployment, see cdk_packages/cognito_user.py, cdk_packages/bot_bootstrap.py
+COGNITO_CONFIG_PARAMETER = '/Wickr-GenAI-Chatbot/wickr-io-cognito-config'
+COGNITO_USER_SECRET = 'WickrIO-Cognito-User-Password'
+BOOTSTRAP_PARAMETER = '/Wickr-GenAI-Chatbot/bootstrap'
+# workspace ID of the bootstrap document if the default RAG workspace doesn't exist, see cdk_packages/rag_workspace.py
+NO_WORKSPACE_ID = 'none'
+
+
+def get_json_parameter(ssm_client, name: str) -> dict:
+    return json.loads(ssm_client.get_parameter(Name=name)['Parameter']['Value'])
+
+
+def get_secret_string(secretsmanager_client, secret_id: str) -> str:
+    return secretsmanager_client.get_secret_value(SecretId=secret_id)['SecretString']
+
+
+async def load_deployment_config(region_name: str = None) -> types.SimpleNamespace:
+    """
+    Read the configuration of a deployment of the Wickr IO integration: the user pool client from parameter
+    wickr-io-cognito-config, the password of the Cognito user from the secret and the URIs of the GraphQL API,
+    the Cognito user ID and the default RAG workspace from the bootstrap document. The requests run in parallel.
+
+    :return: graphql_url, realtime_url, user_pool_web_client_id, user_id, password, load_password (a coroutine
+             function reading the password again), workspace_name and workspace_id
+    """
+    session = boto3.session.Session(region_name=region_name)
+    ssm_client = session.client('ssm')
+    secretsmanager_client = session.client('secretsmanager')
+
+    async def load_password():
+        return await asyncio.to_thread(get_secret_string, secretsmanager_client, COGNITO_USER_SECRET)
+
+    cognito_config, bootstrap, password = await asyncio.gather(
+        asyncio.to_thread(get_json_parameter, ssm_client, COGNITO_CONFIG_PARAMETER),
+        asyncio.to_thread(get_json_parameter, ssm_client, BOOTSTRAP_PARAMETER),
+        load_password(),
+    )
+    config = types.SimpleNamespace()
+    config.region_name = session.region_name
+    config.graphql_url = bootstrap['bot']['graphql_url']
+    config.realtime_url = bootstrap['bot']['realtime_url']
+    config.user_pool_web_client_id = cognito_config['user_pool_web_client_id']
+    config.user_id = bootstrap['bot']['cognito_user_id']
+    config.password = password
+    config.load_password = load_password
+    workspace_id = bootstrap['bot'].get('rag_workspace_id', '')
+    config.workspace_id = '' if workspace_id == NO_WORKSPACE_ID else workspace_id
+    config.workspace_name = bootstrap['bot'].get('rag_workspace_name', '') if config.workspace_id else ''
+    return config
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import asyncio
+import base64
+import json
+import urllib.parse
+import uuid
+
+import aiohttp
+
+# AppSync realtime protocol, see
+# https://docs.aws.amazon.com/appsync/latest/devguide/real-time-websocket-client.html
+PROTOCOL = 'graphql-ws'
+CONNECTION_ACK_TIMEOUT = 10
+SUBSCRIPTION_ESTABLISHED_TIMEOUT = 5
+
+
+class RealtimeError(Exception):
+    pass
+
+
+def encode_header(header: dict) -> str:
+    return base64.b64encode(json.dumps(header).encode()).decode()
+
+
+class RealtimeConnection:
+    """
+    WebSocket connection to the AppSync realtime endpoint. All subscriptions of a client share the connection, a
+    reader task passes the messages to the queues of the subscriptions. The connection is closed when no keep-alive
+    message arrived within the connection timeout AppSync sent with the acknowledgement, the subscriptions end with
+    a RealtimeError then.
+    """
+
+    def __init__(self, http_session: aiohttp.ClientSession, graphql_url: str, realtime_url: str):
+        self.http_session = http_session
+        self.realtime_url = realtime_url
+        self.host = urllib.parse.urlparse(graphql_url).netloc
+        self.ws = None
+        self.connection_timeout = None
+        self.subscriptions = {}  # subscription id -> queue of messages
+        self.reader = None
+
+    @property
+    def closed(self) -> bool:
+        return self.ws is None or self.ws.closed
+
+    async def connect(self, id_token: str):
+        header = encode_header({'host': self.host, 'Authorization': id_token})
+        url = f'{self.realtime_url}?header={header}&payload={encode_header({})}'
+        self.ws = await self.http_session.ws_connect(url, protocols=(PROTOCOL,))
+        await self.ws.send_json({'type': 'connection_init'})
+        message = await self.ws.receive_json(timeout=CONNECTION_ACK_TIMEOUT)
+        if message['type'] != 'connection_ack':
+            await self.ws.close()
+            raise RealtimeError(f'connection failed: {message.get("payload")}')
+        self.connection_timeout = message['payload']['connectionTimeoutMs'] / 1000
+        self.reader = asyncio.create_task(self.read())
+
+    async def read(self):
+        error = RealtimeError('connection closed')
+        try:
+            while True:
+                try:
+                    msg = await self.ws.receive(timeout=self.connection_timeout)
+                except asyncio.TimeoutError:
+                    error = RealtimeError(f'no keep-alive message within {self.connection_timeout} s')
+                    break
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                message = json.loads(msg.data)
+                queue = self.subscriptions.get(message.get('id'))
+                if queue is not None:
+                    queue.put_nowait(message)
+        finally:
+            await self.ws.close()
+            for queue in self.subscriptions.values():
+                queue.put_nowait(error)
+            self.subscriptions.clear()
+
+    async def start(self, query: str, id_token: str) -> 'Subscription':
+        subscription_id = str(uuid.uuid4())
+        queue = asyncio.Queue()
+        self.subscriptions[subscription_id] = queue
+        await self.ws.send_json({
+            'id': subscription_id,
+            'type': 'start',
+            'payload': {
+                'data': json.dumps({'query': query, 'variables': {}}),
+                'extensions': {
+                    'authorization': {'host': self.host, 'Authorization': id_token},
+                },
+            },
+        })
+        try:
+            message = await asyncio.wait_for(queue.get(), SUBSCRIPTION_ESTABLISHED_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.subscriptions.pop(subscription_id, None)
+            raise RealtimeError(f'subscription {subscription_id} not established '
+                                f'within {SUBSCRIPTION_ESTABLISHED_TIMEOUT} s')
+        if isinstance(message, Exception):
+            raise message
+        if message['type'] != 'start_ack':
+            self.subscriptions.pop(subscription_id, None)
+            raise RealtimeError(f'subscription {subscription_id} failed: {message.get("payload")}')
+        return Subscription(self, subscription_id, queue)
+
+    async def stop(self, subscription_id: str):
+        queue = self.subscriptions.get(subscription_id)
+        if queue is None:
+            return
+        try:
+            if not self.closed:
+                await self.ws.send_json({'type': 'stop', 'id': subscription_id})
+                # AppSync confirms the stop with a complete message, data may arrive before
+                await asyncio.wait_for(self.wait_for_complete(queue), SUBSCRIPTION_ESTABLISHED_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.subscriptions.pop(subscription_id, None)
+
+    @staticmethod
+    async def wait_for_complete(queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            if isinstance(message, Exception) or message['type'] == 'complete':
+                return
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+            await asyncio.gather(self.reader, return_exceptions=True)
+        elif self.ws:
+            await self.ws.close()
+
+
+class Subscription:
+    """
+    Established subscription, an async iterator over the data of the subscription. Used as async context manager
+    the subscription is stopped on exit.
+    """
+
+    def __init__(self, connection: RealtimeConnection, subscription_id: str, queue: asyncio.Queue):
+        self.connection = connection
+        self.id = subscription_id
+        self.queue = queue
+        self.done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        if self.done:
+            raise StopAsyncIteration
+        message = await self.queue.get()
+        if isinstance(message, Exception):
+            self.done = True
+            raise message
+        if message['type'] == 'complete':
+            self.done = True
+            raise StopAsyncIteration
+        if message['type'] == 'error' or message['payload'].get('errors'):
+            raise RealtimeError(f'subscription {self.id}: {message["payload"]}')
+        return message['payload']['data']
+
+    async def stop(self):
+        if not self.done:
+            self.done = True
+            await self.connection.stop(self.id)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
@@ -0,0 +1,26 @@
+#!/bin/bash
+
+# Pin the dependencies of the integration code: resolve the node:16 build image to its digest, write
+# genai-advisor-bot/package-lock.json with npm of that image and set NODE_BUILD_IMAGE in
+# cdk_packages/wickrio_code.py to the digest. Commit both files, cdk synth then builds node_modules with "npm ci".
+# Needs Docker and access to Docker Hub and the npm registry.
+
+set -euo pipefail
+
+ROOT_DIR=$(cd "$(dirname "$0")/.." && pwd)
+IMAGE=${1:-node:16}
+
+docker pull --quiet "$IMAGE"
+PINNED_IMAGE=$(docker inspect --format '{{index .RepoDigests 0}}' "$IMAGE")
+
+docker run --rm \
+  --user "$(id -u):$(id -g)" --env HOME=/tmp \
+  --volume "$ROOT_DIR/genai-advisor-bot:/build" --workdir /build \
+  "$PINNED_IMAGE" \
+  npm install --package-lock-only --no-audit --no-fund
+
+sed -i.bak "s|^NODE_BUILD_IMAGE = .*|NODE_BUILD_IMAGE = '$PINNED_IMAGE'|" "$ROOT_DIR/cdk_packages/wickrio_code.py"
+rm "$ROOT_DIR/cdk_packages/wickrio_code.py.bak"
+
+echo "NODE_BUILD_IMAGE = '$PINNED_IMAGE'"
+echo "written genai-advisor-bot/package-lock.json"
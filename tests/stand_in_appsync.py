@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Stand-in for the GraphQL API of the AWS GenAI Chatbot, the counterpart of
+# genai-advisor-bot/loadtest/stand-in-appsync.js for the Python client. Serves the queries and mutations over HTTP
+# and the AppSync realtime protocol over a WebSocket on the same path. Every sendQuery is answered on the
+# receiveMessages subscription of its session after llm_latency seconds.
+
+import asyncio
+import json
+import re
+
+from aiohttp import web
+
+MODELS = [
+    {'name': 'anthropic.claude-v2', 'provider': 'bedrock'},
+    {'name': 'amazon.titan-text-express-v1', 'provider': 'bedrock'},
+]
+WORKSPACES = [
+    {'id': 'workspace-1', 'name': 'WickrIO-Bot-Advisor'},
+]
+
+
+class StandInAppSync:
+
+    def __init__(self, llm_latency: float = 0.01, keep_alive_interval: float = 60):
+        self.llm_latency = llm_latency
+        self.keep_alive_interval = keep_alive_interval
+        self.subscriptions = {}  # subscription id -> (ws, session id)
+        self.requests = []  # (Authorization header, query) of the HTTP requests
+        self.client_ports = set()  # ports of the HTTP connections of the clients
+        self.runner = None
+        self.port = None
+        app = web.Application()
+        app.router.add_get('/graphql', self.handle_connection)
+        app.router.add_post('/graphql', self.handle_request)
+        self.app = app
+
+    @property
+    def graphql_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}/graphql'
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        await self.runner.cleanup()
+
+    async def handle_request(self, request: web.Request) -> web.Response:
+        self.client_ports.add(request.transport.get_extra_info('peername')[1])
+        authorization = request.headers.get('Authorization')
+        if not authorization:
+            return web.Response(status=401, text='UnauthorizedException')
+        body = await request.json()
+        self.requests.append((authorization, body['query']))
+        try:
+            result = {'data': self.execute(body['query'], body.get('variables') or {})}
+        except ValueError as e:
+            result = {'errors': [{'message': str(e)}]}
+        return web.json_response(result)
+
+    def execute(self, query: str, variables: dict) -> dict:
+        if 'sendQuery' in query:
+            request = json.loads(variables['data'])
+            asyncio.get_running_loop().call_later(
+                self.llm_latency, self.answer, request['data']['sessionId'], request['data']['text']
+            )
+            return {'sendQuery': '{"ResponseMetadata": {"HTTPStatusCode=200"}}'}
+        if 'listModels' in query:
+            return {'listModels': MODELS}
+        if 'listWorkspaces' in query:
+            return {'listWorkspaces': WORKSPACES}
+        delete_session = re.search(r'deleteSession\(id: "([^"]+)"\)', query)
+        if delete_session:
+            return {'deleteSession': {'id': delete_session.group(1), 'deleted': True}}
+        raise ValueError(f'stand-in does not support the query: {query}')
+
+    def answer(self, session_id: str, text: str):
+        data = json.dumps({
+            'type': 'text',
+            'action': 'final_response',
+            'data': {'sessionId': session_id, 'content': f'stand-in answer to: {text}'},
+        })
+        for subscription_id, (ws, subscribed_session_id) in list(self.subscriptions.items()):
+            if subscribed_session_id == session_id and not ws.closed:
+                asyncio.ensure_future(ws.send_json({
+                    'type': 'data',
+                    'id': subscription_id,
+                    'payload': {'data': {'receiveMessages': {'data': data}}},
+                }))
+
+    async def keep_alive(self, ws: web.WebSocketResponse):
+        while not ws.closed:
+            await asyncio.sleep(self.keep_alive_interval)
+            await ws.send_json({'type': 'ka'})
+
+    async def handle_connection(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(protocols=('graphql-ws',))
+        await ws.prepare(request)
+        keep_alive = None
+        try:
+            async for msg in ws:
+                message = json.loads(msg.data)
+                if message['type'] == 'connection_init':
+                    await ws.send_json({
+                        'type': 'connection_ack',
+                        'payload': {'connectionTimeoutMs': int(self.keep_alive_interval * 5 * 1000)},
+                    })
+                    keep_alive = asyncio.ensure_future(self.keep_alive(ws))
+                elif message['type'] == 'start':
+                    if not message['payload']['extensions']['authorization'].get('Authorization'):
+                        await ws.send_json({'type': 'error', 'id': message['id'], 'payload': {
+                            'errors': [{'errorType': 'UnauthorizedException'}]}})
+                        continue
+                    query = json.loads(message['payload']['data'])['query']
+                    session_id = re.search(r'receiveMessages\(sessionId: "([^"]+)"\)', query).group(1)
+                    self.subscriptions[message['id']] = (ws, session_id)
+                    await ws.send_json({'type': 'start_ack', 'id': message['id']})
+                elif message['type'] == 'stop':
+                    self.subscriptions.pop(message['id'], None)
+                    await ws.send_json({'type': 'complete', 'id': message['id']})
+        finally:
+            if keep_alive:
+                keep_alive.cancel()
+            for subscription_id, (subscription_ws, _) in list(self.subscriptions.items()):
+                if subscription_ws is ws:
+                    del self.subscriptions[subscription_id]
+        return ws
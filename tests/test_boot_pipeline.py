@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+import cdk_packages.boot_pipeline as boot_pipeline
+from cdk_packages.boot_pipeline import BootPipeline
+
+
+@pytest.fixture
+def phase_templates(tmp_path, monkeypatch):
+    """
+    Template directory with the real header and two phases that count their runs in files.
+    """
+    template_dir = tmp_path / 'templates'
+    template_dir.mkdir()
+    shutil.copy(os.path.join(boot_pipeline.TEMPLATE_DIR, 'header.sh'), template_dir)
+    (template_dir / 'install.sh').write_text('echo run >> @@count_dir/install\n')
+    (template_dir / 'start_bot.sh').write_text('echo run >> @@count_dir/start-bot\nfalse_if_requested\n')
+    monkeypatch.setattr(boot_pipeline, 'TEMPLATE_DIR', str(template_dir))
+    monkeypatch.setattr(boot_pipeline, 'BUILD_DIR', str(tmp_path / 'build'))
+
+    # stand-ins for the instance metadata service and syslog
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    (bin_dir / 'curl').write_text('#!/bin/bash\necho eu-west-1\n')
+    (bin_dir / 'logger').write_text('#!/bin/bash\ncat > /dev/null\n')
+    for command in ('curl', 'logger'):
+        (bin_dir / command).chmod(0o755)
+    monkeypatch.setenv('PATH', f'{bin_dir}:{os.environ["PATH"]}')
+    return tmp_path
+
+
+def run_script(path, log_file, fail=False):
+    """
+    Run the boot script and return its exit code and the phase log lines it wrote to the log file.
+    """
+    offset = log_file.stat().st_size if log_file.exists() else 0
+    env = dict(os.environ)
+    env['FAIL'] = 'yes' if fail else ''
+    result = subprocess.run(
+        ['bash', '-c', f'false_if_requested() {{ [ -z "$FAIL" ]; }}; export -f false_if_requested; bash {path}'],
+        env=env,
+    )
+    # the log is written asynchronously by tee, wait for both phases
+    for _ in range(50):
+        lines = log_file.read_text()[offset:].splitlines()
+        phases = [json.loads(line) for line in lines if line.startswith('{"phase"')]
+        if len(phases) == 2:
+            break
+        time.sleep(0.02)
+    return result.returncode, phases
+
+
+def create_pipeline(tmp_path):
+    pipeline = BootPipeline({
+        'log_file': str(tmp_path / 'boot.log'),
+        'instance_marker_dir': str(tmp_path / 'instance'),
+        'boot_marker_dir': str(tmp_path / 'boot'),
+        'count_dir': str(tmp_path),
+    })
+    pipeline.add_phase('install', once=True)
+    pipeline.add_phase('start-bot')
+    return pipeline
+
+
+def test_skips_completed_phases(phase_templates):
+    script = create_pipeline(phase_templates).write('boot.sh')
+
+    returncode, phases = run_script(script, phase_templates / 'boot.log')
+    assert returncode == 0
+    assert [(p['phase'], p['status']) for p in phases] == [('install', 'completed'), ('start-bot', 'completed')]
+    assert all(isinstance(p['duration_ms'], int) for p in phases)
+
+    # second run in the same boot
+    returncode, phases = run_script(script, phase_templates / 'boot.log')
+    assert [p['status'] for p in phases] == ['skipped', 'skipped']
+
+    # reboot clears the markers of the per-boot phases
+    shutil.rmtree(phase_templates / 'boot')
+    returncode, phases = run_script(script, phase_templates / 'boot.log')
+    assert [(p['phase'], p['status']) for p in phases] == [('install', 'skipped'), ('start-bot', 'completed')]
+    assert (phase_templates / 'install').read_text().count('run') == 1
+    assert (phase_templates / 'start-bot').read_text().count('run') == 2
+
+
+def test_failed_phase_stops_the_pipeline(phase_templates):
+    script = create_pipeline(phase_templates).write('boot.sh')
+
+    returncode, phases = run_script(script, phase_templates / 'boot.log', fail=True)
+    assert returncode != 0
+    assert phases[-1]['phase'] == 'start-bot'
+    assert phases[-1]['status'] == 'failed'
+
+    # the failed phase runs again
+    returncode, phases = run_script(script, phase_templates / 'boot.log')
+    assert returncode == 0
+    assert [p['status'] for p in phases] == ['skipped', 'completed']
+
+
+def test_renders_instance_pipeline():
+    pipeline = BootPipeline({
+        'node_major': '16',
+        'start_script_parameter': '/start-script',
+        'start_script_path': '/start_wickrio.sh',
+        'iam_user_secret': 'iam-user-secret',
+        'config_secret': 'config-secret',
+        'bootstrap_parameter': '/bootstrap',
+        'container_name': 'WickrIO',
+        'container_cpus': '2',
+        'container_memory': '3g',
+        'node_heap_mb': 1536,
+    })
+    for name in ('packages', 'reboot-hook'):
+        pipeline.add_phase(name, once=True)
+    for name in ('aws-credentials', 'wickrio-container'):
+        pipeline.add_phase(name)
+    script = pipeline.render()
+
+    assert '@@' not in script
+    assert 'sleep' not in script
+    assert script.count('$apt_get update') == 1
+    subprocess.run(['bash', '-n'], input=script, text=True, check=True)
+
+
+@pytest.fixture
+def fake_aws(phase_templates):
+    """
+    Stand-in for the AWS CLI: identity bot-1 of the pool is held by instance i-holder, describe-instances fails
+    with the error in DESCRIBE_ERROR. Calls are counted in files.
+    """
+    shutil.copy(os.path.join(os.path.dirname(boot_pipeline.__file__), 'assets', 'boot', 'claim_identity.sh'),
+                phase_templates / 'templates')
+    aws = phase_templates / 'bin' / 'aws'
+    aws.write_text(f'''#!/bin/bash
+case "$1 $2" in
+    "ssm get-parameters") echo bot-1 ;;
+    "dynamodb get-item") echo i-holder ;;
+    "dynamodb put-item") echo run >> {phase_templates}/put-item ;;
+    "ec2 describe-instances")
+        echo run >> {phase_templates}/describe-instances
+        echo "An error occurred ($DESCRIBE_ERROR) when calling the DescribeInstances operation" >&2
+        exit 254 ;;
+esac
+''')
+    sleep = phase_templates / 'bin' / 'sleep'
+    sleep.write_text('#!/bin/bash\n')
+    for command in (aws, sleep):
+        command.chmod(0o755)
+    pipeline = BootPipeline({
+        'log_file': str(phase_templates / 'boot.log'),
+        'instance_marker_dir': str(phase_templates / 'instance'),
+        'boot_marker_dir': str(phase_templates / 'boot'),
+        'bot_pool_parameter': '/bot-pool',
+        'identity_table': 'identities',
+    })
+    pipeline.add_phase('claim-identity', once=True)
+    return pipeline.write('boot.sh')
+
+
+def test_claims_the_identity_of_a_terminated_instance(fake_aws, phase_templates, monkeypatch):
+    monkeypatch.setenv('DESCRIBE_ERROR', 'InvalidInstanceID.NotFound')
+
+    returncode, _ = run_script(fake_aws, phase_templates / 'boot.log')
+    assert returncode == 0
+    assert (phase_templates / 'instance' / 'bot-user-id').read_text() == 'bot-1\n'
+
+
+def test_keeps_the_identity_when_the_holder_is_unknown(fake_aws, phase_templates, monkeypatch):
+    monkeypatch.setenv('DESCRIBE_ERROR', 'RequestLimitExceeded')
+
+    returncode, _ = run_script(fake_aws, phase_templates / 'boot.log')
+    assert returncode != 0
+    # retried, the identity is not taken over
+    assert (phase_templates / 'describe-instances').read_text().count('run') == 5
+    assert not (phase_templates / 'put-item').exists()
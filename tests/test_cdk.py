@@ -1,38 +1,281 @@
 #!/usr/bin/env python3
 
+import json
+
 import pytest
-from aws_cdk.assertions import Template
+from aws_cdk.assertions import Annotations, Match, Template
+
+from cdk_packages.capacity_profiles import CAPACITY_PROFILES
+
+
+def create_stacks(app, construct_id: str):
+    import aws_cdk as cdk
+    from cdk_packages.wickr_genai_chatbot_stack import WickrGenaiChatbotComputeStack, WickrGenaiChatbotStack
+
+    environment = cdk.Environment(account='123456789012', region='eu-west-1')
+    foundation_stack = WickrGenaiChatbotStack(app, construct_id, env=environment)
+    compute_stack = WickrGenaiChatbotComputeStack(
+        app, f'{construct_id}Compute', foundation=foundation_stack, env=environment)
+    return foundation_stack, compute_stack
 
 
 def test_synthesizes_properly(mock_externals):
     import app
 
     template = Template.from_stack(app.cdk_stack)
+    compute_template = Template.from_stack(app.compute_stack)
 
     template_json = template.to_json()
 
+    # the foundation stack is independent of the compute stack, a code change only updates the compute stack
+    assert 'Fn::ImportValue' not in json.dumps(template_json)
+    assert app.cdk_stack in app.compute_stack.dependencies
+
     # VPC
     template.resource_count_is('AWS::EC2::VPC', 1)
     assert len(template.find_resources('AWS::EC2::Subnet')) > 2
     template.resource_count_is('AWS::EC2::InternetGateway', 1)
     template.resource_count_is('Custom::VpcRestrictDefaultSG', 1)
 
+    # AWS APIs are reached through VPC endpoints, the public AppSync API through the NAT gateway
+    template.resource_count_is('AWS::EC2::VPCEndpoint', 12)
+    template.has_resource_properties('AWS::EC2::VPCEndpoint', {
+        'ServiceName': Match.string_like_regexp(r'\.secretsmanager$'),
+        'VpcEndpointType': 'Interface',
+        'PrivateDnsEnabled': True,
+    })
+    assert 'appsync' not in json.dumps(template.find_resources('AWS::EC2::VPCEndpoint'))
+
     # EC2 instance
-    template.resource_count_is('AWS::EC2::Instance', 1)
-    template.has_resource_properties('AWS::IAM::Role', {'Description': 'Role for EC2 instance'})
-    template.resource_count_is('AWS::IAM::InstanceProfile', 1)
+    compute_template.resource_count_is('AWS::EC2::Instance', 1)
+    compute_template.has_resource_properties('AWS::IAM::Role', {'Description': 'Role for EC2 instance'})
+    compute_template.resource_count_is('AWS::IAM::InstanceProfile', 1)
+    compute_template.has_resource_properties('AWS::EC2::Instance', {'Monitoring': True})
+
+    # CloudWatch agent, installed and configured by an SSM association with the instances of the stack
+    compute_template.has_resource_properties('AWS::SSM::Parameter', {'Name': 'AmazonCloudWatch-WickrIO-Bot'})
+    compute_template.has_resource_properties('AWS::SSM::Association', {
+        'Targets': [{'Key': 'tag:WickrIOBot', 'Values': Match.any_value()}],
+    })
+    compute_template.has_resource_properties('AWS::Logs::LogGroup', {'LogGroupName': '/Wickr-GenAI-Chatbot/bot'})
+    compute_template.has_resource_properties('AWS::Logs::MetricFilter', {
+        'FilterPattern': '[..., name="reply_latency_ms", latency_ms]',
+        'MetricTransformations': [Match.object_like({'MetricName': 'ReplyLatency', 'MetricValue': '$latency_ms'})],
+    })
+
+    # Wickr IO container image, pulled through the ECR cache and pinned by the digest parameter
+    compute_template.has_resource_properties('AWS::ECR::PullThroughCacheRule', {
+        'UpstreamRegistryUrl': 'public.ecr.aws'
+    })
+    compute_template.has_parameter('WickrIOImageDigest', {'Default': ''})
+    compute_template.has_resource_properties('AWS::SSM::Parameter', {
+        'Name': '/Wickr-GenAI-Chatbot/wickr-io-container-image',
+        'Value': {'Fn::If': [Match.any_value(), Match.any_value(), Match.any_value()]},
+    })
+
+    # performance dashboard and alarms of the message path
+    compute_template.resource_count_is('AWS::CloudWatch::Dashboard', 1)
+    compute_template.resource_count_is('AWS::CloudWatch::Alarm', 8)
 
     # Wickr IO user
     template.has_resource_properties('AWS::IAM::User', {'UserName': 'wickr-io-user'})
 
+    # Wickr IO integration code, deployed to the folder read by the Wickr IO container
+    compute_template.resource_count_is('Custom::CDKBucketDeployment', 1)
+    compute_template.has_resource_properties('Custom::CDKBucketDeployment', {
+        'DestinationBucketKeyPrefix': Match.string_like_regexp('^wickrio-integrations/')
+    })
+    # the retained code is deleted with the bucket
+    compute_template.resource_count_is('Custom::S3AutoDeleteObjects', 1)
+
+    # new code is sent to the running instances as SSM command when its asset hash changes
+    compute_template.has_resource_properties('AWS::SSM::Document', {
+        'DocumentType': 'Command',
+        'Content': Match.object_like({
+            'mainSteps': [Match.object_like({'action': 'aws:runShellScript', 'name': 'updateCode'})],
+        }),
+    })
+    compute_template.resource_count_is('Custom::AWS', 1)
+    assert 'sendCommand' in json.dumps(compute_template.find_resources('Custom::AWS'))
+
+    # compact bootstrap document read by the bot and the boot script with a single request
+    bootstrap = compute_template.find_resources('AWS::SSM::Parameter', {
+        'Properties': {'Name': '/Wickr-GenAI-Chatbot/bootstrap'},
+    })
+    assert len(bootstrap) == 1
+    bootstrap_value = json.dumps(list(bootstrap.values())[0]['Properties']['Value'])
+    for field in ('graphql_url', 'realtime_url', 'user_pool_web_client_id', 'cognito_user_id',
+                  'rag_workspace_name', 'rag_workspace_id', 'integration_bucket', 'container_image'):
+        assert field in bootstrap_value
+    template.has_resource_properties('AWS::SSM::Parameter', {'Name': '/Wickr-GenAI-Chatbot/wickr-io-cognito-user-id'})
+
+    # RAG workspace ID resolved at deployment time
+    template.has_resource_properties('AWS::CloudFormation::CustomResource', {
+        'WorkspaceName': 'WickrIO-Bot-Advisor',
+        'WorkspacesTableName': Match.any_value(),
+    })
+    template.has_resource_properties('AWS::SSM::Parameter', {
+        'Name': '/Wickr-GenAI-Chatbot/rag-workspace-id',
+        'Value': {'Fn::GetAtt': [Match.any_value(), 'WorkspaceIdParameterValue']},
+    })
+
     # Configurations stored in SSM Parameter Store and Secrets
-    template.has_resource_properties('AWS::SSM::Parameter', {'Name': '/Wickr-GenAI-Chatbot/wickr-io-integration-code'})
+    compute_template.has_resource_properties('AWS::SSM::Parameter', {
+        'Name': '/Wickr-GenAI-Chatbot/wickr-io-integration-code'
+    })
     template.has_resource_properties('AWS::SSM::Parameter', {'Name': '/Wickr-GenAI-Chatbot/model-rag-params'})
     template.has_resource_properties('AWS::SecretsManager::Secret', {'Name': 'WickrIO-IAM-User-Secret'})
     template.has_resource_properties('AWS::SecretsManager::Secret', {'Name': 'WickrIO-Cognito-User-Secret'})
     template.has_resource_properties('AWS::SecretsManager::Secret', {'Name': 'WickrIO-Config'})
 
 
+def test_synthesizes_fleet(mock_externals):
+    import aws_cdk as cdk
+
+    app = cdk.App(context={
+        'fleet': 'true',
+        'bot_pool': json.dumps([
+            {'user_id': 'bot-a', 'password': 'password-a'},
+            {'user_id': 'bot-b', 'password': 'password-b'},
+        ]),
+        'fleet_max_size': '5',
+    })
+    foundation_stack, compute_stack = create_stacks(app, 'WickrGenaiChatbotFleet')
+    foundation_template = Template.from_stack(foundation_stack)
+    template = Template.from_stack(compute_stack)
+
+    # instances are launched by the Auto Scaling group, never more than bots in the pool
+    template.resource_count_is('AWS::EC2::Instance', 0)
+    template.resource_count_is('AWS::EC2::LaunchTemplate', 1)
+    template.has_resource_properties('AWS::AutoScaling::AutoScalingGroup', {'MinSize': '1', 'MaxSize': '2'})
+    template.has_resource_properties('AWS::AutoScaling::ScalingPolicy', {
+        'TargetTrackingConfiguration': Match.object_like({
+            'PredefinedMetricSpecification': {'PredefinedMetricType': 'ASGAverageCPUUtilization'},
+        }),
+    })
+    template.has_resource_properties('AWS::AutoScaling::ScalingPolicy', {
+        'TargetTrackingConfiguration': Match.object_like({
+            'CustomizedMetricSpecification': Match.object_like({'MetricName': 'QueueDepth'}),
+        }),
+    })
+
+    # one configuration and one integration code folder per bot
+    foundation_template.has_resource_properties('AWS::SecretsManager::Secret', {'Name': 'WickrIO-Config-bot-a'})
+    foundation_template.has_resource_properties('AWS::SecretsManager::Secret', {'Name': 'WickrIO-Config-bot-b'})
+    template.resource_count_is('Custom::CDKBucketDeployment', 2)
+    foundation_template.has_resource_properties('AWS::DynamoDB::Table', {'TableName': 'WickrIO-Bot-Identities'})
+    foundation_template.has_resource_properties('AWS::SSM::Parameter', {
+        'Name': '/Wickr-GenAI-Chatbot/wickr-io-bot-pool', 'Value': 'bot-a,bot-b'
+    })
+
+
+@pytest.mark.parametrize('profile_name', CAPACITY_PROFILES)
+def test_synthesizes_capacity_profile(mock_externals, profile_name):
+    import aws_cdk as cdk
+
+    profile = CAPACITY_PROFILES[profile_name]
+    app = cdk.App(context={
+        'capacity_profile': profile_name,
+        'bot_user_id': 'bot',
+        'bot_password': 'password',
+    })
+    foundation_stack, compute_stack = create_stacks(app, 'WickrGenaiChatbotProfile')
+    template = Template.from_stack(compute_stack)
+
+    template.has_resource_properties('AWS::EC2::Instance', {'InstanceType': profile['instance_type']})
+    # the instance is launched from the one launch template with the root volume of the profile
+    launch_templates = template.find_resources('AWS::EC2::LaunchTemplate', {'Properties': {'LaunchTemplateData': {
+        'BlockDeviceMappings': [{
+            'DeviceName': '/dev/sda1',
+            'Ebs': {
+                'VolumeSize': profile['volume_size'],
+                'VolumeType': 'gp3',
+                'Iops': profile['volume_iops'],
+                'Throughput': profile['volume_throughput'],
+                'Encrypted': True,
+            },
+        }],
+        'MetadataOptions': {'HttpTokens': 'required'},
+    }}})
+    assert len(launch_templates) == 1
+    template.resource_count_is('AWS::EC2::LaunchTemplate', 1)
+    launch_template_id = next(iter(launch_templates))
+    template.has_resource_properties('AWS::EC2::Instance', {'LaunchTemplate': {
+        'LaunchTemplateId': {'Ref': launch_template_id},
+        'Version': {'Fn::GetAtt': [launch_template_id, 'LatestVersionNumber']},
+    }})
+
+    # Graviton instances run the arm64 Ubuntu image
+    image_parameters = [p for p in template.find_parameters('*') if 'ubuntu' in p.lower()]
+    assert bool(image_parameters) == (profile['architecture'] == 'arm64')
+
+    # limits of the Wickr IO container, passed to docker run by the boot script
+    user_data = json.dumps(template.find_resources('AWS::EC2::Instance'))
+    assert f'--cpus={profile["container_cpus"]}' in user_data
+    assert f'--memory={profile["container_memory"]}' in user_data
+    assert f'--max-old-space-size={profile["node_heap_mb"]}' in user_data
+
+
+def test_synthesizes_s3_flow_logs(mock_externals):
+    import aws_cdk as cdk
+
+    app = cdk.App(context={
+        'flow_log_destination': 's3',
+        'flow_log_traffic_type': 'REJECT',
+        'bot_user_id': 'bot',
+        'bot_password': 'password',
+    })
+    foundation_stack, compute_stack = create_stacks(app, 'WickrGenaiChatbotFlowLogs')
+    template = Template.from_stack(foundation_stack)
+
+    template.resource_count_is('AWS::EC2::FlowLog', 1)
+    template.has_resource_properties('AWS::EC2::FlowLog', {
+        'LogDestinationType': 's3',
+        'TrafficType': 'REJECT',
+        'DestinationOptions': {'fileFormat': 'parquet', 'hiveCompatiblePartitions': True, 'perHourPartition': True},
+    })
+    template.has_resource_properties('AWS::S3::Bucket', {
+        'LifecycleConfiguration': {'Rules': [Match.object_like({'ExpirationInDays': 365})]},
+    })
+
+
+def test_alarm_thresholds_from_context(mock_externals):
+    import aws_cdk as cdk
+
+    app = cdk.App(context={
+        'alarm_cpu_percent': '70',
+        'alarm_email': 'ops@example.com',
+        'bot_user_id': 'bot',
+        'bot_password': 'password',
+    })
+    foundation_stack, compute_stack = create_stacks(app, 'WickrGenaiChatbotAlarms')
+    template = Template.from_stack(compute_stack)
+
+    template.has_resource_properties('AWS::CloudWatch::Alarm', {'MetricName': 'CPUUtilization', 'Threshold': 70})
+    template.has_resource_properties('AWS::CloudWatch::Alarm', {'MetricName': 'mem_used_percent', 'Threshold': 85})
+    template.has_resource_properties('AWS::SNS::Subscription', {'Protocol': 'email', 'Endpoint': 'ops@example.com'})
+    for alarm in template.find_resources('AWS::CloudWatch::Alarm').values():
+        assert len(alarm['Properties']['AlarmActions']) == 1
+
+
+def test_rejects_unknown_capacity_profile(mock_externals):
+    import aws_cdk as cdk
+
+    app = cdk.App(context={'capacity_profile': 'huge'})
+    with pytest.raises(ValueError, match='Unknown capacity profile'):
+        create_stacks(app, 'WickrGenaiChatbotUnknownProfile')
+
+
+def test_fails_with_unpinned_dependencies(mock_externals, mocker):
+    import aws_cdk as cdk
+
+    mocker.patch('cdk_packages.wickrio_code.NODE_BUILD_IMAGE', 'node:16')
+    app = cdk.App(context={'bot_user_id': 'bot', 'bot_password': 'password'})
+    foundation_stack, compute_stack = create_stacks(app, 'WickrGenaiChatbotUnpinned')
+
+    Annotations.from_stack(compute_stack).has_error('*', Match.string_like_regexp('not pinned'))
+
+
 @pytest.fixture
 def mock_externals(mocker):
     """
@@ -85,9 +328,9 @@ def mock_externals(mocker):
         }
     )
 
-    # Mock calls to DynamoDB API.
+    # Mock calls to DynamoDB API, the workspaces table of the AWS GenAI Chatbot is looked up by RagWorkspace.
     mocker.patch(
-        'cdk_packages.cognito_user.client_dynamodb.list_tables',
+        'cdk_packages.utils.client_dynamodb.list_tables',
         return_value={
             'TableNames': [
                 'GenAIChatBotStack-RagEnginesRagDynamoDBTablesWorkspaces',
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from genai_chatbot_client import ChatbotApiError, ChatbotClient, CognitoAuth, RealtimeError, load_deployment_config
+from tests.stand_in_appsync import StandInAppSync
+
+SESSION_ID = 'session-1'
+MODEL_NAME = 'anthropic.claude-v2'
+
+
+def jwt_token(expires_in: float, serial: int = 0) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': time.time() + expires_in, 'n': serial}).encode())
+    return f'header.{payload.decode().rstrip("=")}.signature'
+
+
+class FakeCognitoClient:
+
+    def __init__(self, expires_in: float = 3600, password: str = 'password'):
+        self.expires_in = expires_in
+        self.password = password
+        self.calls = 0
+
+    def initiate_auth(self, AuthFlow, ClientId, AuthParameters):
+        self.calls += 1
+        if AuthParameters['PASSWORD'] != self.password:
+            raise ClientError({'Error': {'Code': 'NotAuthorizedException'}}, 'InitiateAuth')
+        return {'AuthenticationResult': {'IdToken': jwt_token(self.expires_in, self.calls)}}
+
+
+def run_with_client(test, cognito_client=None, **kwargs):
+    async def run():
+        stand_in = StandInAppSync()
+        await stand_in.start()
+        auth = CognitoAuth('client-id', 'user-id', 'password', cognito_client=cognito_client or FakeCognitoClient())
+        client = ChatbotClient(stand_in.graphql_url, stand_in.graphql_url.replace('http', 'ws'), auth, **kwargs)
+        try:
+            async with client:
+                return await test(client, stand_in)
+        finally:
+            await stand_in.close()
+
+    return asyncio.run(run())
+
+
+def test_lists_models_and_workspaces():
+    async def test(client, stand_in):
+        assert [model['name'] for model in await client.list_models()] == [MODEL_NAME, 'amazon.titan-text-express-v1']
+        assert await client.list_workspaces() == [{'id': 'workspace-1', 'name': 'WickrIO-Bot-Advisor'}]
+        assert await client.delete_session(SESSION_ID) == {'id': SESSION_ID, 'deleted': True}
+        # every request is authorized with the ID token of the Cognito user
+        assert all(authorization.startswith('header.') for authorization, _ in stand_in.requests)
+
+    run_with_client(test)
+
+
+def test_receives_the_answer_on_the_subscription():
+    async def test(client, stand_in):
+        async with await client.receive_messages(SESSION_ID) as messages:
+            await client.send_query('Hello', SESSION_ID, MODEL_NAME, 'bedrock', workspace_id='workspace-1')
+            message = await asyncio.wait_for(messages.__anext__(), 5)
+        assert message == {
+            'type': 'text',
+            'action': 'final_response',
+            'data': {'sessionId': SESSION_ID, 'content': 'stand-in answer to: Hello'},
+        }
+        assert stand_in.subscriptions == {}
+
+    run_with_client(test)
+
+
+def test_subscriptions_share_the_realtime_connection():
+    async def test(client, stand_in):
+        first = await client.receive_messages('session-1')
+        second = await client.receive_messages('session-2')
+        await asyncio.gather(
+            client.send_query('first', 'session-1', MODEL_NAME, 'bedrock'),
+            client.send_query('second', 'session-2', MODEL_NAME, 'bedrock'),
+        )
+        assert (await asyncio.wait_for(first.__anext__(), 5))['data']['content'] == 'stand-in answer to: first'
+        assert (await asyncio.wait_for(second.__anext__(), 5))['data']['content'] == 'stand-in answer to: second'
+        assert len({ws for ws, _ in stand_in.subscriptions.values()}) == 1
+
+    run_with_client(test)
+
+
+def test_ends_subscriptions_when_the_connection_is_lost():
+    async def test(client, stand_in):
+        messages = await client.receive_messages(SESSION_ID)
+        for ws, _ in list(stand_in.subscriptions.values()):
+            await ws.close()
+        with pytest.raises(RealtimeError):
+            await asyncio.wait_for(messages.__anext__(), 5)
+        # the next subscription opens a new connection
+        async with await client.receive_messages(SESSION_ID):
+            pass
+
+    run_with_client(test)
+
+
+def test_reuses_pooled_connections():
+    async def test(client, stand_in):
+        for _ in range(3):
+            await asyncio.gather(*(client.list_models() for _ in range(10)))
+        assert len(stand_in.client_ports) <= 2
+
+    run_with_client(test, connection_limit=2)
+
+
+def test_raises_api_errors():
+    async def test(client, stand_in):
+        with pytest.raises(ChatbotApiError, match='stand-in does not support the query'):
+            await client.post('query MyQuery { listUnknown }')
+
+    run_with_client(test)
+
+
+def test_caches_the_id_token_until_it_expires():
+    async def test():
+        cognito_client = FakeCognitoClient(expires_in=3600)
+        auth = CognitoAuth('client-id', 'user-id', 'password', cognito_client=cognito_client)
+        tokens = await asyncio.gather(*(auth.id_token() for _ in range(5)))
+        assert len(set(tokens)) == 1
+        assert cognito_client.calls == 1
+
+        # within the refresh margin the token is renewed
+        cognito_client.expires_in = 60
+        auth._id_token = jwt_token(60)
+        await auth.id_token()
+        assert cognito_client.calls == 2
+
+    asyncio.run(test())
+
+
+def test_reloads_a_rotated_password():
+    async def test():
+        cognito_client = FakeCognitoClient(password='rotated')
+
+        async def load_password():
+            return 'rotated'
+
+        auth = CognitoAuth('client-id', 'user-id', 'password', load_password=load_password,
+                           cognito_client=cognito_client)
+        await auth.id_token()
+        assert auth.password == 'rotated'
+        assert cognito_client.calls == 2
+
+        # without a password loader the error is raised
+        auth = CognitoAuth('client-id', 'user-id', 'password', cognito_client=cognito_client)
+        with pytest.raises(ClientError):
+            await auth.id_token()
+
+    asyncio.run(test())
+
+
+def test_loads_the_deployment_config(mocker):
+    session = mocker.patch('genai_chatbot_client.config.boto3.session.Session').return_value
+    session.region_name = 'eu-west-1'
+    parameters = {
+        '/Wickr-GenAI-Chatbot/wickr-io-cognito-config': {'user_pool_web_client_id': 'client-id'},
+        '/Wickr-GenAI-Chatbot/bootstrap': {'bot': {
+            'graphql_url': 'https://api.example.com/graphql',
+            'realtime_url': 'wss://realtime.example.com/graphql',
+            'cognito_user_id': 'user-id',
+            'rag_workspace_name': 'WickrIO-Bot-Advisor',
+            'rag_workspace_id': 'workspace-1',
+        }},
+    }
+    session.client.return_value.get_parameter.side_effect = \
+        lambda Name: {'Parameter': {'Value': json.dumps(parameters[Name])}}
+    session.client.return_value.get_secret_value.return_value = {'SecretString': 'password'}
+
+    config = asyncio.run(load_deployment_config())
+
+    assert config.graphql_url == 'https://api.example.com/graphql'
+    assert (config.user_pool_web_client_id, config.user_id, config.password) == ('client-id', 'user-id', 'password')
+    assert config.workspace_id == 'workspace-1'
+    session.client.return_value.get_secret_value.assert_called_with(SecretId='WickrIO-Cognito-User-Password')
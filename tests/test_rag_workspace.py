@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+
+# the Lambda function creates its DynamoDB client at import, the calls of the client are mocked by the tests
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-west-1')
+
+import cdk_packages.assets.lambda_functions.cr_rag_workspace.cr_rag_workspace as cr_rag_workspace  # noqa: E402
+
+TABLE_NAME = 'GenAIChatBotStack-RagEnginesRagDynamoDBTablesWorkspaces-ABC'
+WORKSPACE_NAME = 'WickrIO-Bot-Advisor'
+
+
+def workspace_item(workspace_id, status='ready'):
+    return {'workspace_id': {'S': workspace_id}, 'name': {'S': WORKSPACE_NAME}, 'status': {'S': status}}
+
+
+def create_event(request_type='Create'):
+    return {
+        'RequestType': request_type,
+        'LogicalResourceId': 'RAGworkspaceCustomresourceRAGworkspace',
+        'PhysicalResourceId': 'previous-id',
+        'ResourceProperties': {'WorkspaceName': WORKSPACE_NAME, 'WorkspacesTableName': TABLE_NAME},
+    }
+
+
+def test_resolves_workspace_id_over_pages(mocker):
+    scan = mocker.patch.object(cr_rag_workspace.client_dynamodb, 'scan', side_effect=[
+        {'Items': [], 'LastEvaluatedKey': {'workspace_id': {'S': 'a'}}},
+        {'Items': [workspace_item('creating-id', status='creating')], 'LastEvaluatedKey': {'workspace_id': {'S': 'b'}}},
+        {'Items': [workspace_item('ready-id')]},
+    ])
+
+    resp = cr_rag_workspace.on_event(create_event())
+
+    assert resp == {
+        'PhysicalResourceId': 'ready-id',
+        'Data': {'WorkspaceId': 'ready-id', 'WorkspaceIdParameterValue': 'ready-id'},
+    }
+    assert scan.call_count == 3
+    assert 'ExclusiveStartKey' not in scan.call_args_list[0].kwargs
+    assert scan.call_args_list[2].kwargs['ExclusiveStartKey'] == {'workspace_id': {'S': 'b'}}
+    assert scan.call_args_list[0].kwargs['ExpressionAttributeValues'][':name'] == {'S': WORKSPACE_NAME}
+
+
+def test_workspace_not_ready(mocker):
+    mocker.patch.object(cr_rag_workspace.client_dynamodb, 'scan', return_value={
+        'Items': [workspace_item('creating-id', status='creating')],
+    })
+
+    resp = cr_rag_workspace.on_event(create_event('Update'))
+
+    assert resp['Data']['WorkspaceId'] == 'creating-id'
+
+
+def test_workspace_not_found(mocker):
+    mocker.patch.object(cr_rag_workspace.client_dynamodb, 'scan', return_value={'Items': []})
+
+    # the deployment continues, the bot starts without workspace
+    resp = cr_rag_workspace.on_event(create_event())
+
+    assert resp == {'PhysicalResourceId': 'none', 'Data': {'WorkspaceId': '', 'WorkspaceIdParameterValue': 'none'}}
+
+
+def test_delete(mocker):
+    scan = mocker.patch.object(cr_rag_workspace.client_dynamodb, 'scan')
+
+    resp = cr_rag_workspace.on_event(create_event('Delete'))
+
+    assert resp == {'PhysicalResourceId': 'previous-id'}
+    scan.assert_not_called()
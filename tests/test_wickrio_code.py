@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tarfile
+
+from cdk_packages.wickrio_code import write_code_archive
+
+INSTALL_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'genai-advisor-bot', 'install.sh')
+
+
+def create_source(tmp_path):
+    source_dir = tmp_path / 'genai-advisor-bot'
+    (source_dir / 'components').mkdir(parents=True)
+    (source_dir / 'tests').mkdir()
+    (source_dir / 'genai-advisor-bot.js').write_text('console.log("bot");\n')
+    (source_dir / 'components' / 'settings.js').write_text('module.exports = {};\n')
+    (source_dir / 'tests' / 'settings.test.js').write_text('test();\n')
+    return source_dir
+
+
+def archive_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_archive_only_changes_with_the_code(tmp_path):
+    source_dir = create_source(tmp_path)
+    archive_path = tmp_path / 'software.tar.gz'
+    write_code_archive(str(source_dir), str(archive_path))
+    first_hash = archive_hash(archive_path)
+
+    # a fresh checkout gives the files new modification times
+    for root, dirs, files in os.walk(source_dir):
+        for name in dirs + files:
+            os.utime(os.path.join(root, name), (1_900_000_000, 1_900_000_000))
+    write_code_archive(str(source_dir), str(archive_path))
+    assert archive_hash(archive_path) == first_hash
+
+    (source_dir / 'components' / 'settings.js').write_text('module.exports = {changed: true};\n')
+    write_code_archive(str(source_dir), str(archive_path))
+    assert archive_hash(archive_path) != first_hash
+
+
+def test_archive_is_root_owned_without_tests(tmp_path):
+    source_dir = create_source(tmp_path)
+    archive_path = tmp_path / 'software.tar.gz'
+    write_code_archive(str(source_dir), str(archive_path))
+
+    with tarfile.open(archive_path) as tar:
+        members = {member.name: member for member in tar.getmembers()}
+    assert 'genai-advisor-bot.js' in members
+    assert not any(name.startswith('tests') for name in members)
+    assert all(member.uid == 0 and member.mtime == 0 for member in members.values())
+    assert members['components/settings.js'].mode == 0o755
+
+
+def test_install_skips_npm_for_the_prebuilt_node_modules(tmp_path):
+    source_dir = create_source(tmp_path)
+    (source_dir / 'package.json').write_text('{"name": "genai-advisor-bot"}\n')
+    shutil.copy(INSTALL_SCRIPT, source_dir)
+    node_modules = tmp_path / 'build' / 'node_modules'
+    node_modules.mkdir(parents=True)
+    (node_modules / '.package-lock.json').write_text('{}\n')
+    archive_path = tmp_path / 'software.tar.gz'
+    write_code_archive(str(source_dir), str(archive_path), str(node_modules))
+
+    integration_dir = tmp_path / 'integration'
+    integration_dir.mkdir()
+    with tarfile.open(archive_path) as tar:
+        tar.extractall(integration_dir)
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    npm = bin_dir / 'npm'
+    npm.write_text(f'#!/bin/sh\necho "$@" >> {tmp_path}/npm-calls\n')
+    npm.chmod(0o755)
+    env = {**os.environ, 'PATH': f'{bin_dir}:{os.environ["PATH"]}'}
+
+    # the extracted files all have the same modification time
+    subprocess.run(['sh', 'install.sh'], cwd=integration_dir, env=env, check=True)
+    assert not (tmp_path / 'npm-calls').exists()
+
+    (integration_dir / 'package.json').write_text('{"name": "genai-advisor-bot", "version": "2"}\n')
+    subprocess.run(['sh', 'install.sh'], cwd=integration_dir, env=env, check=True)
+    subprocess.run(['sh', 'install.sh'], cwd=integration_dir, env=env, check=True)
+    assert (tmp_path / 'npm-calls').read_text() == 'install\n'